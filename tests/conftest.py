@@ -0,0 +1,29 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import wz5_engine
+
+
+@pytest.fixture(scope="session")
+def ffmpeg_exe():
+    exe = wz5_engine.find_ffmpeg_exe()
+    if not exe:
+        pytest.skip("ffmpeg nicht gefunden")
+    return exe
+
+
+@pytest.fixture(scope="session")
+def clip(ffmpeg_exe, tmp_path_factory):
+    """Kurzes Testvideo (2 s, 160x90, 25 fps, H.264 mit AAC-Ton)."""
+    path = str(tmp_path_factory.mktemp("clips") / "clip.mp4")
+    subprocess.run([ffmpeg_exe, "-hide_banner", "-loglevel", "error", "-y",
+                    "-f", "lavfi", "-i", "testsrc2=size=160x90:rate=25:duration=2",
+                    "-f", "lavfi", "-i", "sine=frequency=440:duration=2",
+                    "-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p", "-c:a", "aac", "-shortest", path],
+                   check=True)
+    return path
@@ -0,0 +1,53 @@
+import numpy as np
+
+from wz5_engine import RoiCompositor, _blend_premultiplied
+
+
+def reference_blend(frame, wm_rgba, position):
+    """Float-Referenz: out = round((frame * (255 - a) + rgb * a) / 255), an den Frame-Rand geclippt."""
+    out = frame.astype(np.float64)
+    frame_h, frame_w = frame.shape[:2]
+    x, y = position
+    for wy in range(wm_rgba.shape[0]):
+        for wx in range(wm_rgba.shape[1]):
+            fx, fy = x + wx, y + wy
+            if 0 <= fx < frame_w and 0 <= fy < frame_h:
+                a = float(wm_rgba[wy, wx, 3])
+                out[fy, fx] = (out[fy, fx] * (255 - a) + wm_rgba[wy, wx, :3] * a) / 255
+    return np.floor(out + 0.5).astype(np.uint8)
+
+
+def test_blend_premultiplied_matches_float_for_all_values():
+    # jede Kombination aus Frame-Wert, Wasserzeichen-Wert und Alpha
+    values = np.arange(256, dtype=np.uint16)
+    frame, rgb, alpha = (g.reshape(-1) for g in np.meshgrid(values, values[::15], values, indexing="ij"))
+    roi = frame.astype(np.uint8).reshape(-1, 1, 1).repeat(3, axis=2)
+    inv_alpha = (255 - alpha).reshape(-1, 1, 1)
+    premultiplied = (rgb * alpha + 128).reshape(-1, 1, 1).repeat(3, axis=2)
+    scratch = np.empty(premultiplied.shape, dtype=np.uint16)
+    carry = np.empty(premultiplied.shape, dtype=np.uint16)
+    _blend_premultiplied(roi, inv_alpha, premultiplied, scratch, carry)
+    expected = np.floor((frame * (255.0 - alpha) + rgb * alpha.astype(np.float64)) / 255 + 0.5)
+    assert np.array_equal(roi[:, 0, 0], expected.astype(np.uint8))
+
+
+def test_roi_compositor_matches_float_reference():
+    rng = np.random.default_rng(5)
+    frame = rng.integers(0, 256, (36, 48, 3), dtype=np.uint8)
+    wm = rng.integers(0, 256, (10, 14, 4), dtype=np.uint8)
+    wm[:2, :, 3] = 0 # transparenter Rand wird weggeschnitten
+    for position in ((5, 7), (40, 30), (-4, -3)): # innen, rechts unten und links oben angeschnitten
+        expected = reference_blend(frame, wm, position)
+        result = RoiCompositor(wm, position, (48, 36)).blend_inplace(frame.copy())
+        assert np.array_equal(result, expected), position
+
+
+def test_roi_compositor_copies_read_only_frames():
+    frame = np.full((8, 8, 3), 10, dtype=np.uint8)
+    frame.flags.writeable = False
+    wm = np.zeros((2, 2, 4), dtype=np.uint8)
+    wm[..., :3] = 200
+    wm[..., 3] = 255
+    result = RoiCompositor(wm, (1, 1), (8, 8))(frame)
+    assert frame[1, 1, 0] == 10
+    assert result[1, 1, 0] == 200 and result[0, 0, 0] == 10
@@ -0,0 +1,58 @@
+import os
+
+from wz5_engine import JOURNAL_FILENAME, BatchJournal
+
+
+def make_job(tmp_path, content=b"video" * 100):
+    video_path = tmp_path / "clip.mp4"
+    video_path.write_bytes(content)
+    output_dir = tmp_path / "out"
+    output_dir.mkdir(exist_ok=True)
+    output_path = output_dir / "clip_wasserzeichen.mp4"
+    output_path.write_bytes(b"output")
+    return {"video_path": str(video_path), "output_path": str(output_path)}, str(output_dir)
+
+
+def test_is_done_after_ok_record(tmp_path):
+    job, output_dir = make_job(tmp_path)
+    journal = BatchJournal(output_dir)
+    assert not journal.is_done(job, "hash")
+    journal.record(job, {"status": "ok"}, "hash")
+    assert journal.is_done(job, "hash")
+    assert not journal.is_done(job, "andere-einstellungen")
+    # nach einem Neustart aus der Datei
+    assert BatchJournal(output_dir).is_done(job, "hash")
+
+
+def test_is_done_false_after_error_or_changed_output(tmp_path):
+    job, output_dir = make_job(tmp_path)
+    journal = BatchJournal(output_dir)
+    journal.record(job, {"status": "error", "error": "kaputt"}, "hash")
+    assert not journal.is_done(job, "hash")
+    journal.record(job, {"status": "ok"}, "hash")
+    with open(job["output_path"], "ab") as f:
+        f.write(b"mehr")
+    assert not journal.is_done(job, "hash")
+    os.remove(job["output_path"])
+    assert not journal.is_done(job, "hash")
+
+
+def test_is_done_decides_by_content_when_mtime_changes(tmp_path):
+    job, output_dir = make_job(tmp_path)
+    journal = BatchJournal(output_dir)
+    journal.record(job, {"status": "ok"}, "hash")
+    stat = os.stat(job["video_path"])
+    os.utime(job["video_path"], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9)) # nur angefasst
+    assert journal.is_done(job, "hash")
+    with open(job["video_path"], "r+b") as f: # gleiche Größe, anderer Inhalt
+        f.write(b"VIDEO")
+    os.utime(job["video_path"], ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10**9))
+    assert not journal.is_done(job, "hash")
+
+
+def test_truncated_last_line_is_ignored(tmp_path):
+    job, output_dir = make_job(tmp_path)
+    BatchJournal(output_dir).record(job, {"status": "ok"}, "hash")
+    with open(os.path.join(output_dir, JOURNAL_FILENAME), "a", encoding="utf-8") as f:
+        f.write('{"input": "abgebrochen')
+    assert BatchJournal(output_dir).is_done(job, "hash")
@@ -0,0 +1,37 @@
+import pytest
+
+from wz5_engine import parse_renditions
+
+
+def test_parse_renditions_from_text():
+    assert parse_renditions("1080:23, 720:1200k:_mobil,480") == [
+        {"width": None, "height": 1080, "crf": 23, "bitrate": None, "suffix": "_1080p"},
+        {"width": None, "height": 720, "crf": None, "bitrate": 1200, "suffix": "_mobil"},
+        {"width": None, "height": 480, "crf": None, "bitrate": None, "suffix": "_480p"},
+    ]
+
+
+def test_parse_renditions_from_list():
+    assert parse_renditions([{"width": 640, "bitrate": "800k"}]) == [
+        {"width": 640, "height": None, "crf": None, "bitrate": 800, "suffix": "_640w"}]
+
+
+@pytest.mark.parametrize("spec", [None, "", []])
+def test_parse_renditions_empty(spec):
+    assert parse_renditions(spec) is None
+
+
+@pytest.mark.parametrize("spec", [
+    "720:23:_a:x",                          # zu viele Felder
+    "abc",                                  # keine Zahl
+    "0",                                    # nicht > 0
+    "720:60",                               # crf außerhalb 0..51
+    [{"height": 720, "crf": 23, "bitrate": 900}],  # crf und bitrate
+    [{"crf": 23}],                          # weder height noch width
+    "720:23:_a b",                          # ungültiges Suffix
+    "720,720",                              # doppeltes Suffix
+    ["720"],                                # kein dict
+])
+def test_parse_renditions_rejects(spec):
+    with pytest.raises(ValueError):
+        parse_renditions(spec)
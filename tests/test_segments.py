@@ -0,0 +1,25 @@
+from fractions import Fraction
+
+from wz5_engine import plan_segments
+
+TIME_BASE = Fraction(1, 25)
+
+
+def packets_with_gop(total, gop):
+    return [(index, 1, index % gop == 0) for index in range(total)]
+
+
+def test_plan_segments_splits_at_keyframes():
+    # Keyframes alle 10 Frames: Grenzen bei 20, 50 und 70, Suche einen halben Frame vor dem Keyframe
+    assert plan_segments(TIME_BASE, packets_with_gop(100, 10), 4) == [
+        (None, 20, 0.8), (0.78, 30, 1.2), (1.98, 20, 0.8), (2.78, 30, 1.2)]
+
+
+def test_plan_segments_covers_all_frames_and_duration():
+    segments = plan_segments(TIME_BASE, packets_with_gop(250, 25), 3)
+    assert sum(frames for _, frames, _ in segments) == 250
+    assert abs(sum(duration for _, _, duration in segments) - 10.0) < 1e-9
+
+
+def test_plan_segments_without_keyframes_gives_one_segment():
+    assert plan_segments(TIME_BASE, packets_with_gop(50, 1000), 4) == [(None, 50, 2.0)]
@@ -0,0 +1,53 @@
+import threading
+
+import numpy as np
+import pytest
+
+import wz5_engine
+
+
+def run_with_timeout(target, timeout=60):
+    outcome = {}
+    def run():
+        try:
+            outcome["result"] = target()
+        except BaseException as e:
+            outcome["error"] = e
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "watermark_video_stream hängt"
+    return outcome
+
+
+def watermark(size=16):
+    wm = np.zeros((size, size, 4), dtype=np.uint8)
+    wm[..., :3] = 255
+    wm[..., 3] = 128
+    return wm
+
+
+def test_stream_writes_all_frames(clip, tmp_path):
+    output_path = str(tmp_path / "out.mp4")
+    outcome = run_with_timeout(lambda: wz5_engine.watermark_video_stream(clip, output_path, watermark(), (0.5, 0.5), 1))
+    assert "error" not in outcome
+    info = wz5_engine.probe_media(output_path)
+    assert (info["width"], info["height"]) == (160, 90)
+    assert len(wz5_engine.read_video_packets(output_path)[1]) == 50
+
+
+def test_stream_compositor_failure_does_not_hang(clip, tmp_path, monkeypatch):
+    class FailingCompositor(wz5_engine.RoiCompositor):
+        calls = 0
+        def __call__(self, frame):
+            FailingCompositor.calls += 1
+            if FailingCompositor.calls == 3:
+                raise RuntimeError("Compositor kaputt")
+            return super().__call__(frame)
+
+    monkeypatch.setattr(wz5_engine, "RoiCompositor", FailingCompositor)
+    output_path = str(tmp_path / "out.mp4")
+    outcome = run_with_timeout(lambda: wz5_engine.watermark_video_stream(clip, output_path, watermark(), (0.5, 0.5), 1,
+                                                                         ring_slots=2))
+    assert isinstance(outcome.get("error"), RuntimeError)
+    assert str(outcome["error"]) == "Compositor kaputt"
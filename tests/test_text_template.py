@@ -0,0 +1,37 @@
+import datetime
+
+import pytest
+
+from wz5_engine import frame_field_values, parse_text_template, resolve_file_fields, text_template_fields
+
+
+def test_parse_text_template_splits_fields():
+    assert parse_text_template("{name} TC {timecode} #{frame:06d} {{x}}") == [
+        ("", "name", ""), (" TC ", "timecode", ""), (" #", "frame", "06d"), (" {", None, ""), ("x}", None, "")]
+    assert parse_text_template("© BProgy") == [("© BProgy", None, "")]
+    assert text_template_fields("{datum}: {zeit}") == {"datum", "zeit"}
+
+
+@pytest.mark.parametrize("text", ["{unbekannt}", "{frame:xyz}", "{name!r}", "offen {", "zu }"])
+def test_parse_text_template_rejects(text):
+    with pytest.raises(ValueError):
+        parse_text_template(text)
+
+
+def test_frame_field_values_at_25_fps():
+    assert frame_field_values(0, 25.0) == {"timecode": "00:00:00:00", "frame": 0, "zeit": "00:00:00.000"}
+    assert frame_field_values(25 * 3661 + 7, 25.0) == {"timecode": "01:01:01:07", "frame": 91532,
+                                                        "zeit": "01:01:01.280"}
+
+
+def test_frame_field_values_ntsc_counts_nominal_frames():
+    # 29.97 fps: Timecode zählt 30 Frames pro Sekunde (ohne Drop-Frame), die Zeit ist echt
+    values = frame_field_values(30, 30000 / 1001)
+    assert values["timecode"] == "00:00:01:00"
+    assert values["zeit"] == "00:00:01.001"
+
+
+def test_resolve_file_fields_keeps_only_frame_fields():
+    parts = resolve_file_fields("{name} ({dateiname}) {datum} #{frame}", "/videos/clip.mp4",
+                                today=datetime.date(2024, 3, 9))
+    assert parts == [("clip (clip.mp4) 09.03.2024 #", "frame", ""), ("", None, "")]
@@ -0,0 +1,49 @@
+from fractions import Fraction
+
+import pytest
+
+from wz5_engine import parse_time_ranges, plan_range_pieces
+
+TIME_BASE = Fraction(1, 25)
+
+
+def test_parse_time_ranges_sorts_and_merges():
+    assert parse_time_ranges("90-120, 0-30, 20-40,300-") == [(0.0, 40.0), (90.0, 120.0), (300.0, None)]
+    assert parse_time_ranges([[5, None], [10, 20]]) == [(5.0, None)]
+    assert parse_time_ranges([["1.5", "2"]]) == [(1.5, 2.0)]
+
+
+@pytest.mark.parametrize("spec", [None, "", []])
+def test_parse_time_ranges_empty(spec):
+    assert parse_time_ranges(spec) is None
+
+
+@pytest.mark.parametrize("spec", ["10", "a-b", "30-10", "5-5", "-3-4", [[1, 2, 3]], [[0, "inf"]], "nan-"])
+def test_parse_time_ranges_rejects(spec):
+    with pytest.raises(ValueError):
+        parse_time_ranges(spec)
+
+
+def packets_with_gop(total, gop):
+    return [(index, 1, index % gop == 0) for index in range(total)]
+
+
+def test_plan_range_pieces_extends_to_whole_gops():
+    # 250 Frames, Keyframes alle 25 (1 s); 2.2-3.1 s betrifft die GOPs ab Frame 50 und 75
+    assert plan_range_pieces(TIME_BASE, packets_with_gop(250, 25), [(2.2, 3.1)]) == [
+        (0, 50, False), (50, 100, True), (100, 250, False)]
+
+
+def test_plan_range_pieces_merges_touching_spans_and_open_end():
+    pieces = plan_range_pieces(TIME_BASE, packets_with_gop(250, 25), [(0.0, 0.5), (0.9, 1.2), (8.5, None)])
+    assert pieces == [(0, 50, True), (50, 200, False), (200, 250, True)]
+
+
+def test_plan_range_pieces_range_after_end_copies_everything():
+    assert plan_range_pieces(TIME_BASE, packets_with_gop(50, 25), [(10.0, 20.0)]) == [(0, 50, False)]
+
+
+def test_plan_range_pieces_needs_leading_keyframe():
+    packets = [(index, 1, index == 10) for index in range(20)]
+    with pytest.raises(ValueError):
+        plan_range_pieces(TIME_BASE, packets, [(0.0, 0.1)])
@@ -0,0 +1,57 @@
+import os
+import shutil
+import threading
+import time
+
+import pytest
+
+import wz5_engine
+from wz5_engine import FolderWatcher
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("clip.mp4", True),
+    ("Clip.MOV", True),
+    ("notizen.txt", False),
+    (".versteckt.mp4", False),
+    ("clip_wasserzeichen.mp4", False),
+    ("clip_wasserzeichen_360p.mp4", False),  # Ausgabestufe
+    ("clip_wasserzeichen_v01.mp4", False),   # Variante
+    ("clip_wasserzeichen.part.mp4", False),  # Teil-Datei
+    ("clip.part.mp4", False),
+])
+def test_folder_watcher_skips_own_outputs(name, expected):
+    assert FolderWatcher([])._is_candidate(name) is expected
+
+
+def test_watch_worker_survives_failing_jobs(clip, tmp_path, monkeypatch):
+    watch_dir = tmp_path / "eingang"
+    watch_dir.mkdir()
+    for name in ("a.mp4", "b.mp4"):
+        shutil.copy(clip, watch_dir / name)
+
+    def failing_job(job, stop_event=None):
+        raise RuntimeError("Encoder kaputt")
+    def failing_callback(result):
+        results.append(result)
+        raise RuntimeError("Callback kaputt")
+    monkeypatch.setattr(wz5_engine, "process_video_job", failing_job)
+    results = []
+    stop_event = threading.Event()
+    settings = dict(wz5_engine.default_settings(), engine=wz5_engine.ENGINE_FFMPEG)
+    (tmp_path / "ausgang").mkdir()
+    counts = {}
+    thread = threading.Thread(target=lambda: counts.update(wz5_engine.watch_folders(
+        [str(watch_dir)], str(tmp_path / "ausgang"), settings, stop_event, poll_interval=0.05, stable_seconds=0,
+        on_result=failing_callback)), daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 60
+    while len(results) < 2 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    stop_event.set()
+    thread.join(60)
+    assert not thread.is_alive()
+    # ein Worker: beide Dateien wurden trotz Fehlern in Job und Callback gemeldet
+    assert sorted(os.path.basename(r["input"]) for r in results) == ["a.mp4", "b.mp4"]
+    assert all(r["status"] == "error" and "Encoder kaputt" in r["error"] for r in results)
+    assert counts["error"] == 2
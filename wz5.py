@@ -2,82 +2,36 @@
 
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, font, colorchooser
-from PIL import Image, ImageTk, ImageDraw, ImageFont
-import numpy as np
 import os
 import threading
+import concurrent.futures
+import time
 import queue # Obwohl hier nicht aktiv genutzt, gut für komplexere Thread-Kommunikation
 import platform
-import time
 import traceback
 import sys
-import gc
 import ctypes # Für DPI Awareness auf Windows
-import subprocess # Für fc-match auf Linux
+import multiprocessing
+
+from wz5_engine import (
+    DEFAULT_WATERMARK_TEXT, DEFAULT_FONT_SIZE, DEFAULT_FONT_COLOR, DEFAULT_FONT_NAME,
+    ENGINE_FFMPEG, ENGINE_STREAM, ENGINE_LABELS, DEFAULT_ENGINE,
+    FONT_INDEX,
+    LRUCache, PreviewFrameCache, WatermarkError, create_watermark_image, format_duration, format_progress,
+    VIDEO_EXTENSIONS, describe_media, log, parse_renditions, parse_text_template, parse_time_ranges, parse_variants, preflight_probe,
+    render_text_template, run_watermark_batch, to_rgba_hex, warm_up,
+)
 
 # --- Konstanten ---
 # *** NEUER FENSTERTITEL ***
 APP_NAME = "PRO Watermark Software (c) BProgy"
 COLOR_CANVAS_BG = "#E0E0E0"
-DEFAULT_WATERMARK_TEXT = "© BProgy"
-DEFAULT_FONT_SIZE = 40
-DEFAULT_FONT_COLOR = "#FFFFFF" # Weiß
 PREVIEW_SIZE = (480, 270) # Feste Größe für die initiale Vorschau
-
-# --- FFmpeg Konfiguration ---
-FFMPEG_MANUAL_PATH = None # Standard: Automatische Erkennung versuchen
-
-ffmpeg_path_source = "Automatisch via imageio-ffmpeg / System PATH"
-# Logic to find FFmpeg (unchanged)
-if FFMPEG_MANUAL_PATH and os.path.exists(FFMPEG_MANUAL_PATH):
-    os.environ["IMAGEIO_FFMPEG_EXE"] = FFMPEG_MANUAL_PATH
-    ffmpeg_path_source = f"Manuell: {FFMPEG_MANUAL_PATH}"
-    print(f"INFO: Manueller FFmpeg Pfad wird verwendet: {FFMPEG_MANUAL_PATH}")
-elif FFMPEG_MANUAL_PATH:
-    print(f"WARNUNG: Manueller FFmpeg Pfad '{FFMPEG_MANUAL_PATH}' existiert nicht. Versuche automatische Erkennung.")
-else:
-    if "IMAGEIO_FFMPEG_EXE" in os.environ:
-        try:
-            from imageio_ffmpeg import get_ffmpeg_exe
-            default_exe = get_ffmpeg_exe()
-            print(f"INFO: Verwende FFmpeg von imageio-ffmpeg: {default_exe}")
-            os.environ["IMAGEIO_FFMPEG_EXE"] = default_exe
-            ffmpeg_path_source = f"Automatisch via imageio-ffmpeg: {default_exe}"
-        except Exception:
-             if "IMAGEIO_FFMPEG_EXE" in os.environ:
-                 del os.environ["IMAGEIO_FFMPEG_EXE"]
-             print("INFO: Versuche FFmpeg über System PATH zu finden.")
-             ffmpeg_path_source = "System PATH"
-    else:
-         # Try to get path from imageio-ffmpeg if available but not set in env
-         try:
-             from imageio_ffmpeg import get_ffmpeg_exe
-             default_exe = get_ffmpeg_exe()
-             print(f"INFO: Verwende FFmpeg von imageio-ffmpeg (implizit): {default_exe}")
-             os.environ["IMAGEIO_FFMPEG_EXE"] = default_exe # Set for consistency
-             ffmpeg_path_source = f"Automatisch via imageio-ffmpeg: {default_exe}"
-         except Exception:
-             print("INFO: Versuche FFmpeg über System PATH zu finden (imageio-ffmpeg nicht gefunden/konfiguriert).")
-             ffmpeg_path_source = "System PATH"
-
-
-# --- MoviePy Setup ---
-MOVIEPY_AVAILABLE = False
-VideoFileClip = None
-ImageClip = None
-CompositeVideoClip = None
-try:
-    from moviepy.video.io.VideoFileClip import VideoFileClip
-    from moviepy.video.VideoClip import ImageClip, TextClip
-    from moviepy.video.compositing.CompositeVideoClip import CompositeVideoClip
-    MOVIEPY_AVAILABLE = True
-    print("INFO: MoviePy erfolgreich importiert.")
-except ImportError:
-    print("FEHLER: MoviePy konnte nicht importiert werden. Stelle sicher, dass es installiert ist (`pip install moviepy`).")
-    messagebox.showerror("Import Fehler", "MoviePy konnte nicht gefunden werden.\nBitte installiere es (`pip install moviepy`) und starte die Anwendung neu.")
-except Exception as e:
-    print(f"FEHLER beim Import von MoviePy: {e}")
-    messagebox.showerror("Import Fehler", f"Ein Fehler ist beim Import von MoviePy aufgetreten:\n{e}")
+WATERMARK_CACHE_SIZE = 64 # Anzahl gerenderter Wasserzeichen (Bild, Array, PhotoImage) im LRU-Cache
+CLOSE_WAIT_TIMEOUT = 10.0 # Sekunden, die beim Schließen auf das Beenden laufender Encodes gewartet wird
+MAX_LISTED_FILES = 15 # Dateinamen im Abbruch-Dialog
+PREVIEW_SCRUB_STEPS = 200 # Raster des Zeit-Schiebereglers (Cache-Treffer beim Hin- und Herziehen)
+FALLBACK_FONTS = ["Arial", "Times New Roman", "Verdana", "Tahoma", "Courier New"]
 
 
 # --- Hauptklasse ---
@@ -92,34 +46,87 @@ class VideoWatermarkerApp:
         if platform.system() == "Windows":
             try:
                 ctypes.windll.shcore.SetProcessDpiAwareness(1)
-                print("INFO: DPI Awareness für Windows aktiviert.")
+                log("info", "DPI Awareness für Windows aktiviert.")
             except Exception as e:
-                print(f"WARNUNG: Konnte DPI Awareness nicht setzen: {e}")
+                log("warning", f"Konnte DPI Awareness nicht setzen: {e}")
+
+        # Font-Index im Hintergrund laden/aufbauen, bevor die erste Vorschau ihn braucht
+        FONT_INDEX.build_in_background()
 
         self._setup_variables()
         self._create_widgets()
-        # Add FFmpeg path info to status bar initially
-        self.status_var.set(f"Bereit. (FFmpeg: {ffmpeg_path_source})")
         self._update_preview()
 
         self.processing_thread = None
         self.stop_processing_flag = threading.Event()
+        self.is_closing = False
 
-        if not MOVIEPY_AVAILABLE:
-             self.status_var.set("FEHLER: MoviePy nicht verfügbar! Verarbeitung nicht möglich.")
-             if hasattr(self, 'start_button'):
-                self.start_button.config(state=tk.DISABLED)
+        # Fenster sofort zeigen: Schriftliste nach dem ersten Zeichnen, FFmpeg-Suche und
+        # MoviePy-Import im Hintergrund; der Start-Button wird danach freigegeben.
+        self.engine_status = None # Ergebnis von warm_up(), None solange es läuft
+        self.status_var.set("Initialisiere (FFmpeg und MoviePy werden geladen)...")
+        self.root.after(1, self._load_font_families)
+        threading.Thread(target=self._warm_up, name="wz5-warmup", daemon=True).start()
+
+
+    def _warm_up(self):
+        """Hintergrund-Thread: teure Importe und FFmpeg-Suche, Ergebnis zurück in den Tk-Thread."""
+        try:
+            status = warm_up()
+        except Exception as e:
+            log("error", f"Initialisierung fehlgeschlagen: {e}\n{traceback.format_exc()}")
+            status = {"ffmpeg_exe": None, "ffmpeg_source": "nicht gefunden", "moviepy_available": False,
+                      "moviepy_error": str(e), "ffmpeg_s": 0.0, "moviepy_s": 0.0}
+        if not self.is_closing:
+            self.root.after(0, self._warm_up_finished, status)
+
+
+    def _warm_up_finished(self, status):
+        self.engine_status = status
+        log("info", f"Initialisierung fertig (FFmpeg {status['ffmpeg_s']:.2f}s, MoviePy {status['moviepy_s']:.2f}s).")
+        if status["moviepy_error"]:
+            messagebox.showerror("Import Fehler", status["moviepy_error"])
+        if status["moviepy_available"]:
+            self.status_var.set(f"Bereit. (FFmpeg: {status['ffmpeg_source']})")
+        elif status["ffmpeg_exe"]:
+            self.status_var.set("WARNUNG: MoviePy nicht verfügbar! Nur die FFmpeg-Engine kann genutzt werden.")
+        else:
+            self.status_var.set("FEHLER: MoviePy nicht verfügbar! Verarbeitung nicht möglich.")
+        if (status["moviepy_available"] or status["ffmpeg_exe"]) and not (self.processing_thread and self.processing_thread.is_alive()):
+            self.start_button.config(state=tk.NORMAL)
+
+
+    def _load_font_families(self):
+        """Füllt die Schriftauswahl (font.families() ist auf manchen Systemen langsam)."""
+        try:
+            available_fonts = sorted([f for f in font.families() if not f.startswith('@')])
+        except Exception as e:
+             log("warning", f"Konnte System-Schriftarten nicht laden: {e}. Verwende Standardliste.")
+             available_fonts = FALLBACK_FONTS
+        if not available_fonts: available_fonts = FALLBACK_FONTS
+        self.font_combo.config(values=available_fonts)
+        if self.selected_font.get() not in available_fonts:
+            self.selected_font.set(available_fonts[0])
+            self._update_preview_safe()
 
 
     def _setup_variables(self):
         """Initialisiert die Tkinter-Variablen und Zustandsvariablen."""
         self.video_files = []
+        self.media_infos = {} # Pfad -> (info, Fehler) aus der Vorab-Analyse
         self.output_folder = tk.StringVar(value="")
         self.watermark_text = tk.StringVar(value=DEFAULT_WATERMARK_TEXT)
         self.font_size = tk.IntVar(value=DEFAULT_FONT_SIZE)
-        self.selected_font = tk.StringVar(value="Arial")
+        self.selected_font = tk.StringVar(value=DEFAULT_FONT_NAME)
         self.font_color = tk.StringVar(value=DEFAULT_FONT_COLOR)
         self.font_style = tk.StringVar(value="Normal")
+        self.engine_label = tk.StringVar(value=ENGINE_LABELS[DEFAULT_ENGINE])
+        self.worker_count = tk.IntVar(value=1) # Anzahl parallel laufender Encodes (Prozesse)
+        self.resume_batch = tk.BooleanVar(value=True) # laut Journal fertige, unveränderte Videos überspringen
+        self.relative_size = tk.BooleanVar(value=False) # Größe als Anteil der Videohöhe (wie in der Vorschau) statt px
+        self.renditions_spec = tk.StringVar(value="") # Ausgabestufen, z.B. "1080:23,720:1500k"; leer = Originalgröße
+        self.time_ranges_spec = tk.StringVar(value="") # Zeitbereiche mit Wasserzeichen, z.B. "0-30,90-"; leer = ganzes Video
+        self.variants_spec = tk.StringVar(value="") # Varianten-Texte (je Empfänger eine Ausgabe), ";"-getrennt; leer = eine Ausgabe
 
         self.preview_image = None
         self.preview_photo = None
@@ -128,6 +135,20 @@ class VideoWatermarkerApp:
         self.preview_position = (0.5, 0.5)
         self.preview_drag_start_pos = None
         self.preview_wm_item = None
+        self.preview_wm_key = None # Cache-Schlüssel des aktuell angezeigten Wasserzeichens
+        # (Text, Font, Größe, RGBA) -> {"image", "array", "photo", "scaled"}
+        self.watermark_cache = LRUCache(WATERMARK_CACHE_SIZE)
+
+        # Vorschau-Frames: Dekodieren/Skalieren im Hintergrund, Cache im Speicher und auf der Festplatte
+        self.preview_frame_cache = PreviewFrameCache()
+        self.preview_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self.preview_request_id = 0 # Nur das Ergebnis der neuesten Anfrage wird angezeigt
+        self.preview_video = None
+        self.preview_video_size = None # (Breite, Höhe) des Videos, sobald der erste Frame da ist
+        self.preview_frame_item = None
+        self.preview_frame_photo = None
+        self.scrub_var = tk.DoubleVar(value=0.0)
+        self.scrub_time_var = tk.StringVar(value="")
 
         self.scale_x = 1.0
         self.scale_y = 1.0
@@ -158,8 +179,9 @@ class VideoWatermarkerApp:
         btn_select_videos = ttk.Button(file_frame, text="1. Videos auswählen", command=self.select_videos)
         btn_select_videos.pack(fill=tk.X, pady=2)
 
-        self.video_listbox = tk.Listbox(file_frame, height=6, selectmode=tk.SINGLE)
+        self.video_listbox = tk.Listbox(file_frame, height=6, selectmode=tk.SINGLE, exportselection=False)
         self.video_listbox.pack(fill=tk.X, expand=True, pady=2)
+        self.video_listbox.bind("<<ListboxSelect>>", self._on_video_selected)
         list_scrollbar = ttk.Scrollbar(self.video_listbox, orient=tk.VERTICAL, command=self.video_listbox.yview)
         list_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.video_listbox.config(yscrollcommand=list_scrollbar.set)
@@ -185,16 +207,8 @@ class VideoWatermarkerApp:
 
         # Schriftart
         ttk.Label(wm_frame, text="Schriftart:").grid(row=1, column=0, sticky="w", padx=2, pady=2)
-        try:
-            available_fonts = sorted([f for f in font.families() if not f.startswith('@')])
-        except Exception as e:
-             print(f"WARNUNG: Konnte System-Schriftarten nicht laden: {e}. Verwende Standardliste.")
-             available_fonts = ["Arial", "Times New Roman", "Verdana", "Tahoma", "Courier New"]
-        if not available_fonts: available_fonts = ["Arial", "Times New Roman", "Verdana"]
-        if self.selected_font.get() not in available_fonts:
-            self.selected_font.set(available_fonts[0])
-
-        self.font_combo = ttk.Combobox(wm_frame, textvariable=self.selected_font, values=available_fonts, state="readonly")
+        # Liste der System-Schriftarten folgt in _load_font_families, sobald das Fenster steht
+        self.font_combo = ttk.Combobox(wm_frame, textvariable=self.selected_font, values=[self.selected_font.get()], state="readonly")
         self.font_combo.grid(row=1, column=1, columnspan=2, sticky="ew", padx=2, pady=2)
         self.font_combo.bind("<<ComboboxSelected>>", lambda event: self._update_preview_safe())
 
@@ -218,9 +232,34 @@ class VideoWatermarkerApp:
         process_frame = ttk.LabelFrame(left_frame, text="Verarbeitung", padding="10")
         process_frame.pack(fill=tk.X, pady=(0, 10))
 
+        engine_row = ttk.Frame(process_frame)
+        engine_row.pack(fill=tk.X, pady=(0, 5))
+        ttk.Label(engine_row, text="Engine:").pack(side=tk.LEFT, padx=(2, 5))
+        self.engine_combo = ttk.Combobox(engine_row, textvariable=self.engine_label, values=list(ENGINE_LABELS.values()), state="readonly")
+        self.engine_combo.pack(side=tk.LEFT, fill=tk.X, expand=True)
+
+        workers_row = ttk.Frame(process_frame)
+        workers_row.pack(fill=tk.X, pady=(0, 5))
+        ttk.Label(workers_row, text="Parallele Jobs:").pack(side=tk.LEFT, padx=(2, 5))
+        ttk.Spinbox(workers_row, from_=1, to=os.cpu_count() or 4, textvariable=self.worker_count, width=6).pack(side=tk.LEFT)
+        renditions_row = ttk.Frame(process_frame)
+        renditions_row.pack(fill=tk.X, pady=(0, 5))
+        ttk.Label(renditions_row, text="Ausgabestufen:").pack(side=tk.LEFT, padx=(2, 5))
+        ttk.Entry(renditions_row, textvariable=self.renditions_spec).pack(side=tk.LEFT, fill=tk.X, expand=True)
+        time_ranges_row = ttk.Frame(process_frame)
+        time_ranges_row.pack(fill=tk.X, pady=(0, 5))
+        ttk.Label(time_ranges_row, text="Zeitbereiche (s):").pack(side=tk.LEFT, padx=(2, 5))
+        ttk.Entry(time_ranges_row, textvariable=self.time_ranges_spec).pack(side=tk.LEFT, fill=tk.X, expand=True)
+        variants_row = ttk.Frame(process_frame)
+        variants_row.pack(fill=tk.X, pady=(0, 5))
+        ttk.Label(variants_row, text="Varianten (Texte):").pack(side=tk.LEFT, padx=(2, 5))
+        ttk.Entry(variants_row, textvariable=self.variants_spec).pack(side=tk.LEFT, fill=tk.X, expand=True)
+        ttk.Checkbutton(process_frame, text="Größe relativ zur Videohöhe", variable=self.relative_size).pack(anchor="w", pady=(0, 5))
+        ttk.Checkbutton(process_frame, text="Bereits fertige überspringen", variable=self.resume_batch).pack(anchor="w", pady=(0, 5))
+
         self.start_button = ttk.Button(process_frame, text="3. Wasserzeichen hinzufügen", command=self.start_processing_thread)
         self.start_button.pack(fill=tk.X, pady=5)
-        if not MOVIEPY_AVAILABLE: self.start_button.config(state=tk.DISABLED)
+        self.start_button.config(state=tk.DISABLED) # bis warm_up() fertig ist
 
         self.stop_button = ttk.Button(process_frame, text="Verarbeitung abbrechen", command=self.stop_processing, state=tk.DISABLED)
         self.stop_button.pack(fill=tk.X, pady=5)
@@ -241,6 +280,14 @@ class VideoWatermarkerApp:
         self.preview_canvas = tk.Canvas(preview_frame, bg=COLOR_CANVAS_BG, width=PREVIEW_SIZE[0], height=PREVIEW_SIZE[1])
         self.preview_canvas.pack(fill=tk.BOTH, expand=True)
 
+        scrub_row = ttk.Frame(preview_frame)
+        scrub_row.pack(fill=tk.X, pady=(5, 0))
+        self.scrub_scale = ttk.Scale(scrub_row, from_=0, to=PREVIEW_SCRUB_STEPS, orient="horizontal",
+                                     variable=self.scrub_var, command=self._on_scrub)
+        self.scrub_scale.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.scrub_scale.state(["disabled"])
+        ttk.Label(scrub_row, textvariable=self.scrub_time_var, width=18, anchor="e").pack(side=tk.RIGHT, padx=(5, 0))
+
         self.preview_canvas.bind("<Configure>", self._on_canvas_resize)
         self.preview_canvas.bind("<ButtonPress-1>", self._start_drag)
         self.preview_canvas.bind("<B1-Motion>", self._on_drag)
@@ -252,7 +299,7 @@ class VideoWatermarkerApp:
     def select_videos(self):
         """Öffnet den Dateidialog zur Auswahl von Videodateien."""
         filetypes = [
-            ("Video Dateien", "*.mp4 *.avi *.mov *.mkv *.wmv *.flv"),
+            ("Video Dateien", " ".join(f"*{ext}" for ext in VIDEO_EXTENSIONS)),
             ("Alle Dateien", "*.*")
         ]
         initial_dir = getattr(self, "_last_video_dir", "/")
@@ -260,24 +307,76 @@ class VideoWatermarkerApp:
         if selected_files:
             self._last_video_dir = os.path.dirname(selected_files[0])
             current_files = set(self.video_files)
-            new_files_added = False
+            new_files = []
             for f in selected_files:
                 if f not in current_files:
                     self.video_files.append(f)
                     self.video_listbox.insert(tk.END, os.path.basename(f))
                     current_files.add(f)
-                    new_files_added = True
+                    new_files.append(f)
+            new_files_added = bool(new_files)
             if new_files_added:
-                self.status_var.set(f"{len(self.video_files)} Video(s) ausgewählt.")
+                self.status_var.set(f"{len(self.video_files)} Video(s) ausgewählt, Analyse läuft...")
+                threading.Thread(target=self._preflight_files, args=(new_files,), name="wz5-preflight", daemon=True).start()
+                if self.preview_video is None: # Vorschau zeigt zunächst das erste Video
+                    self.video_listbox.selection_set(0)
+                    self._on_video_selected()
             else:
                  self.status_var.set(f"Keine neuen Videos hinzugefügt. Gesamt: {len(self.video_files)}")
 
 
+    def _preflight_files(self, paths):
+        """Hintergrund-Thread: neue Dateien parallel analysieren, jede Zeile sofort aktualisieren."""
+        try:
+            preflight_probe(paths, on_result=lambda path, info, error: self.root.after(0, self._show_media_info, path, info, error))
+        except Exception as e:
+            log("warning", f"Vorab-Analyse nicht möglich: {e}")
+            return
+        if not self.is_closing:
+            self.root.after(0, self._preflight_finished)
+
+
+    def _show_media_info(self, path, info, error):
+        """Schreibt Eckdaten (oder den Ablehnungsgrund) in die Zeile der Datei (Tk-Hauptthread)."""
+        if self.is_closing or path not in self.video_files:
+            return # Liste wurde inzwischen geleert
+        self.media_infos[path] = (info, error)
+        index = self.video_files.index(path)
+        selected = index in self.video_listbox.curselection()
+        label = f"{os.path.basename(path)}  –  {describe_media(info) if info else 'ABGELEHNT: ' + error}"
+        self.video_listbox.delete(index)
+        self.video_listbox.insert(index, label)
+        if error:
+            self.video_listbox.itemconfig(index, foreground="red")
+        if selected:
+            self.video_listbox.selection_set(index)
+
+
+    def _preflight_finished(self):
+        rejected = sum(1 for path in self.video_files if self.media_infos.get(path, (None, None))[1])
+        message = f"{len(self.video_files)} Video(s) ausgewählt."
+        if rejected:
+            message += f" {rejected} davon nicht verarbeitbar (rot markiert, werden abgelehnt)."
+        self.status_var.set(message)
+
+
     def clear_video_list(self):
         """Entfernt alle Videos aus der Liste."""
         self.video_files = []
+        self.media_infos = {}
         self.video_listbox.delete(0, tk.END)
         self.status_var.set("Videoliste geleert.")
+        self.preview_request_id += 1 # laufende Frame-Anfragen verwerfen
+        self.preview_video = None
+        self.preview_video_size = None
+        if self.preview_frame_item:
+            self.preview_canvas.delete(self.preview_frame_item)
+            self.preview_frame_item = None
+        self.preview_frame_photo = None
+        self.scrub_var.set(0.0)
+        self.scrub_time_var.set("")
+        self.scrub_scale.state(["disabled"])
+        self._update_preview_safe()
 
     def select_output_folder(self):
         """Öffnet den Dialog zur Auswahl des Ausgabeordners."""
@@ -298,13 +397,107 @@ class VideoWatermarkerApp:
                 self._update_preview_safe()
         except Exception as e:
              messagebox.showerror("Farbwahl Fehler", f"Konnte die Farbauswahl nicht öffnen:\n{e}")
-             print(f"ERROR: Color Chooser failed: {e}")
+             log("error", f"Farbauswahl fehlgeschlagen: {e}")
 
     def _on_canvas_resize(self, event):
-        """Wird aufgerufen, wenn die Größe des Canvas geändert wird."""
+        """Wird aufgerufen, wenn die Größe des Canvas geändert wird (nur Neupositionierung)."""
         if hasattr(self, "_resize_job"):
              self.root.after_cancel(self._resize_job)
-        self._resize_job = self.root.after(100, self._update_preview_safe)
+        if self.preview_video:
+             # Frame neu skalieren (aus dem Cache); das Wasserzeichen skaliert mit
+             self._resize_job = self.root.after(100, self._request_preview_frame)
+        elif self.preview_wm_item:
+             self._resize_job = self.root.after(100, self._place_preview_watermark)
+        else:
+             self._resize_job = self.root.after(100, self._update_preview_safe)
+
+
+    def _on_video_selected(self, event=None):
+        """Zeigt das in der Liste gewählte Video in der Vorschau."""
+        selection = self.video_listbox.curselection()
+        if not selection:
+            return
+        video_path = self.video_files[selection[0]]
+        if video_path != self.preview_video:
+            self.preview_video = video_path
+            self.scrub_var.set(0.0)
+            self.scrub_scale.state(["!disabled"])
+        self._request_preview_frame()
+
+
+    def _on_scrub(self, value):
+        """Schieberegler bewegt: Frame an der neuen Stelle anfordern (blockiert die GUI nicht)."""
+        self._request_preview_frame()
+
+
+    def _request_preview_frame(self):
+        """Stellt eine Frame-Anfrage in den Vorschau-Thread; ältere Anfragen verfallen."""
+        if not self.preview_video:
+            return
+        canvas_size = (self.preview_canvas.winfo_width(), self.preview_canvas.winfo_height())
+        if canvas_size[0] <= 1 or canvas_size[1] <= 1:
+            return
+        self.preview_request_id += 1
+        step = int(round(self.scrub_var.get()))
+        self.preview_executor.submit(self._load_preview_frame, self.preview_request_id, self.preview_video,
+                                     step / PREVIEW_SCRUB_STEPS, canvas_size)
+
+
+    def _load_preview_frame(self, request_id, video_path, fraction, canvas_size):
+        """Läuft im Vorschau-Thread: Frame aus dem Cache holen oder dekodieren und auf Canvas-Größe skalieren."""
+        if request_id != self.preview_request_id:
+            return # inzwischen überholt (z. B. schnelles Ziehen am Regler)
+        from PIL import Image
+        try:
+            info = self.preview_frame_cache.media_info(video_path)
+            time_s = round(fraction * info["duration"], 3) if info["duration"] else 0.0
+            frame = self.preview_frame_cache.get_frame(video_path, time_s)
+            if request_id != self.preview_request_id:
+                return
+            scale = min(canvas_size[0] / frame.width, canvas_size[1] / frame.height)
+            display = frame.resize((max(1, int(frame.width * scale)), max(1, int(frame.height * scale))), Image.BILINEAR)
+        except Exception as e:
+            log("warning", f"Vorschau-Frame für '{os.path.basename(video_path)}' nicht verfügbar: {e}")
+            self.root.after(0, self.scrub_time_var.set, "Keine Vorschau")
+            return
+        self.root.after(0, self._show_preview_frame, request_id, info, time_s, display)
+
+
+    def _show_preview_frame(self, request_id, info, time_s, display):
+        """Zeigt einen fertig skalierten Frame an (Tk-Hauptthread)."""
+        if request_id != self.preview_request_id or self.is_closing:
+            return
+        from PIL import ImageTk
+        self.preview_video_size = (info["width"], info["height"])
+        self.preview_frame_photo = ImageTk.PhotoImage(display) # Referenz halten (Tk)
+        area_x, area_y, _, _ = self._preview_area()
+        if self.preview_frame_item:
+            self.preview_canvas.itemconfig(self.preview_frame_item, image=self.preview_frame_photo)
+            self.preview_canvas.coords(self.preview_frame_item, area_x, area_y)
+        else:
+            self.preview_frame_item = self.preview_canvas.create_image(area_x, area_y, anchor=tk.NW, image=self.preview_frame_photo)
+        self.preview_canvas.lower(self.preview_frame_item)
+        self.scrub_time_var.set(f"{format_duration(time_s)} / {format_duration(info['duration'])}")
+        self._update_preview() # Wasserzeichen-Maßstab folgt der Frame-Größe
+
+
+    def _preview_area(self):
+        """Bereich (x, y, Breite, Höhe) des Videobilds im Canvas; ohne Video das ganze Canvas."""
+        canvas_width = self.preview_canvas.winfo_width()
+        canvas_height = self.preview_canvas.winfo_height()
+        if not self.preview_video_size:
+            return 0, 0, canvas_width, canvas_height
+        video_w, video_h = self.preview_video_size
+        scale = min(canvas_width / video_w, canvas_height / video_h)
+        area_w, area_h = int(video_w * scale), int(video_h * scale)
+        return (canvas_width - area_w) // 2, (canvas_height - area_h) // 2, area_w, area_h
+
+
+    def _preview_display_scale(self):
+        """Maßstab Video -> Vorschau (1.0 ohne Video), damit das Wasserzeichen maßstabsgetreu erscheint."""
+        if not self.preview_video_size:
+            return 1.0
+        return self._preview_area()[2] / self.preview_video_size[0]
 
 
     def _start_drag(self, event):
@@ -321,9 +514,8 @@ class VideoWatermarkerApp:
         """Verschiebt das Wasserzeichen-Vorschaubild auf dem Canvas, wenn gezogen wird."""
         if not self.preview_wm_item or self.preview_drag_start_pos is None: return
 
-        canvas_width = self.preview_canvas.winfo_width()
-        canvas_height = self.preview_canvas.winfo_height()
-        if canvas_width <= 1 or canvas_height <= 1: return
+        area_x, area_y, area_w, area_h = self._preview_area()
+        if area_w <= 1 or area_h <= 1: return
 
         dx = event.x - self.preview_drag_start_pos[0]
         dy = event.y - self.preview_drag_start_pos[1]
@@ -335,8 +527,8 @@ class VideoWatermarkerApp:
         if self.watermark_preview_image:
             wm_width = self.watermark_preview_image.width
             wm_height = self.watermark_preview_image.height
-            new_x = max(0, min(new_x, canvas_width - wm_width))
-            new_y = max(0, min(new_y, canvas_height - wm_height))
+            new_x = max(area_x, min(new_x, area_x + area_w - wm_width))
+            new_y = max(area_y, min(new_y, area_y + area_h - wm_height))
         else:
             wm_width, wm_height = 0, 0
 
@@ -344,7 +536,7 @@ class VideoWatermarkerApp:
 
         center_x = new_x + wm_width / 2
         center_y = new_y + wm_height / 2
-        self.preview_position = (center_x / canvas_width, center_y / canvas_height)
+        self.preview_position = ((center_x - area_x) / area_w, (center_y - area_y) / area_h)
         self.preview_drag_start_pos = (event.x, event.y)
 
 
@@ -362,157 +554,42 @@ class VideoWatermarkerApp:
                    self.root.after_cancel(self._update_job)
               self._update_job = self.root.after(50, self._update_preview)
          except Exception as e:
-              print(f"WARNUNG: Fehler beim Planen des Preview-Updates (ignoriert): {e}")
+              log("warning", f"Fehler beim Planen des Preview-Updates (ignoriert): {e}")
 
     # --- Kernlogik ---
 
     def create_watermark_image(self, text, font_name, font_size, font_color_hex):
-        """Erstellt ein PIL Bild mit dem Wasserzeichentext. Verbesserte Font-Suche."""
-        pil_font = None
-        font_path_used = "PIL Standard (Fallback)"
-
-        if not text or font_size <= 0: return None
-
+        """Erstellt das Wasserzeichen über wz5_engine und zeigt Fehler als Dialog an."""
         try:
-            print(f"INFO: Versuche Font '{font_name}' direkt zu laden...")
-            pil_font = ImageFont.truetype(font_name, font_size)
-            font_path_used = f"'{font_name}' (direkt gefunden)"
-            print(f"INFO: Font '{font_name}' direkt geladen.")
-        except IOError:
-            print(f"INFO: Font '{font_name}' nicht direkt gefunden. Versuche Varianten...")
-            common_extensions = ['.ttf', '.otf']
-            font_search_paths = []
-            system = platform.system()
-
-            # Add system font directories
-            if system == "Windows":
-                win_font_dir = os.path.join(os.environ.get('WINDIR', 'C:\\Windows'), 'Fonts')
-                if os.path.isdir(win_font_dir): font_search_paths.append(win_font_dir)
-            elif system == "Linux":
-                linux_paths = [os.path.expanduser("~/.fonts"), "/usr/local/share/fonts", "/usr/share/fonts"]
-                font_search_paths.extend([p for p in linux_paths if os.path.isdir(p)])
-            elif system == "Darwin":
-                 mac_paths = [os.path.expanduser("~/Library/Fonts"), "/Library/Fonts", "/System/Library/Fonts"]
-                 font_search_paths.extend([p for p in mac_paths if os.path.isdir(p)])
-
-            found_path = None
-            variations = [font_name, font_name.lower()]
-            if ' ' in font_name: variations.append(font_name.replace(" ", ""))
-
-            for name_var in variations:
-                 if found_path: break
-                 for ext in common_extensions:
-                    if found_path: break
-                    font_filename = f"{name_var}{ext}"
-                    try:
-                        print(f"INFO: Versuche '{font_filename}'...")
-                        pil_font = ImageFont.truetype(font_filename, font_size)
-                        font_path_used = f"'{font_filename}' (mit Endung gefunden)"
-                        print(f"INFO: Font '{font_filename}' geladen.")
-                        found_path = font_filename
-                        break
-                    except IOError:
-                        for search_dir in font_search_paths:
-                            # Recursive search within the directory
-                            for root_dir, _, files in os.walk(search_dir):
-                                if font_filename.lower() in [f.lower() for f in files]: # Case-insensitive check
-                                    # Find the exact filename match (case might matter for loading)
-                                    matching_files = [f for f in files if f.lower() == font_filename.lower()]
-                                    if not matching_files: continue
-                                    explicit_path = os.path.join(root_dir, matching_files[0])
-
-                                    if found_path: break # Already found in a previous iteration
-                                    try:
-                                        print(f"INFO: Versuche expliziten Pfad '{explicit_path}'...")
-                                        pil_font = ImageFont.truetype(explicit_path, font_size)
-                                        font_path_used = f"'{explicit_path}' (explizit gefunden)"
-                                        print(f"INFO: Font '{explicit_path}' geladen.")
-                                        found_path = explicit_path
-                                        break
-                                    except IOError:
-                                        print(f"WARNUNG: Font existiert bei '{explicit_path}', aber Laden fehlgeschlagen.")
-                                        continue # Check next potential match
-                            if found_path: break
-                 if found_path: break
-
-            if not pil_font and system == "Linux":
-                 # fc-match logic (unchanged)
-                 try:
-                     print(f"INFO: Versuche Font '{font_name}' via fc-match...")
-                     search_name = font_name # Use original name for fc-match
-                     proc = subprocess.Popen(['fc-match', '--format=%{file}', search_name], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-                     stdout, stderr = proc.communicate(timeout=2) # Add timeout
-                     fc_path = stdout.decode().strip()
-                     if fc_path and os.path.exists(fc_path):
-                         try:
-                             pil_font = ImageFont.truetype(fc_path, font_size)
-                             font_path_used = f"'{fc_path}' (via fc-match)"
-                             print(f"INFO: Font '{font_name}' via fc-match gefunden und geladen: {fc_path}")
-                         except IOError as fc_load_err:
-                              print(f"WARNUNG: Font '{fc_path}' via fc-match gefunden, aber Laden fehlgeschlagen: {fc_load_err}")
-                     else:
-                          # Try lowercase for fc-match as well
-                          search_name_lower = font_name.lower()
-                          if search_name != search_name_lower:
-                            print(f"INFO: Versuche Font '{search_name_lower}' via fc-match...")
-                            proc = subprocess.Popen(['fc-match', '--format=%{file}', search_name_lower], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-                            stdout, stderr = proc.communicate(timeout=2)
-                            fc_path = stdout.decode().strip()
-                            if fc_path and os.path.exists(fc_path):
-                                try:
-                                    pil_font = ImageFont.truetype(fc_path, font_size)
-                                    font_path_used = f"'{fc_path}' (via fc-match, lowercase)"
-                                    print(f"INFO: Font '{font_name}' via fc-match (lowercase) gefunden und geladen: {fc_path}")
-                                except IOError as fc_load_err:
-                                    print(f"WARNUNG: Font '{fc_path}' via fc-match (lowercase) gefunden, aber Laden fehlgeschlagen: {fc_load_err}")
-                            else:
-                                 print(f"INFO: fc-match für '{font_name}'/'{search_name_lower}' fehlgeschlagen oder Pfad ungültig. Stderr: {stderr.decode().strip()}")
-                          else:
-                                print(f"INFO: fc-match für '{font_name}' fehlgeschlagen oder Pfad ungültig. Stderr: {stderr.decode().strip()}")
-
-                 except (ImportError, FileNotFoundError, subprocess.TimeoutExpired, Exception) as fc_e:
-                      print(f"INFO: fc-match Versuch fehlgeschlagen: {fc_e}")
-
-
-        if not pil_font:
-            try:
-                print(f"WARNUNG: Konnte Font '{font_name}' nach mehreren Versuchen nicht finden. Verwende PIL Standard-Font (Größe wird ignoriert!).")
-                pil_font = ImageFont.load_default()
-                font_path_used = "PIL Standard (Fallback - keine Größenänderung)"
-            except Exception as def_e:
-                print(f"FATAL: Konnte auch Standard-Font nicht laden: {def_e}")
-                if hasattr(self, 'root'):
-                     self.root.after(0, messagebox.showerror, "Schriftart Fehler", f"Konnte weder '{font_name}' noch die Standard-Schriftart laden.\n{def_e}")
-                return None
+            return create_watermark_image(text, font_name, font_size, font_color_hex)
+        except WatermarkError as e:
+            self.root.after(0, messagebox.showerror, e.title, str(e))
+            return None
 
-        try:
-            text_bbox = pil_font.getbbox(text)
-            text_width = text_bbox[2] - text_bbox[0]
-            text_height = text_bbox[3] - text_bbox[1]
-            padding_x = max(5, int(font_size * 0.1))
-            padding_y = max(3, int(font_size * 0.05))
-            img_width = text_width + 2 * padding_x
-            img_height = text_height + 2 * padding_y
-
-            image = Image.new("RGBA", (img_width, img_height), (0, 0, 0, 0))
-            draw = ImageDraw.Draw(image)
-            draw_x = padding_x - text_bbox[0]
-            draw_y = padding_y - text_bbox[1]
-            draw.text((draw_x, draw_y), text, font=pil_font, fill=font_color_hex)
-
-            print(f"INFO: Wasserzeichenbild erstellt mit Font: {font_path_used}, Größe: {font_size}")
-            return image
 
-        except Exception as e:
-            print(f"FEHLER beim Erstellen des Wasserzeichenbildes mit Font '{font_path_used}': {e}\n{traceback.format_exc()}")
-            if hasattr(self, 'root'):
-                 self.root.after(0, messagebox.showerror, "Bild Erstellungsfehler", f"Fehler beim Zeichnen des Wasserzeichens:\n{e}")
-            return None
+    def _get_watermark_bitmap(self, text, font_name, font_size, font_color_rgba, with_photo=True):
+        """Liefert das gerenderte Wasserzeichen aus dem LRU-Cache oder rendert es einmalig.
+
+        Das PhotoImage wird nur im Tk-Hauptthread erzeugt (with_photo=True).
+        PIL und NumPy werden erst hier geladen, nicht beim Programmstart.
+        """
+        import numpy as np
+        from PIL import ImageTk
+        key = (text, font_name, font_size, font_color_rgba)
+        entry = self.watermark_cache.get(key)
+        if entry is None:
+            image = self.create_watermark_image(text, font_name, font_size, font_color_rgba)
+            if not image:
+                return key, None
+            entry = {"image": image, "array": np.asarray(image), "photo": None, "scaled": None}
+            self.watermark_cache.put(key, entry)
+        if with_photo and entry["photo"] is None:
+            entry["photo"] = ImageTk.PhotoImage(entry["image"])
+        return key, entry
 
 
     def _update_preview(self):
         """Aktualisiert das Vorschau-Canvas mit dem aktuellen Wasserzeichen."""
-        # Logic unchanged, uses create_watermark_image
         canvas_width = self.preview_canvas.winfo_width()
         canvas_height = self.preview_canvas.winfo_height()
 
@@ -524,55 +601,90 @@ class VideoWatermarkerApp:
         self._update_preview_pending = False
 
         wm_text = self.watermark_text.get()
+        try:
+            # Platzhalter wie im ersten Frame des Vorschau-Videos anzeigen
+            wm_text = render_text_template(wm_text, self.preview_video or "video.mp4")
+        except ValueError:
+            pass # ungültige Platzhalter: Text unverändert zeigen, Fehler kommt beim Start
         font_name = self.selected_font.get()
-        font_size_val = self.font_size.get()
-        font_color_val = self.font_color.get()
-
         try:
-            if len(font_color_val) == 7: font_color_rgba = font_color_val + "FF"
-            elif len(font_color_val) == 9: font_color_rgba = font_color_val
-            else: font_color_rgba = "#FFFFFFFF"
-        except Exception: font_color_rgba = "#FFFFFFFF"
-
-        self.watermark_preview_image = self.create_watermark_image(
-            wm_text, font_name, font_size_val, font_color_rgba
-        )
-
-        if self.preview_wm_item:
-            self.preview_canvas.delete(self.preview_wm_item)
-            self.preview_wm_item = None
-            self.watermark_preview_photo = None # Wichtig!
-
-        if not self.watermark_preview_image:
-             print("INFO: Kein Wasserzeichen-Vorschau-Bild vorhanden.")
-             return
+            font_size_val = self.font_size.get()
+        except tk.TclError:
+            return # Spinbox enthält gerade keine gültige Zahl
+        font_color_rgba = to_rgba_hex(self.font_color.get())
 
         try:
-             self.watermark_preview_photo = ImageTk.PhotoImage(self.watermark_preview_image)
+             key, entry = self._get_watermark_bitmap(wm_text, font_name, font_size_val, font_color_rgba)
         except Exception as e:
-             print(f"FEHLER bei ImageTk Erstellung: {e}")
+             log("error", f"ImageTk Erstellung fehlgeschlagen: {e}")
+             entry = None
+
+        if not entry:
+             if self.preview_wm_item:
+                  self.preview_canvas.delete(self.preview_wm_item)
+                  self.preview_wm_item = None
+             self.preview_wm_key = None
+             self.watermark_preview_image = None
+             self.watermark_preview_photo = None
+             log("info", "Kein Wasserzeichen-Vorschau-Bild vorhanden.")
+             return
+
+        scale = self._preview_display_scale()
+        display_key = key + (round(scale, 3),)
+        if display_key != self.preview_wm_key or not self.preview_wm_item:
+             self.watermark_preview_image, self.watermark_preview_photo = self._scaled_watermark(entry, scale) # Referenz halten (Tk)
+             if self.preview_wm_item:
+                  self.preview_canvas.itemconfig(self.preview_wm_item, image=self.watermark_preview_photo)
+             else:
+                  self.preview_wm_item = self.preview_canvas.create_image(
+                      0, 0, anchor=tk.NW, image=self.watermark_preview_photo
+                  )
+             self.preview_wm_key = display_key
+        self._place_preview_watermark()
+
+
+    def _scaled_watermark(self, entry, scale):
+        """(Bild, PhotoImage) des Wasserzeichens im Vorschau-Maßstab; die letzte Skalierung bleibt im Cache-Eintrag."""
+        if abs(scale - 1.0) < 0.005:
+            return entry["image"], entry["photo"]
+        scale_key = round(scale, 3)
+        if entry.get("scaled") is None or entry["scaled"][0] != scale_key:
+            from PIL import Image, ImageTk
+            image = entry["image"]
+            size = (max(1, int(image.width * scale)), max(1, int(image.height * scale)))
+            scaled = image.resize(size, Image.LANCZOS)
+            entry["scaled"] = (scale_key, scaled, ImageTk.PhotoImage(scaled))
+        return entry["scaled"][1], entry["scaled"][2]
+
+
+    def _place_preview_watermark(self):
+        """Verschiebt das vorhandene Canvas-Item an die relative Position (ohne neu zu rendern)."""
+        if not self.preview_wm_item or not self.watermark_preview_image:
+             return
+        area_x, area_y, area_w, area_h = self._preview_area()
+        if area_w <= 1 or area_h <= 1:
              return
 
         wm_width = self.watermark_preview_image.width
         wm_height = self.watermark_preview_image.height
-        target_center_x = self.preview_position[0] * canvas_width
-        target_center_y = self.preview_position[1] * canvas_height
+        target_center_x = area_x + self.preview_position[0] * area_w
+        target_center_y = area_y + self.preview_position[1] * area_h
         target_x = target_center_x - wm_width / 2
         target_y = target_center_y - wm_height / 2
-        target_x = max(0, min(target_x, canvas_width - wm_width))
-        target_y = max(0, min(target_y, canvas_height - wm_height))
+        target_x = max(area_x, min(target_x, area_x + area_w - wm_width))
+        target_y = max(area_y, min(target_y, area_y + area_h - wm_height))
 
-        self.preview_wm_item = self.preview_canvas.create_image(
-            target_x, target_y, anchor=tk.NW, image=self.watermark_preview_photo
-        )
+        self.preview_canvas.coords(self.preview_wm_item, target_x, target_y)
         self.preview_canvas.lift(self.preview_wm_item)
 
 
     def start_processing_thread(self):
         """Startet den Thread für die Videoverarbeitung."""
-        # Logic unchanged
-        if not MOVIEPY_AVAILABLE:
-             messagebox.showerror("Fehler", "MoviePy ist nicht verfügbar. Verarbeitung nicht möglich.")
+        status = self.engine_status
+        if status is None:
+             return # Initialisierung läuft noch (Button ist dann ohnehin gesperrt)
+        if not status["moviepy_available"] and not (self._selected_engine() in (ENGINE_FFMPEG, ENGINE_STREAM) and status["ffmpeg_exe"]):
+             messagebox.showerror("Fehler", "MoviePy ist nicht verfügbar. Verarbeitung nicht möglich.\nBitte die FFmpeg-Engine wählen.")
              return
         if self.processing_thread and self.processing_thread.is_alive():
             messagebox.showwarning("Läuft bereits", "Die Verarbeitung läuft bereits.")
@@ -584,6 +696,32 @@ class VideoWatermarkerApp:
         if not output_dir or not os.path.isdir(output_dir):
             messagebox.showwarning("Kein Ausgabeordner", "Bitte wählen Sie einen gültigen Ausgabeordner.")
             return
+        try:
+            parse_renditions(self.renditions_spec.get().strip())
+        except ValueError as e:
+            messagebox.showwarning("Ungültige Ausgabestufen", f"{e}\nFormat: Höhe:CRF oder Höhe:Bitrate k, z.B. 1080:23,720:1500k")
+            return
+        try:
+            parse_text_template(self.watermark_text.get())
+        except ValueError as e:
+            messagebox.showwarning("Ungültiger Wasserzeichentext", str(e))
+            return
+        try:
+            parse_time_ranges(self.time_ranges_spec.get().strip())
+        except ValueError as e:
+            messagebox.showwarning("Ungültige Zeitbereiche", f"{e}\nFormat: Start-Ende in Sekunden, z.B. 0-30,90-120,300-")
+            return
+        if self.time_ranges_spec.get().strip() and self.renditions_spec.get().strip():
+            messagebox.showwarning("Zeitbereiche", "Zeitbereiche lassen sich nicht mit mehreren Ausgabestufen kombinieren.")
+            return
+        try:
+            parse_variants(self.variants_spec.get().strip())
+        except ValueError as e:
+            messagebox.showwarning("Ungültige Varianten", f"{e}\nFormat: ein Wasserzeichentext pro Empfänger, mit ; getrennt")
+            return
+        if self.variants_spec.get().strip() and self.renditions_spec.get().strip():
+            messagebox.showwarning("Varianten", "Varianten lassen sich nicht mit mehreren Ausgabestufen kombinieren.")
+            return
 
         self.start_button.config(state=tk.DISABLED)
         self.stop_button.config(state=tk.NORMAL)
@@ -594,6 +732,13 @@ class VideoWatermarkerApp:
         self.processing_thread = threading.Thread(target=self.process_videos, daemon=True)
         self.processing_thread.start()
 
+    def _selected_engine(self):
+        """Liefert die Engine-ID zur Auswahl in der Combobox."""
+        for engine_id, label in ENGINE_LABELS.items():
+            if label == self.engine_label.get():
+                return engine_id
+        return DEFAULT_ENGINE
+
     def stop_processing(self):
          """Setzt das Flag, um den Verarbeitungsthread (bald) zu stoppen."""
          # Logic unchanged
@@ -601,194 +746,114 @@ class VideoWatermarkerApp:
               self.stop_processing_flag.set()
               self.status_var.set("Versuche Verarbeitung abzubrechen...")
               self.stop_button.config(state=tk.DISABLED)
-              print("INFO: Abbruchsignal gesendet.")
+              log("info", "Abbruchsignal gesendet.")
          else:
-              print("INFO: Kein aktiver Verarbeitungsthread zum Abbrechen.")
+              log("info", "Kein aktiver Verarbeitungsthread zum Abbrechen.")
 
 
     def process_videos(self):
-        """Führt die eigentliche Videoverarbeitung im Hintergrund durch."""
-        output_dir = self.output_folder.get()
-        wm_text = self.watermark_text.get()
-        font_name = self.selected_font.get()
-        font_size_val = self.font_size.get()
-        font_color_val = self.font_color.get()
-        relative_pos = self.preview_position
-
-        total_videos = len(self.video_files)
-        processed_count = 0
-        errors = []
-
+        """Führt die eigentliche Videoverarbeitung im Hintergrund durch (Kern in wz5_engine)."""
         try:
-            if len(font_color_val) == 7: font_color_rgba = font_color_val + "FF"
-            elif len(font_color_val) == 9: font_color_rgba = font_color_val
-            else: font_color_rgba = "#FFFFFFFF"
-        except Exception: font_color_rgba = "#FFFFFFFF"
+            workers = int(self.worker_count.get())
+        except (tk.TclError, ValueError):
+            workers = 1
+        settings = {
+            "text": self.watermark_text.get(),
+            "font": self.selected_font.get(),
+            "font_size": self.font_size.get(),
+            "color": self.font_color.get(),
+            "position": self.preview_position,
+            "engine": self._selected_engine(),
+            "workers": workers,
+            "resume": self.resume_batch.get(),
+            "renditions": self.renditions_spec.get().strip() or None,
+            "time_ranges": self.time_ranges_spec.get().strip() or None,
+            "variants": self.variants_spec.get().strip() or None,
+        }
+        if self.relative_size.get():
+            # Verhältnis wie in der Vorschau (Schriftgröße zur Höhe des Vorschau-Videos), sonst bezogen auf 1080p
+            reference_height = self.preview_video_size[1] if self.preview_video_size else 1080
+            settings["font_size_relative"] = settings["font_size"] / reference_height
 
         try:
-             print("INFO: Erstelle finales Wasserzeichenbild für Verarbeitung...")
-             wm_pil_image = self.create_watermark_image(wm_text, font_name, font_size_val, font_color_rgba)
-             if not wm_pil_image:
-                  raise ValueError("Konnte Wasserzeichenbild nicht erstellen (siehe vorherige Logs).")
-             wm_numpy_image = np.array(wm_pil_image)
-             print(f"INFO: Wasserzeichen Numpy Array Shape: {wm_numpy_image.shape}")
-        except Exception as img_e:
+             # Bereits für die Vorschau gerenderte Bitmaps werden wiederverwendet
+             _, wm_entry = self._get_watermark_bitmap(settings["text"], settings["font"], settings["font_size"],
+                                                      to_rgba_hex(settings["color"]), with_photo=False)
+             if settings.get("font_size_relative"):
+                 wm_entry = None # wird pro Auflösung im Engine-Batch gerastert
+             results = run_watermark_batch(self.video_files, self.output_folder.get(), settings,
+                                           stop_event=self.stop_processing_flag, on_event=self._on_batch_event,
+                                           wm_image=wm_entry["image"] if wm_entry else None)
+        except WatermarkError as img_e:
              error_msg = f"Fehler beim Erstellen des Wasserzeichen-Bildes vor der Verarbeitung: {img_e}"
-             print(f"ERROR: {error_msg}\n{traceback.format_exc()}")
+             log("error", f"{error_msg}\n{traceback.format_exc()}")
              self.root.after(0, messagebox.showerror, "Vorbereitungsfehler", error_msg)
-             self.root.after(0, self._processing_finished, False, ["Wasserzeichen-Erstellung fehlgeschlagen."], False, False)
+             self.root.after(0, self._processing_finished, [], False, ["Wasserzeichen-Erstellung fehlgeschlagen."])
+             return
+        except Exception as batch_e:
+             # z. B. Ausgabeordner nicht beschreibbar oder Journal-Fehler: kein Problem des Wasserzeichens
+             error_msg = f"Fehler bei der Stapelverarbeitung: {type(batch_e).__name__}: {batch_e}"
+             log("error", f"{error_msg}\n{traceback.format_exc()}")
+             # _processing_finished zeigt den Fehler im Abschlussdialog
+             self.root.after(0, self._processing_finished, [], self.stop_processing_flag.is_set(), [error_msg])
              return
 
-        for i, video_path in enumerate(self.video_files):
-            if self.stop_processing_flag.is_set():
-                 print("INFO: Verarbeitungsschleife wegen Abbruchsignal verlassen.")
-                 errors.append("Prozess durch Benutzer abgebrochen.")
-                 break
+        self.root.after(0, self._processing_finished, results, self.stop_processing_flag.is_set())
 
-            filename = os.path.basename(video_path)
-            output_filename = f"{os.path.splitext(filename)[0]}_wasserzeichen.mp4"
-            output_path = os.path.join(output_dir, output_filename)
 
-            # Update Status before starting the heavy load
-            self.root.after(0, lambda i=i, f=filename: self.status_var.set(f"Verarbeite ({i+1}/{total_videos}): {f}"))
-            # Set progress slightly above the previous video's completion
-            self.root.after(0, lambda i=i: self.progress_var.set((i / total_videos) * 100))
+    def _on_batch_event(self, event, **data):
+        """Fortschrittsmeldungen aus wz5_engine.run_jobs (Verarbeitungs-Thread) an die GUI weiterreichen."""
+        if event == "job_started":
+            filename = os.path.basename(data["job"]["video_path"])
+            self.root.after(0, self.status_var.set, f"Verarbeite ({data['index']+1}/{data['total']}): {filename}")
+        elif event == "progress":
+            # Echter Fortschritt aus dem Encoder (Frames, fps, Geschwindigkeit, ETA)
+            snapshot = data["snapshot"]
+            self.root.after(0, self.progress_var.set, snapshot["percent"])
+            self.root.after(0, self.status_var.set, format_progress(snapshot))
 
-            clip = None
-            watermark_clip = None
-            final = None
 
-            try:
-                print(f"INFO [{filename}]: Lade Video...")
-                clip = VideoFileClip(video_path)
-                video_w, video_h = clip.size
-                print(f"INFO [{filename}]: Video Größe: {video_w}x{video_h}, Dauer: {clip.duration}s")
-
-                print(f"INFO [{filename}]: Erstelle Wasserzeichen Clip...")
-                watermark_clip = ImageClip(wm_numpy_image, transparent=True)
-                watermark_clip = watermark_clip.with_duration(clip.duration)
-
-                wm_w, wm_h = wm_pil_image.size
-                target_center_x = relative_pos[0] * video_w
-                target_center_y = relative_pos[1] * video_h
-                pos_x = target_center_x - wm_w / 2
-                pos_y = target_center_y - wm_h / 2
-                margin = 5
-                pos_x = max(margin, min(pos_x, video_w - wm_w - margin))
-                pos_y = max(margin, min(pos_y, video_h - wm_h - margin))
-
-                watermark_clip = watermark_clip.with_position((pos_x, pos_y))
-                print(f"INFO [{filename}]: Wasserzeichen Position (px): ({pos_x:.1f}, {pos_y:.1f})")
-
-                print(f"INFO [{filename}]: Kombiniere Clips...")
-                final = CompositeVideoClip([clip, watermark_clip])
-
-                # *** FORTSCHRITTSBALKEN-WORKAROUND (Start) ***
-                # Update status and give a small progress bump before writing starts
-                self.root.after(0, self.status_var.set, f"Schreibe Datei ({i+1}/{total_videos}): {filename}...")
-                # Set progress to slightly *more* than the start of this video's section
-                self.root.after(0, lambda i=i: self.progress_var.set(((i + 0.05) / total_videos) * 100))
-
-
-                print(f"INFO [{filename}]: Schreibe Ergebnis nach '{output_path}' mit optimierten Parametern...")
-                # *** OPTIMIERTE FFmpeg PARAMETER ***
-                final.write_videofile(
-                    output_path,
-                    codec='libx264',         # Standard H.264
-                    audio_codec='aac',       # Standard AAC Audio
-                    threads=os.cpu_count() or 4, # Mehr Threads nutzen (oder 4 als Fallback)
-                    preset='ultrafast',      # Schnellstes Encoding (größere Dateien mögl.)
-                    ffmpeg_params=[
-                        "-crf", "23",        # Qualität (18=besser, 28=schlechter)
-                        "-pix_fmt", "yuv420p",# Maximale Kompatibilität
-                        "-movflags", "+faststart" # Für Web-Streaming optimiert
-                    ],
-                    logger=None #'bar'      # Kein Konsolen-Logger, da wir GUI haben
-                )
-
-                # *** FORTSCHRITTSBALKEN-WORKAROUND (Ende) ***
-                # Set progress to almost complete for this video after writing finishes
-                self.root.after(0, lambda i=i: self.progress_var.set(((i + 0.95) / total_videos) * 100))
-
-                print(f"INFO [{filename}]: Erfolgreich abgeschlossen.")
-                processed_count += 1
+    def _processing_finished(self, results, was_stopped, errors=None):
+        """Wird aufgerufen, wenn der Verarbeitungsthread beendet ist.
 
-            except Exception as e:
-                # Error handling (unchanged)
-                error_type = type(e).__name__
-                error_details = str(e)
-                tb_str = traceback.format_exc()
-                print(f"FEHLER bei Verarbeitung von '{filename}': {error_type}: {error_details}\n{tb_str}")
-                error_msg = f"FEHLER '{filename}': {error_type}"
-                if isinstance(e, (FileNotFoundError, OSError)) and ('ffmpeg' in error_details.lower() or 'ffprobe' in error_details.lower()):
-                    error_msg += f" -> FFmpeg/FFprobe nicht gefunden oder Pfad falsch? (Pfad: {os.environ.get('IMAGEIO_FFMPEG_EXE', 'System PATH / imageio')})"
-                elif isinstance(e, OSError) and ("Permission denied" in error_details or "Errno 13" in error_details):
-                    error_msg += " -> Keine Schreibrechte im Ausgabeordner?"
-                elif "Unknown encoder" in error_details:
-                     error_msg += f" -> FFmpeg kennt Codec nicht ({'libx264' if 'libx264' in error_details else 'aac'}?). FFmpeg aktuell?"
-                elif "AttributeError" in error_type and ("with_position" in error_details or "with_duration" in error_details):
-                     error_msg += " -> MoviePy API Fehler. Bitte melden."
-                elif "MemoryError" in error_type:
-                     error_msg += " -> Nicht genug Arbeitsspeicher. Versuche kleinere Videos."
-                else:
-                     detail_snippet = error_details.replace('\n', ' ').strip()[:100]
-                     error_msg += f" -> Details: {detail_snippet}..."
-                errors.append(error_msg)
-
-            finally:
-                # Resource cleanup (unchanged)
-                try:
-                    if final: final.close()
-                    if watermark_clip: watermark_clip.close()
-                    if clip: clip.close()
-                    gc.collect()
-                    print(f"INFO [{filename}]: Ressourcen freigegeben, GC durchgeführt.")
-                except Exception as close_e:
-                     print(f"WARNUNG [{filename}]: Fehler beim Schließen der Clips (ignoriert): {close_e}")
-            time.sleep(0.01) # Kleine Pause
-
-        # GUI Update after loop (unchanged logic, _processing_finished handles final state)
-        was_stopped = self.stop_processing_flag.is_set()
-        error_list = [e for e in errors if "Benutzer abgebrochen" not in e]
-        success = not error_list and not was_stopped
-        partial_success = was_stopped and not error_list
-        self.root.after(0, self._processing_finished, success, errors, was_stopped, partial_success)
-
-
-    def _processing_finished(self, success, errors, was_stopped, partial_success):
-        """Wird aufgerufen, wenn der Verarbeitungsthread beendet ist."""
-        # Final GUI state update (unchanged logic)
+        `results` ist die Ergebnisliste aus run_watermark_batch (status ok/skipped/error/cancelled je Datei),
+        `errors` optionale Fehler außerhalb einzelner Dateien (z. B. Vorbereitung).
+        """
         self.start_button.config(state=tk.NORMAL)
         self.stop_button.config(state=tk.DISABLED)
         self.progress_var.set(100.0) # Ensure it ends at 100%
         self.processing_thread = None
+        self.stop_processing_flag.clear()
+        if self.is_closing:
+            return
 
-        total_files = len(self.video_files)
-        error_list = [e for e in errors if "Benutzer abgebrochen" not in e]
+        total_files = len(results) or len(self.video_files)
+        completed = [r for r in results if r["status"] in ("ok", "skipped")]
+        skipped_count = sum(1 for r in results if r["status"] == "skipped")
+        error_list = list(errors or []) + [r["error"] for r in results if r["status"] == "error"]
         error_count = len(error_list)
-        # Correctly calculate processed count considering stops and errors
-        processed_count = total_files - error_count
-        if was_stopped and not partial_success and errors: # If stopped AND other errors occurred, don't double-count the stop implicit failure
-             processed_count = total_files - error_count -1 # Reduce by one more if stop caused the loop break before last error
-        elif was_stopped:
-             # Find index where stop occurred if possible (crude estimate)
-             stop_index = -1
-             for idx, err in enumerate(errors):
-                  if "Benutzer abgebrochen" in err:
-                       stop_index = idx # Index relative to file list where stop was recorded
-                       break
-             # Estimate processed count based on when stop occurred
-             processed_count = stop_index if stop_index != -1 else total_files - error_count -1
-
-
-        if processed_count < 0: processed_count = 0 # Sanity check
+        processed_count = len(completed)
 
         if was_stopped:
              self.status_var.set(f"Verarbeitung abgebrochen. {processed_count}/{total_files} Videos bearbeitet.")
-             messagebox.showwarning("Abgebrochen", f"Die Videoverarbeitung wurde abgebrochen.\n{processed_count} von {total_files} Videos wurden bis dahin (möglicherweise) bearbeitet.")
-        elif success:
+             message = f"Die Videoverarbeitung wurde abgebrochen.\n{processed_count} von {total_files} Videos wurden vollständig bearbeitet"
+             if completed:
+                  names = [f"- {os.path.basename(r['input'])}" for r in completed[:MAX_LISTED_FILES]]
+                  if len(completed) > MAX_LISTED_FILES:
+                       names.append(f"... und {len(completed) - MAX_LISTED_FILES} weitere")
+                  message += ":\n" + "\n".join(names)
+             else:
+                  message += "."
+             message += "\n\nUnvollständige Ausgabedateien wurden gelöscht."
+             if error_list:
+                  message += f"\n{error_count} Datei(en) mit Fehlern (siehe Konsole)."
+             messagebox.showwarning("Abgebrochen", message)
+        elif not error_list:
             self.status_var.set(f"Verarbeitung abgeschlossen ({total_files}/{total_files} erfolgreich).")
-            messagebox.showinfo("Fertig", f"Alle {total_files} Videos wurden erfolgreich bearbeitet!")
+            message = f"Alle {total_files} Videos wurden erfolgreich bearbeitet!"
+            if skipped_count:
+                message += f"\n{skipped_count} davon waren unverändert bereits fertig und wurden übersprungen."
+            messagebox.showinfo("Fertig", message)
         else: # Fehler aufgetreten
             self.status_var.set(f"Verarbeitung mit {error_count} Fehlern beendet.")
             error_summary = f"{error_count} Fehler sind aufgetreten ({processed_count}/{total_files} erfolgreich):\n\n" + "\n".join(f"- {e}" for e in error_list)
@@ -796,29 +861,35 @@ class VideoWatermarkerApp:
                  error_summary = error_summary[:1000] + "\n\n... (Weitere Fehler in Konsole)"
             messagebox.showerror("Fehler bei Verarbeitung", error_summary)
 
-        self.stop_processing_flag.clear()
-
 
     def _on_closing(self):
         """Wird aufgerufen, wenn das Fenster geschlossen wird."""
-        # Logic unchanged
         if self.processing_thread and self.processing_thread.is_alive():
             if messagebox.askyesno("Verarbeitung läuft", "Die Videoverarbeitung läuft noch.\nWollen Sie wirklich beenden? Der aktuelle Vorgang wird abgebrochen."):
-                print("INFO: Schließen bestätigt, sende Abbruchsignal...")
+                log("info", "Schließen bestätigt, sende Abbruchsignal...")
+                self.is_closing = True
                 self.stop_processing_flag.set()
-                self.root.after(150, self.root.destroy)
+                self.status_var.set("Breche laufende Verarbeitung ab...")
+                self._destroy_when_stopped(time.monotonic() + CLOSE_WAIT_TIMEOUT)
             else:
-                print("INFO: Schließen abgelehnt.")
+                log("info", "Schließen abgelehnt.")
                 return
         else:
-            print("INFO: Anwendung wird geschlossen.")
+            log("info", "Anwendung wird geschlossen.")
             self.root.destroy()
 
+    def _destroy_when_stopped(self, deadline):
+        """Schließt das Fenster erst, wenn die Encoder beendet und Teil-Ausgaben aufgeräumt sind."""
+        if self.processing_thread and self.processing_thread.is_alive() and time.monotonic() < deadline:
+            self.root.after(100, self._destroy_when_stopped, deadline)
+            return
+        self.root.destroy()
+
 
 # --- Hauptausführung ---
 if __name__ == "__main__":
-    # from multiprocessing import freeze_support
-    # freeze_support()
+    # Nötig für den Prozess-Pool in eingefrorenen Windows-Builds (PyInstaller)
+    multiprocessing.freeze_support()
 
     root = tk.Tk()
     app = VideoWatermarkerApp(root)
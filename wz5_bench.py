@@ -0,0 +1,503 @@
+# -*- coding: utf-8 -*-
+"""Benchmark der Verarbeitungs-Engines von wz5 (wz5_engine.py).
+
+Modus `engines` (Standard): erzeugt ein synthetisches Testvideo (FFmpeg lavfi
+testsrc2 + sine) und misst die Laufzeit der FFmpeg-Engine gegen die Rohframe-Stream-
+und die MoviePy-Engine.
+
+Modus `compositor`: Mikrobenchmark der Kosten pro Frame, RoiCompositor gegen
+CompositeVideoClip, bei 720p, 1080p und 4K (ohne Decode/Encode).
+
+Modus `suite`: reproduzierbare Messreihe über die komplette Batch-Pipeline
+(run_watermark_batch wie GUI und CLI). Testvideos werden deterministisch aus
+lavfi-Quellen erzeugt (480p/1080p/4K, mehrere Längen und Codecs) und im
+`--input-dir` wiederverwendet. Pro Konfiguration und Engine werden Laufzeit,
+Encode-fps, Spitzen-RSS (Prozess inkl. FFmpeg-Kindprozesse) und Ausgabegröße
+gemessen; jede Messung läuft in einem frischen Prozess. Mit `--baseline` wird
+gegen eine gespeicherte Messung verglichen (Exit-Code 1 bei Regression).
+
+Modus `startup`: Startzeit der Anwendung in frischen Python-Prozessen. Gemessen
+wird, bis die GUI-Module geladen sind (Fenster kann erscheinen) und bis der
+Hintergrund-Warm-up (FFmpeg-Suche, MoviePy) fertig ist. "Kalt" läuft ohne
+vorhandenen Bytecode-Cache (und, wenn erlaubt, mit geleertem Seiten-Cache),
+"warm" ist der Bestwert aus `--repeat` Wiederholungen.
+
+Aufruf:
+    python wz5_bench.py --resolution 1920x1080 --duration 10 --repeat 2
+    python wz5_bench.py --mode compositor --frames 200
+    python wz5_bench.py --mode suite --json aktuell.json --baseline baseline.json
+    python wz5_bench.py --mode suite --resolutions 480p --durations 5 --save-baseline baseline.json
+    python wz5_bench.py --mode startup --repeat 5
+"""
+
+import argparse
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import queue
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+try:
+    import resource # nur POSIX
+except ImportError:
+    resource = None
+
+import wz5_engine
+
+# Codecs der Testvideos (Encoder-Argumente für die Erzeugung)
+TEST_VIDEO_CODECS = {
+    "h264": ["-c:v", "libx264", "-preset", "veryfast"],
+    "hevc": ["-c:v", "libx265", "-preset", "ultrafast", "-tag:v", "hvc1", "-x265-params", "log-level=error"],
+    "mpeg4": ["-c:v", "mpeg4", "-q:v", "4"],
+}
+SUITE_RESOLUTIONS = {"480p": (854, 480), "1080p": (1920, 1080), "4k": (3840, 2160)}
+SUITE_DURATIONS = (5, 20)
+SUITE_FPS = 30
+BASELINE_TOLERANCE = 0.10 # 10 % langsamer als die Baseline gilt als Regression
+SUITE_POLL_INTERVAL = 1.0 # Sekunden zwischen zwei Prüfungen, ob der Messprozess noch lebt
+
+
+def make_test_video(path, width, height, duration, fps=30, codec="h264"):
+    """Erzeugt ein deterministisches Testvideo mit Ton (bitexact, ohne Zeitstempel-Metadaten)."""
+    ffmpeg_exe = wz5_engine.find_ffmpeg_exe()
+    cmd = [
+        ffmpeg_exe, "-hide_banner", "-nostdin", "-y", "-loglevel", "error",
+        "-f", "lavfi", "-i", f"testsrc2=size={width}x{height}:rate={fps}:duration={duration}",
+        "-f", "lavfi", "-i", f"sine=frequency=440:sample_rate=48000:duration={duration}",
+        *TEST_VIDEO_CODECS[codec], "-pix_fmt", "yuv420p",
+        "-c:a", "aac", "-shortest", "-fflags", "+bitexact", "-flags:v", "+bitexact", "-flags:a", "+bitexact",
+        path,
+    ]
+    subprocess.run(cmd, check=True)
+
+
+def render_bench_watermark(font_size):
+    """Einfaches Wasserzeichen mit dem PIL Standard-Font (unabhängig von installierten Schriften)."""
+    try:
+        pil_font = ImageFont.load_default(font_size)
+    except TypeError: # Pillow < 10.1 kennt keine Größe
+        pil_font = ImageFont.load_default()
+    bbox = pil_font.getbbox(wz5_engine.DEFAULT_WATERMARK_TEXT)
+    image = Image.new("RGBA", (bbox[2] - bbox[0] + 10, bbox[3] - bbox[1] + 6), (0, 0, 0, 0))
+    ImageDraw.Draw(image).text((5 - bbox[0], 3 - bbox[1]), wz5_engine.DEFAULT_WATERMARK_TEXT, font=pil_font, fill="#FFFFFFFF")
+    return image
+
+
+def run_engine(engine, video_path, output_path, wm_image, wm_png_path, threads):
+    """Führt eine Engine einmal aus und liefert die Laufzeit in Sekunden."""
+    relative_pos = (0.8, 0.9)
+    start = time.perf_counter()
+    if engine == wz5_engine.ENGINE_FFMPEG:
+        wz5_engine.watermark_video_ffmpeg(video_path, output_path, wm_png_path, wm_image.size, relative_pos, threads)
+    elif engine == wz5_engine.ENGINE_STREAM:
+        wz5_engine.watermark_video_stream(video_path, output_path, np.array(wm_image), relative_pos, threads)
+    else:
+        wz5_engine.watermark_video_moviepy(video_path, output_path, np.array(wm_image), relative_pos, threads)
+    return time.perf_counter() - start
+
+
+COMPOSITOR_RESOLUTIONS = [(1280, 720), (1920, 1080), (3840, 2160)]
+
+
+def time_per_frame(func, frames):
+    """Mittlere Zeit pro Aufruf in Millisekunden (nach einem Aufwärm-Aufruf)."""
+    func(0)
+    start = time.perf_counter()
+    for i in range(frames):
+        func(i)
+    return (time.perf_counter() - start) * 1000.0 / frames
+
+
+def bench_compositor(frames):
+    """Kosten pro Frame: RoiCompositor (wie in der MoviePy-Engine) gegen CompositeVideoClip."""
+    results = []
+    rng = np.random.default_rng(0)
+    for width, height in COMPOSITOR_RESOLUTIONS:
+        frame = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+        frame.flags.writeable = False # wie die Frames aus dem MoviePy-Reader
+        wm_image = np.array(render_bench_watermark(max(16, height // 20)))
+        wm_h, wm_w = wm_image.shape[:2]
+        position = wz5_engine.compute_watermark_position((width, height), (wm_w, wm_h), (0.8, 0.9))
+
+        compositor = wz5_engine.RoiCompositor(wm_image, position, (width, height))
+        row = {
+            "resolution": f"{width}x{height}",
+            "watermark": f"{wm_w}x{wm_h}",
+            "roi_ms": round(time_per_frame(lambda i: compositor(frame), frames), 4),
+        }
+        if wz5_engine.load_moviepy():
+            composite = wz5_engine.CompositeVideoClip([
+                wz5_engine.ImageClip(frame).with_duration(1),
+                wz5_engine.ImageClip(wm_image, transparent=True).with_duration(1).with_position(position),
+            ])
+            row["composite_ms"] = round(time_per_frame(lambda i: composite.get_frame(i / frames), frames), 4)
+            row["speedup"] = round(row["composite_ms"] / row["roi_ms"], 1) if row["roi_ms"] > 0 else None
+            composite.close()
+        results.append(row)
+
+    print(f"\n{'Auflösung':<11} {'WZ':>9} {'ROI (ms)':>10} {'Composite (ms)':>15} {'Faktor':>8}")
+    for r in results:
+        print(f"{r['resolution']:<11} {r['watermark']:>9} {r['roi_ms']:>10.3f} "
+              f"{r.get('composite_ms', float('nan')):>15.3f} {r.get('speedup') or float('nan'):>7.1f}x")
+    return results
+
+
+def peak_rss_mb():
+    """Spitzen-RSS dieses Prozesses und seiner beendeten Kindprozesse (FFmpeg) in MiB, None ohne `resource`."""
+    if resource is None:
+        return None
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # Linux meldet KiB, macOS Bytes
+    return round(peak / (1024.0 * 1024.0 if sys.platform == "darwin" else 1024.0), 1)
+
+
+def _suite_worker(result_queue, engine, video_path, output_dir):
+    """Läuft in einem frischen Prozess: ein Batch mit einem Video über run_watermark_batch.
+
+    Legt immer genau ein Ergebnis in die Queue, bei einer Ausnahme eine Fehlerzeile.
+    """
+    try:
+        info = wz5_engine.probe_media(video_path)
+        settings = wz5_engine.default_settings()
+        settings.update(engine=engine, workers=1, resume=False)
+        wm_image = render_bench_watermark(max(16, info["height"] // 20))
+        os.makedirs(output_dir, exist_ok=True)
+        start = time.perf_counter()
+        results = wz5_engine.run_watermark_batch([video_path], output_dir, settings, wm_image=wm_image)
+        wall = time.perf_counter() - start
+        result = results[0]
+        output_size = os.path.getsize(result["output"]) if result["status"] == "ok" else None
+        measurement = {"status": result["status"], "error": result["error"], "wall_s": wall,
+                       "peak_rss_mb": peak_rss_mb(), "output_bytes": output_size}
+    except Exception as e:
+        measurement = {"status": "error", "error": f"{type(e).__name__}: {e}"}
+    result_queue.put(measurement)
+
+
+def measure_suite_run(engine, video_path, output_dir):
+    """Startet _suite_worker in einem eigenen Prozess, damit RSS-Spitzen nicht zwischen Messungen verschleppt werden.
+
+    Stirbt der Prozess ohne Ergebnis oder endet er mit einem Exit-Code ungleich 0,
+    wird die Messung als Fehler gewertet, statt ewig auf die Queue zu warten.
+    """
+    context = multiprocessing.get_context("spawn")
+    result_queue = context.Queue()
+    process = context.Process(target=_suite_worker, args=(result_queue, engine, video_path, output_dir))
+    process.start()
+    measurement = None
+    try:
+        while measurement is None:
+            alive = process.is_alive()
+            try:
+                measurement = result_queue.get(timeout=SUITE_POLL_INTERVAL)
+            except queue.Empty:
+                if not alive: # vor dem letzten get() beendet: es kommt nichts mehr
+                    break
+    finally:
+        process.join()
+    if measurement is None:
+        return {"status": "error", "error": f"Messprozess ohne Ergebnis beendet (Exit-Code {process.exitcode})"}
+    if process.exitcode != 0 and measurement["status"] == "ok":
+        return {"status": "error", "error": f"Messprozess mit Exit-Code {process.exitcode} beendet"}
+    return measurement
+
+
+def suite_key(result):
+    return f"{result['resolution']}/{result['duration_s']:g}s/{result['codec']}/{result['engine']}"
+
+
+def suite_meta():
+    """Angaben zur Messumgebung, damit Baselines nur mit vergleichbaren Läufen verglichen werden."""
+    ffmpeg_exe = wz5_engine.find_ffmpeg_exe()
+    version = subprocess.run([ffmpeg_exe, "-version"], capture_output=True, text=True).stdout.splitlines()
+    return {
+        "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "host": platform.node(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "ffmpeg": version[0] if version else None,
+        "tuning_profile": wz5_engine.load_tuning_profile() is not None,
+    }
+
+
+def run_suite(resolutions, durations, codecs, engines, repeat, input_dir):
+    """Misst alle Kombinationen und liefert die Ergebniszeilen."""
+    results = []
+    work_dir = tempfile.mkdtemp(prefix="wz5_suite_")
+    try:
+        for res_name in resolutions:
+            width, height = SUITE_RESOLUTIONS[res_name]
+            for duration in durations:
+                for codec in codecs:
+                    video_path = os.path.join(input_dir, f"suite_{res_name}_{duration:g}s_{codec}.mp4")
+                    if not os.path.isfile(video_path):
+                        print(f"INFO: Erzeuge Testvideo {os.path.basename(video_path)}...")
+                        make_test_video(video_path, width, height, duration, SUITE_FPS, codec)
+                    frames = int(round(duration * SUITE_FPS))
+                    for engine in engines:
+                        row = {"resolution": res_name, "duration_s": duration, "codec": codec, "engine": engine,
+                               "input_bytes": os.path.getsize(video_path), "frames": frames}
+                        print(f"INFO: Messe {suite_key(row)}...")
+                        runs = []
+                        for run in range(repeat):
+                            output_dir = os.path.join(work_dir, f"run_{len(results)}_{run}")
+                            runs.append(measure_suite_run(engine, video_path, output_dir))
+                            shutil.rmtree(output_dir, ignore_errors=True)
+                        failed = [r for r in runs if r["status"] != "ok"]
+                        if failed:
+                            row.update(status="error", error=failed[0]["error"])
+                        else:
+                            best = min(r["wall_s"] for r in runs)
+                            row.update(
+                                status="ok",
+                                wall_s=round(best, 3),
+                                encode_fps=round(frames / best, 2) if best > 0 else None,
+                                realtime_factor=round(duration / best, 2) if best > 0 else None,
+                                peak_rss_mb=max((r["peak_rss_mb"] for r in runs if r["peak_rss_mb"] is not None), default=None),
+                                output_bytes=runs[-1]["output_bytes"],
+                                runs_s=[round(r["wall_s"], 3) for r in runs],
+                            )
+                        results.append(row)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return results
+
+
+def print_suite(results):
+    print(f"\n{'Konfiguration':<28} {'Zeit (s)':>9} {'fps':>8} {'RSS (MiB)':>10} {'Ausgabe (KiB)':>14}")
+    for r in results:
+        if r["status"] != "ok":
+            print(f"{suite_key(r):<28} FEHLER: {r['error']}")
+            continue
+        rss = f"{r['peak_rss_mb']:.1f}" if r["peak_rss_mb"] is not None else "-"
+        print(f"{suite_key(r):<28} {r['wall_s']:>9.2f} {r['encode_fps']:>8.1f} {rss:>10} {r['output_bytes'] / 1024:>14.0f}")
+
+
+def compare_to_baseline(results, baseline, tolerance):
+    """Vergleicht mit einer gespeicherten Messung; liefert die Schlüssel der Regressionen."""
+    if baseline.get("meta", {}).get("host") != platform.node():
+        print(f"WARNUNG: Baseline stammt von '{baseline.get('meta', {}).get('host')}', Zeiten sind nur bedingt vergleichbar.")
+    previous = {suite_key(r): r for r in baseline.get("results", []) if r.get("status") == "ok"}
+    regressions = []
+    print(f"\n{'Konfiguration':<28} {'Baseline (s)':>12} {'Jetzt (s)':>10} {'Änderung':>9} {'RSS':>8} {'Größe':>8}")
+    for r in results:
+        key = suite_key(r)
+        old = previous.get(key)
+        if r["status"] != "ok" or old is None:
+            if r["status"] != "ok" and old is not None:
+                regressions.append(key) # lief vorher, scheitert jetzt
+            print(f"{key:<28} {'-' if old is None else old['wall_s']:>12} {r.get('wall_s', '-'):>10} {'neu' if old is None else 'FEHLER':>9}")
+            continue
+        change = r["wall_s"] / old["wall_s"] - 1.0 if old["wall_s"] > 0 else 0.0
+        rss_change = (f"{r['peak_rss_mb'] / old['peak_rss_mb'] - 1.0:+.0%}"
+                      if r.get("peak_rss_mb") and old.get("peak_rss_mb") else "-")
+        size_change = (f"{r['output_bytes'] / old['output_bytes'] - 1.0:+.0%}"
+                       if r.get("output_bytes") and old.get("output_bytes") else "-")
+        marker = "  <-- Regression" if change > tolerance else ""
+        if change > tolerance:
+            regressions.append(key)
+        print(f"{key:<28} {old['wall_s']:>12.2f} {r['wall_s']:>10.2f} {change:>+9.0%} {rss_change:>8} {size_change:>8}{marker}")
+    return regressions
+
+
+def main_suite(args):
+    if not wz5_engine.find_ffmpeg_exe():
+        print("FEHLER: ffmpeg wurde nicht gefunden.", file=sys.stderr)
+        return 2
+    split = lambda value: [v.strip() for v in value.split(",") if v.strip()]
+    try:
+        resolutions = split(args.resolutions)
+        durations = [float(v) for v in split(args.durations)]
+        codecs = split(args.codecs)
+        unknown = [r for r in resolutions if r not in SUITE_RESOLUTIONS] + [c for c in codecs if c not in TEST_VIDEO_CODECS]
+        if unknown:
+            raise ValueError(f"unbekannt: {', '.join(unknown)}")
+    except ValueError as e:
+        print(f"FEHLER: Ungültige Suite-Angaben ({e}).", file=sys.stderr)
+        return 2
+    engines = [e for e in split(args.engines) if e in wz5_engine.ENGINE_LABELS]
+    if wz5_engine.ENGINE_MOVIEPY in engines and not wz5_engine.load_moviepy():
+        print("WARNUNG: MoviePy nicht verfügbar, die MoviePy-Engine wird nicht gemessen.")
+        engines.remove(wz5_engine.ENGINE_MOVIEPY)
+
+    input_dir = args.input_dir or tempfile.mkdtemp(prefix="wz5_suite_inputs_")
+    os.makedirs(input_dir, exist_ok=True)
+    try:
+        payload = {"meta": suite_meta(), "results": run_suite(resolutions, durations, codecs, engines, args.repeat, input_dir)}
+    finally:
+        if not args.input_dir:
+            shutil.rmtree(input_dir, ignore_errors=True)
+    print_suite(payload["results"])
+
+    for path in (args.json_path, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(payload, f, indent=2)
+            print(f"INFO: Ergebnisse gespeichert: {path}")
+    if args.baseline:
+        try:
+            with open(args.baseline, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"FEHLER: Baseline '{args.baseline}' nicht lesbar: {e}", file=sys.stderr)
+            return 2
+        regressions = compare_to_baseline(payload["results"], baseline, args.tolerance)
+        if regressions:
+            print(f"\nFEHLER: {len(regressions)} Regression(en) über {args.tolerance:.0%}: {', '.join(regressions)}")
+            return 1
+        print(f"\nINFO: Keine Regression über {args.tolerance:.0%} gegenüber der Baseline.")
+    return 0
+
+
+# Läuft in einem frischen Interpreter; `import wz5` entspricht allem, was vor dem Fenster passiert
+STARTUP_PROBE = """
+import json, time
+start = time.perf_counter()
+import wz5
+window_s = time.perf_counter() - start
+status = wz5.warm_up()
+print(json.dumps({"window_s": window_s, "ready_s": time.perf_counter() - start,
+                  "ffmpeg_s": status["ffmpeg_s"], "moviepy_s": status["moviepy_s"]}))
+"""
+
+
+def drop_page_cache():
+    """Leert den Seiten-Cache des Systems (nur Linux als root); False, wenn nicht möglich."""
+    try:
+        os.sync()
+        with open("/proc/sys/vm/drop_caches", "w") as f:
+            f.write("3\n")
+        return True
+    except OSError:
+        return False
+
+
+def measure_startup(env=None):
+    """Startet STARTUP_PROBE einmal; Zeiten in Sekunden inkl. Interpreter-Start (process_s)."""
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-c", STARTUP_PROBE], capture_output=True, text=True,
+                          cwd=os.path.dirname(os.path.abspath(__file__)), env=env)
+    process_s = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"Exit-Code {proc.returncode}")
+    row = json.loads(proc.stdout.strip().splitlines()[-1])
+    row["process_s"] = process_s
+    return {key: round(value, 4) for key, value in row.items()}
+
+
+def bench_startup(repeat):
+    """Kalt- und Warmstart der GUI-Module und des Warm-ups."""
+    cache_dir = tempfile.mkdtemp(prefix="wz5_pycache_")
+    try:
+        env = dict(os.environ, PYTHONPYCACHEPREFIX=cache_dir) # leerer Bytecode-Cache
+        page_cache_dropped = drop_page_cache()
+        cold = measure_startup(env)
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    measure_startup() # Bytecode-Cache des normalen Laufs sicher anlegen
+    warm_runs = [measure_startup() for _ in range(max(1, repeat))]
+    warm = {key: min(run[key] for run in warm_runs) for key in warm_runs[0]}
+    results = {"cold": dict(cold, page_cache_dropped=page_cache_dropped), "warm": warm, "warm_runs": warm_runs}
+
+    print(f"\n{'Start':<6} {'Fenster (s)':>12} {'Bereit (s)':>11} {'FFmpeg (s)':>11} {'MoviePy (s)':>12} {'Prozess (s)':>12}")
+    for name in ("cold", "warm"):
+        r = results[name]
+        print(f"{'kalt' if name == 'cold' else 'warm':<6} {r['window_s']:>12.3f} {r['ready_s']:>11.3f} "
+              f"{r['ffmpeg_s']:>11.3f} {r['moviepy_s']:>12.3f} {r['process_s']:>12.3f}")
+    if not page_cache_dropped:
+        print("INFO: Seiten-Cache konnte nicht geleert werden (keine Rechte), Kaltstart nur ohne Bytecode-Cache.")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark FFmpeg-Engine vs. MoviePy-Engine")
+    parser.add_argument("--mode", choices=("engines", "compositor", "suite", "startup"), default="engines",
+                        help="engines: komplette Encodes, compositor: Kosten pro Frame des Compositings, "
+                             "suite: Messreihe über die Batch-Pipeline mit Baseline-Vergleich, "
+                             "startup: Kalt-/Warmstart der Anwendung")
+    parser.add_argument("--frames", type=int, default=100, help="Frames pro Auflösung im Modus compositor")
+    parser.add_argument("--resolution", default="1920x1080", help="Auflösung des Testvideos, z. B. 3840x2160")
+    parser.add_argument("--duration", type=float, default=10.0, help="Länge des Testvideos in Sekunden")
+    parser.add_argument("--repeat", type=int, default=1, help="Wiederholungen pro Engine (Bestwert zählt)")
+    parser.add_argument("--engines", default=f"{wz5_engine.ENGINE_FFMPEG},{wz5_engine.ENGINE_STREAM},{wz5_engine.ENGINE_MOVIEPY}")
+    parser.add_argument("--json", dest="json_path", help="Ergebnisse zusätzlich als JSON speichern")
+    suite_group = parser.add_argument_group("Modus suite")
+    suite_group.add_argument("--resolutions", default=",".join(SUITE_RESOLUTIONS), help="z. B. 480p,1080p,4k")
+    suite_group.add_argument("--durations", default=",".join(f"{d:g}" for d in SUITE_DURATIONS), help="Längen in Sekunden, z. B. 5,20")
+    suite_group.add_argument("--codecs", default=",".join(TEST_VIDEO_CODECS), help="Codecs der Testvideos, z. B. h264,hevc,mpeg4")
+    suite_group.add_argument("--input-dir", help="Ordner für die erzeugten Testvideos (bleiben für spätere Läufe erhalten)")
+    suite_group.add_argument("--baseline", help="Gegen diese gespeicherte Messung (JSON) vergleichen")
+    suite_group.add_argument("--save-baseline", help="Ergebnisse als neue Baseline speichern")
+    suite_group.add_argument("--tolerance", type=float, default=BASELINE_TOLERANCE,
+                             help="Erlaubte Verlangsamung gegenüber der Baseline (Anteil, Standard 0.1)")
+    args = parser.parse_args(argv)
+
+    if args.mode == "suite":
+        return main_suite(args)
+
+    if args.mode in ("compositor", "startup"):
+        results = bench_compositor(args.frames) if args.mode == "compositor" else bench_startup(args.repeat)
+        if args.json_path:
+            with open(args.json_path, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2)
+        return 0
+
+    if not wz5_engine.find_ffmpeg_exe():
+        print("FEHLER: ffmpeg wurde nicht gefunden.", file=sys.stderr)
+        return 2
+    width, height = (int(v) for v in args.resolution.lower().split("x"))
+    engines = [e.strip() for e in args.engines.split(",") if e.strip()]
+    threads = os.cpu_count() or 4
+
+    work_dir = tempfile.mkdtemp(prefix="wz5_bench_")
+    try:
+        video_path = os.path.join(work_dir, f"input_{width}x{height}.mp4")
+        print(f"INFO: Erzeuge Testvideo {width}x{height}, {args.duration}s...")
+        make_test_video(video_path, width, height, args.duration)
+        wm_image = render_bench_watermark(max(16, height // 20))
+        wm_png_path = os.path.join(work_dir, "wasserzeichen.png")
+        wm_image.save(wm_png_path)
+
+        results = []
+        for engine in engines:
+            timings = []
+            for run in range(args.repeat):
+                output_path = os.path.join(work_dir, f"out_{engine}_{run}.mp4")
+                timings.append(run_engine(engine, video_path, output_path, wm_image, wm_png_path, threads))
+            best = min(timings)
+            results.append({
+                "engine": engine,
+                "resolution": f"{width}x{height}",
+                "duration_s": args.duration,
+                "best_wall_s": round(best, 3),
+                "realtime_factor": round(args.duration / best, 2) if best > 0 else None,
+                "runs_s": [round(t, 3) for t in timings],
+            })
+
+        print(f"\n{'Engine':<10} {'Auflösung':<11} {'Bestzeit (s)':>12} {'x Echtzeit':>11}")
+        for r in results:
+            print(f"{r['engine']:<10} {r['resolution']:<11} {r['best_wall_s']:>12.2f} {r['realtime_factor']:>11.2f}")
+        if len(results) == 2 and results[0]["best_wall_s"] > 0:
+            print(f"\nFaktor {results[1]['engine']} / {results[0]['engine']}: "
+                  f"{results[1]['best_wall_s'] / results[0]['best_wall_s']:.2f}x")
+        if args.json_path:
+            with open(args.json_path, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
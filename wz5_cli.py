@@ -0,0 +1,489 @@
+# -*- coding: utf-8 -*-
+"""Headless-Einstieg für wz5 (Render-Server ohne Display, importiert kein tkinter).
+
+Aufruf:
+    python wz5_cli.py run auftrag.json [--results ergebnis.json] [--engine ffmpeg] [--workers 4]
+                                       [--progress text|json|none] [--force]
+                                       [--log-level info] [--log-format text|json] [--trace]
+    python wz5_cli.py watch watch.json [--workers 2] [--poll-interval 2] [--stable-seconds 5] [--queue-size 8]
+    python wz5_cli.py calibrate [--classes sd,hd,fhd,uhd] [--duration 3] [--profile pfad.json]
+
+Beispiel-Manifest (JSON; YAML mit .yml/.yaml, benötigt PyYAML):
+    {
+        "inputs": ["videos/*.mp4", "/pfad/zu/clip.mov"],
+        "output_dir": "ausgabe",
+        "text": "© BProgy",
+        "font": "Arial",
+        "font_size": 40,
+        "color": "#FFFFFF",
+        "position": [0.9, 0.9],
+        "engine": "ffmpeg",
+        "workers": 2,
+        "segment_threshold": 600,
+        "tuning_goal": "speed",
+        "tuning_target": 1.0,
+        "resume": true,
+        "results_file": "ausgabe/wz5_results.json"
+    }
+
+Relative Pfade im Manifest beziehen sich auf den Ordner des Manifests.
+`segment_threshold` (Sekunden, 0 = aus): längere Videos werden von der FFmpeg-Engine
+in Segmenten parallel encodiert, sofern pro Job genug CPU-Threads frei sind.
+
+`watch` läuft dauerhaft: statt `inputs` nennt das Manifest `watch_dirs` (Ordner).
+Neue Videos werden verarbeitet, sobald Größe und mtime `stable_seconds` lang
+unverändert sind; höchstens `queue_size` Dateien warten, `workers` laufen parallel.
+Pro Datei wird ein Ergebnis mit Latenz (Ankunft bis fertige Ausgabe) geloggt,
+fehlerhafte Dateien werden erst nach einer Änderung erneut versucht.
+Optional im Manifest: poll_interval, stable_seconds, queue_size.
+
+`calibrate` misst libx264-Presets, CRF-Werte und Thread-Zahlen auf diesem Rechner
+und speichert ein Tuning-Profil. Ist eins vorhanden, wählt `run` preset/crf/threads
+pro Auflösungsklasse nach `tuning_goal`: "speed" (mind. `tuning_target`-fache
+Echtzeit, dabei kleinste Datei) oder "size" (höchstens `tuning_target` kbit/s Video,
+dabei schnellstes Preset).
+Mit `resume` (Standard) führt `run` ein Journal (wz5_journal.jsonl) im Ausgabeordner
+und überspringt Dateien, deren Eingabe und Einstellungen seit dem letzten
+erfolgreichen Lauf unverändert sind; `--force` verarbeitet trotzdem alles neu.
+Ausgaben entstehen als <name>.part.mp4 und werden erst nach Erfolg umbenannt.
+`text` darf Platzhalter enthalten: {dateiname}, {name} und {datum} werden pro Datei
+eingesetzt, {timecode}, {frame} und {zeit} pro Frame (z.B. "{name} TC {timecode}
+#{frame:06d}"; nur mit der Stream-Engine, die dafür automatisch gewählt wird).
+Mit `font_size_relative` (z.B. 0.05 = 5 % der Videohöhe) statt `font_size` wird das
+Wasserzeichen pro Auflösung einmal in passender Größe gerastert, damit gemischte
+Batches (480p bis 4K) gleich aussehen.
+`memory_budget_mb` begrenzt den geschätzten Speicher gleichzeitig laufender Jobs
+(Standard: 80 % des freien Arbeitsspeichers, 0 = unbegrenzt); große 4K-Jobs warten
+dann, statt den Batch abstürzen zu lassen, kleine laufen weiter parallel.
+Optional erzeugt `renditions` mehrere Ausgabestufen (ABR-Leiter) aus einem einzigen
+Decode, z.B. "1080:23,720:1500k,480:28:_mobil" (Höhe:CRF|Bitrate[:Suffix]) oder als
+Liste [{"height": 720, "bitrate": 1500, "suffix": "_720p"}, ...]; Ausgaben heißen
+<name>_wasserzeichen<suffix>.mp4 (nur FFmpeg-Engine).
+`time_ranges` beschränkt das Wasserzeichen auf Zeitbereiche in Sekunden, z.B.
+"0-30,90-120,300-" oder [[0, 30], [300, null]]; bei H.264-Quellen werden nur die
+betroffenen GOPs neu encodiert, der Rest wird kopiert (nur FFmpeg-Engine).
+`variants` erzeugt pro Eingabe eine Ausgabe je Empfänger aus einem einzigen Decode:
+[{"text": "© BProgy – licensed to X", "color": "#FF0000", "position": [0.9, 0.9],
+"suffix": "_x"}, ...] (color/position optional, Standard aus den übrigen Angaben) oder
+"Text A; Text B". Ausgaben heißen <name>_wasserzeichen<suffix>.mp4, die Zuordnung
+Variante -> Datei steht in <name>_wasserzeichen_varianten.json und in den Ergebnissen.
+Der Fortschritt (Frames, Encode-fps, Geschwindigkeit, ETA) geht nach stderr,
+mit `--progress json` als eine JSON-Zeile pro Meldung.
+Die Verarbeitungs-Logs gehen nach stdout, mit `--log-format json` strukturiert
+(ts, level, pid, video, msg). `--trace` misst die Dauer jeder Stufe (Font-Suche,
+Wasserzeichen, Clip öffnen, Compositing, Encode, Schließen/GC, ...) pro Datei und
+gibt am Batch-Ende eine Zusammenfassung aus. Ohne Parameter gelten die
+Umgebungsvariablen WZ5_LOG_LEVEL, WZ5_LOG_FORMAT und WZ5_TRACE=1 (auch für die GUI).
+
+Exit-Codes:
+    0   alle Dateien erfolgreich (oder unverändert übersprungen)
+    1   mindestens eine Datei fehlgeschlagen
+    2   Aufruf- oder Manifest-Fehler
+    3   Umgebung unvollständig (kein FFmpeg/MoviePy) oder Wasserzeichen nicht erstellbar
+    130 durch Benutzer/Signal abgebrochen
+"""
+
+import argparse
+import datetime
+import glob
+import json
+import os
+import re
+import signal
+import sys
+import threading
+import time
+
+import wz5_engine as engine
+
+EXIT_OK = 0
+EXIT_FAILED_FILES = 1
+EXIT_USAGE = 2
+EXIT_ENVIRONMENT = 3
+EXIT_CANCELLED = 130
+
+RESULTS_FILENAME = "wz5_results.json"
+TEXT_PROGRESS_INTERVAL = 2.0 # Sekunden zwischen zwei Text-Fortschrittszeilen
+
+
+class ManifestError(ValueError):
+    """Manifest fehlt, ist nicht lesbar oder enthält ungültige Werte."""
+
+
+def load_manifest(path):
+    """Liest ein JSON- oder YAML-Manifest als dict."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            if os.path.splitext(path)[1].lower() in (".yml", ".yaml"):
+                try:
+                    import yaml
+                except ImportError:
+                    raise ManifestError("YAML-Manifeste benötigen PyYAML (`pip install pyyaml`).")
+                data = yaml.safe_load(f)
+            else:
+                data = json.load(f)
+    except OSError as e:
+        raise ManifestError(f"Manifest nicht lesbar: {e}")
+    except ValueError as e: # JSONDecodeError / YAMLError-Texte
+        raise ManifestError(f"Manifest ungültig: {e}")
+    if not isinstance(data, dict):
+        raise ManifestError("Manifest muss ein Objekt (Schlüssel/Wert) sein.")
+    return data
+
+
+def path_resolver(base_dir):
+    """Relative Manifest-Pfade beziehen sich auf den Ordner des Manifests."""
+    def resolve(path):
+        path = os.path.expanduser(str(path))
+        return path if os.path.isabs(path) else os.path.join(base_dir, path)
+    return resolve
+
+
+def resolve_job(manifest, base_dir):
+    """Prüft das Manifest und liefert (video_files, output_dir, settings, results_file)."""
+    resolve = path_resolver(base_dir)
+    raw_inputs = manifest.get("inputs")
+    if isinstance(raw_inputs, str):
+        raw_inputs = [raw_inputs]
+    if not raw_inputs or not isinstance(raw_inputs, list):
+        raise ManifestError("'inputs' muss eine nicht-leere Liste von Dateien/Mustern sein.")
+    video_files = []
+    for pattern in raw_inputs:
+        pattern = resolve(pattern)
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        if not matches:
+            raise ManifestError(f"Keine Dateien für Muster '{pattern}' gefunden.")
+        for match in matches:
+            if match not in video_files:
+                video_files.append(match)
+
+    output_dir, settings = resolve_settings(manifest, resolve)
+    results_file = resolve(manifest["results_file"]) if manifest.get("results_file") else os.path.join(output_dir, RESULTS_FILENAME)
+    return video_files, output_dir, settings, results_file
+
+
+def resolve_watch(manifest, base_dir):
+    """Prüft ein Watch-Manifest und liefert (watch_dirs, output_dir, settings)."""
+    resolve = path_resolver(base_dir)
+    raw_dirs = manifest.get("watch_dirs")
+    if isinstance(raw_dirs, str):
+        raw_dirs = [raw_dirs]
+    if not raw_dirs or not isinstance(raw_dirs, list):
+        raise ManifestError("'watch_dirs' muss eine nicht-leere Liste von Ordnern sein.")
+    watch_dirs = [resolve(d) for d in raw_dirs]
+    missing = [d for d in watch_dirs if not os.path.isdir(d)]
+    if missing:
+        raise ManifestError(f"Watch-Ordner nicht gefunden: {', '.join(missing)}")
+    output_dir, settings = resolve_settings(manifest, resolve)
+    return watch_dirs, output_dir, settings
+
+
+def resolve_settings(manifest, resolve):
+    """Gemeinsame Prüfung von Ausgabeordner und Einstellungen; liefert (output_dir, settings)."""
+    if not manifest.get("output_dir"):
+        raise ManifestError("'output_dir' fehlt.")
+    output_dir = resolve(manifest["output_dir"])
+
+    settings = engine.default_settings()
+    for key in settings:
+        if key in manifest:
+            settings[key] = manifest[key]
+    if not isinstance(settings["text"], str) or not settings["text"]:
+        raise ManifestError("'text' muss ein nicht-leerer Text sein.")
+    try:
+        engine.parse_text_template(settings["text"])
+    except ValueError as e:
+        raise ManifestError(f"'text': {e}")
+    try:
+        settings["font_size"] = int(settings["font_size"])
+        settings["workers"] = int(settings["workers"])
+    except (TypeError, ValueError):
+        raise ManifestError("'font_size' und 'workers' müssen ganze Zahlen sein.")
+    if settings["font_size"] <= 0 or settings["workers"] < 1:
+        raise ManifestError("'font_size' muss > 0 und 'workers' >= 1 sein.")
+    if not isinstance(settings["color"], str) or not re.fullmatch(r"#[0-9A-Fa-f]{6}([0-9A-Fa-f]{2})?", settings["color"]):
+        raise ManifestError("'color' muss im Format #RRGGBB oder #RRGGBBAA angegeben werden.")
+    try:
+        pos_x, pos_y = (float(v) for v in settings["position"])
+    except (TypeError, ValueError):
+        raise ManifestError("'position' muss eine Liste [x, y] mit Werten zwischen 0 und 1 sein.")
+    if not (0.0 <= pos_x <= 1.0 and 0.0 <= pos_y <= 1.0):
+        raise ManifestError("'position' muss eine Liste [x, y] mit Werten zwischen 0 und 1 sein.")
+    settings["position"] = (pos_x, pos_y)
+    try:
+        settings["segment_threshold"] = float(settings["segment_threshold"] or 0)
+    except (TypeError, ValueError):
+        raise ManifestError("'segment_threshold' muss eine Zahl (Sekunden, 0 = aus) sein.")
+    if settings["segment_threshold"] < 0:
+        raise ManifestError("'segment_threshold' muss eine Zahl (Sekunden, 0 = aus) sein.")
+    if settings["tuning_goal"] not in (engine.TUNING_GOAL_SPEED, engine.TUNING_GOAL_SIZE):
+        raise ManifestError(f"'tuning_goal' muss '{engine.TUNING_GOAL_SPEED}' oder '{engine.TUNING_GOAL_SIZE}' sein.")
+    try:
+        settings["tuning_target"] = float(settings["tuning_target"])
+    except (TypeError, ValueError):
+        raise ManifestError("'tuning_target' muss eine Zahl > 0 sein.")
+    if settings["tuning_target"] <= 0:
+        raise ManifestError("'tuning_target' muss eine Zahl > 0 sein.")
+    if not isinstance(settings["resume"], bool):
+        raise ManifestError("'resume' muss true oder false sein.")
+    if settings["font_size_relative"] is not None:
+        try:
+            settings["font_size_relative"] = float(settings["font_size_relative"])
+        except (TypeError, ValueError):
+            raise ManifestError("'font_size_relative' muss eine Zahl zwischen 0 und 1 (Anteil der Videohöhe) sein.")
+        if not 0.0 < settings["font_size_relative"] <= 1.0:
+            raise ManifestError("'font_size_relative' muss eine Zahl zwischen 0 und 1 (Anteil der Videohöhe) sein.")
+    if settings["memory_budget_mb"] is not None:
+        try:
+            settings["memory_budget_mb"] = float(settings["memory_budget_mb"])
+        except (TypeError, ValueError):
+            raise ManifestError("'memory_budget_mb' muss eine Zahl >= 0 (MB, 0 = unbegrenzt) sein.")
+        if settings["memory_budget_mb"] < 0:
+            raise ManifestError("'memory_budget_mb' muss eine Zahl >= 0 (MB, 0 = unbegrenzt) sein.")
+    try:
+        settings["renditions"] = engine.parse_renditions(settings["renditions"])
+    except ValueError as e:
+        raise ManifestError(f"'renditions': {e}")
+    try:
+        settings["time_ranges"] = engine.parse_time_ranges(settings["time_ranges"])
+    except ValueError as e:
+        raise ManifestError(f"'time_ranges': {e}")
+    if settings["time_ranges"] and settings["renditions"]:
+        raise ManifestError("'time_ranges' lässt sich nicht mit 'renditions' kombinieren.")
+    try:
+        settings["variants"] = engine.parse_variants(settings["variants"])
+    except ValueError as e:
+        raise ManifestError(f"'variants': {e}")
+    if settings["variants"] and settings["renditions"]:
+        raise ManifestError("'variants' lässt sich nicht mit 'renditions' kombinieren.")
+    if settings["engine"] not in engine.ENGINE_LABELS:
+        raise ManifestError(f"'engine' muss eines von {sorted(engine.ENGINE_LABELS)} sein.")
+    return output_dir, settings
+
+
+def write_results(results_file, payload):
+    """Schreibt die Ergebnisdatei atomar (erst .tmp, dann umbenennen)."""
+    os.makedirs(os.path.dirname(os.path.abspath(results_file)), exist_ok=True)
+    tmp_path = results_file + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, results_file)
+
+
+def make_progress_printer(mode):
+    """on_event-Callback, der den Batch-Fortschritt nach stderr schreibt."""
+    last_print = [0.0]
+    def on_event(event, **data):
+        if event != "progress" or mode == "none":
+            return
+        snapshot = data["snapshot"]
+        if mode == "json":
+            print(json.dumps({"event": "progress", **snapshot}), file=sys.stderr, flush=True)
+            return
+        now = time.monotonic()
+        if now - last_print[0] >= TEXT_PROGRESS_INTERVAL or snapshot["done_files"] == snapshot["total_files"]:
+            last_print[0] = now
+            print(f"FORTSCHRITT: {snapshot['percent']:5.1f}% | {engine.format_progress(snapshot)}", file=sys.stderr, flush=True)
+    return on_event
+
+
+def check_environment(settings, output_dir):
+    """Prüft Engine-Verfügbarkeit und legt den Ausgabeordner an; liefert einen Exit-Code oder None."""
+    if not engine.find_ffmpeg_exe() and not engine.load_moviepy():
+        print("FEHLER: Weder FFmpeg noch MoviePy verfügbar.", file=sys.stderr)
+        return EXIT_ENVIRONMENT
+    if settings["engine"] == engine.ENGINE_MOVIEPY and not engine.load_moviepy():
+        print("FEHLER: MoviePy nicht verfügbar, bitte die FFmpeg-Engine verwenden.", file=sys.stderr)
+        return EXIT_ENVIRONMENT
+    try:
+        os.makedirs(output_dir, exist_ok=True)
+    except OSError as e:
+        print(f"FEHLER: Ausgabeordner nicht anlegbar: {e}", file=sys.stderr)
+        return EXIT_ENVIRONMENT
+    return None
+
+
+def install_stop_handler():
+    """SIGINT/SIGTERM setzen das zurückgegebene Event (laufende Encodes werden dann beendet)."""
+    stop_event = threading.Event()
+    def request_stop(signum, frame):
+        print("INFO: Abbruchsignal empfangen, laufende Encodes werden beendet.", file=sys.stderr)
+        stop_event.set()
+    signal.signal(signal.SIGINT, request_stop)
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, request_stop)
+    return stop_event
+
+
+def cmd_run(args):
+    """Unterbefehl `run`: Manifest verarbeiten."""
+    try:
+        manifest = load_manifest(args.manifest)
+        if args.engine: manifest["engine"] = args.engine
+        if args.workers: manifest["workers"] = args.workers
+        if args.results: manifest["results_file"] = os.path.abspath(args.results)
+        if args.force: manifest["resume"] = False
+        engine.instrumentation.configure(level=args.log_level, log_format=args.log_format, trace=args.trace or None)
+        base_dir = os.path.dirname(os.path.abspath(args.manifest))
+        video_files, output_dir, settings, results_file = resolve_job(manifest, base_dir)
+    except ManifestError as e:
+        print(f"FEHLER: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    exit_code = check_environment(settings, output_dir)
+    if exit_code is not None:
+        return exit_code
+
+    stop_event = install_stop_handler()
+    started_at = datetime.datetime.now().isoformat(timespec="seconds")
+    try:
+        results = engine.run_watermark_batch(video_files, output_dir, settings, stop_event=stop_event,
+                                             on_event=make_progress_printer(args.progress))
+    except engine.WatermarkError as e:
+        print(f"FEHLER: {e}", file=sys.stderr)
+        results = None
+        exit_code = EXIT_ENVIRONMENT
+    else:
+        if stop_event.is_set():
+            exit_code = EXIT_CANCELLED
+        elif any(r["status"] not in ("ok", "skipped") for r in results):
+            exit_code = EXIT_FAILED_FILES
+        else:
+            exit_code = EXIT_OK
+
+    payload = {
+        "exit_code": exit_code,
+        "started_at": started_at,
+        "finished_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "settings": settings,
+        "summary": {status: sum(1 for r in results or [] if r["status"] == status) for status in ("ok", "skipped", "error", "cancelled")},
+        "results": results or [],
+    }
+    write_results(results_file, payload)
+    print(f"INFO: Ergebnisse gespeichert: {results_file} (Exit-Code {exit_code})", file=sys.stderr)
+    return exit_code
+
+
+def cmd_watch(args):
+    """Unterbefehl `watch`: Eingabeordner überwachen, bis SIGINT/SIGTERM kommt."""
+    try:
+        manifest = load_manifest(args.manifest)
+        if args.engine: manifest["engine"] = args.engine
+        if args.workers: manifest["workers"] = args.workers
+        if args.force: manifest["resume"] = False
+        engine.instrumentation.configure(level=args.log_level, log_format=args.log_format)
+        base_dir = os.path.dirname(os.path.abspath(args.manifest))
+        watch_dirs, output_dir, settings = resolve_watch(manifest, base_dir)
+        options = {}
+        for key, default in (("poll_interval", engine.WATCH_POLL_INTERVAL), ("stable_seconds", engine.WATCH_STABLE_SECONDS),
+                             ("queue_size", engine.WATCH_QUEUE_SIZE)):
+            value = getattr(args, key)
+            value = manifest.get(key, default) if value is None else value
+            if not isinstance(value, (int, float)) or isinstance(value, bool) or value < (1 if key == "queue_size" else 0):
+                raise ManifestError(f"'{key}' muss eine Zahl >= {1 if key == 'queue_size' else 0} sein.")
+            options[key] = int(value) if key == "queue_size" else float(value)
+    except ManifestError as e:
+        print(f"FEHLER: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    exit_code = check_environment(settings, output_dir)
+    if exit_code is not None:
+        return exit_code
+
+    stop_event = install_stop_handler()
+    try:
+        counts = engine.watch_folders(watch_dirs, output_dir, settings, stop_event, **options)
+    except engine.WatermarkError as e:
+        print(f"FEHLER: {e}", file=sys.stderr)
+        return EXIT_ENVIRONMENT
+    print("INFO: Watch-Modus beendet: " + ", ".join(f"{n} {status}" for status, n in counts.items()), file=sys.stderr)
+    return EXIT_OK
+
+
+def cmd_calibrate(args):
+    """Unterbefehl `calibrate`: Encoder auf diesem Rechner vermessen und Tuning-Profil speichern."""
+    class_names = [c.strip() for c in args.classes.split(",") if c.strip()]
+    known = [name for name, _, _ in engine.RESOLUTION_CLASSES]
+    unknown = [c for c in class_names if c not in known]
+    if unknown or not class_names:
+        print(f"FEHLER: Unbekannte Auflösungsklasse(n) {unknown}, erlaubt: {','.join(known)}", file=sys.stderr)
+        return EXIT_USAGE
+    if args.duration <= 0:
+        print("FEHLER: --duration muss > 0 sein.", file=sys.stderr)
+        return EXIT_USAGE
+    if not engine.find_ffmpeg_exe():
+        print("FEHLER: ffmpeg wurde nicht gefunden.", file=sys.stderr)
+        return EXIT_ENVIRONMENT
+
+    stop_event = threading.Event()
+    def request_stop(signum, frame):
+        stop_event.set()
+    signal.signal(signal.SIGINT, request_stop)
+
+    def on_result(class_name, m):
+        print(f"{class_name:<4} {m['preset']:<10} crf {m['crf']:>3} threads {m['threads']:>3}: "
+              f"{m['encode_fps']:8.1f} fps {m['bytes_per_s'] * 8 / 1000:9.0f} kbit/s", file=sys.stderr, flush=True)
+    try:
+        profile = engine.calibrate_encoder(class_names, duration=args.duration, max_threads=args.threads,
+                                           on_result=on_result, stop_event=stop_event)
+    except engine.ProcessingCancelled:
+        print("INFO: Kalibrierung abgebrochen, Profil unverändert.", file=sys.stderr)
+        return EXIT_CANCELLED
+    except engine.FFmpegError as e:
+        print(f"FEHLER: Kalibrierung fehlgeschlagen: {e}", file=sys.stderr)
+        return EXIT_ENVIRONMENT
+    path = engine.save_tuning_profile(profile, args.profile)
+    print(f"INFO: Tuning-Profil gespeichert: {path}", file=sys.stderr)
+    return EXIT_OK
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="wz5_cli", description="Wasserzeichen-Batch ohne GUI")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Manifest (JSON/YAML) verarbeiten")
+    run_parser.add_argument("manifest", help="Pfad zum Manifest")
+    run_parser.add_argument("--results", help="Ergebnisdatei (überschreibt results_file aus dem Manifest)")
+    run_parser.add_argument("--engine", choices=sorted(engine.ENGINE_LABELS), help="Engine für diesen Lauf")
+    run_parser.add_argument("--workers", type=int, help="Anzahl paralleler Encodes")
+    run_parser.add_argument("--progress", choices=("text", "json", "none"), default="text",
+                            help="Fortschrittsausgabe nach stderr (Standard: text)")
+    run_parser.add_argument("--force", action="store_true", help="Journal ignorieren und alle Dateien neu verarbeiten")
+    run_parser.add_argument("--log-level", choices=list(engine.LOG_LEVELS), help="Minimales Log-Level (Standard: info)")
+    run_parser.add_argument("--log-format", choices=(engine.LOG_FORMAT_TEXT, engine.LOG_FORMAT_JSON),
+                            help="Log-Zeilen als Text oder JSON (stdout)")
+    run_parser.add_argument("--trace", action="store_true", help="Stufen-Zeiten und Zähler erfassen, Zusammenfassung am Ende")
+    run_parser.set_defaults(func=cmd_run)
+
+    watch_parser = subparsers.add_parser("watch", help="Eingabeordner laufend überwachen (Daemon)")
+    watch_parser.add_argument("manifest", help="Pfad zum Watch-Manifest (mit watch_dirs statt inputs)")
+    watch_parser.add_argument("--engine", choices=sorted(engine.ENGINE_LABELS), help="Engine")
+    watch_parser.add_argument("--workers", type=int, help="Anzahl gleichzeitiger Encodes")
+    watch_parser.add_argument("--poll-interval", dest="poll_interval", type=float,
+                              help=f"Sekunden zwischen zwei Ordner-Durchläufen (Standard {engine.WATCH_POLL_INTERVAL:g})")
+    watch_parser.add_argument("--stable-seconds", dest="stable_seconds", type=float,
+                              help=f"Sekunden ohne Größen-/mtime-Änderung, bis eine Datei als fertig gilt (Standard {engine.WATCH_STABLE_SECONDS:g})")
+    watch_parser.add_argument("--queue-size", dest="queue_size", type=int,
+                              help=f"Maximal wartende Dateien (Standard {engine.WATCH_QUEUE_SIZE})")
+    watch_parser.add_argument("--force", action="store_true", help="Journal ignorieren (auch bereits fertige Dateien neu verarbeiten)")
+    watch_parser.add_argument("--log-level", choices=list(engine.LOG_LEVELS), help="Minimales Log-Level (Standard: info)")
+    watch_parser.add_argument("--log-format", choices=(engine.LOG_FORMAT_TEXT, engine.LOG_FORMAT_JSON),
+                              help="Log-Zeilen als Text oder JSON (stdout)")
+    watch_parser.set_defaults(func=cmd_watch)
+
+    calibrate_parser = subparsers.add_parser("calibrate", help="Encoder-Einstellungen auf diesem Rechner kalibrieren")
+    calibrate_parser.add_argument("--classes", default=",".join(name for name, _, _ in engine.RESOLUTION_CLASSES),
+                                  help="Auflösungsklassen, kommagetrennt (Standard: alle)")
+    calibrate_parser.add_argument("--duration", type=float, default=engine.CALIBRATION_DURATION,
+                                  help="Länge der Testclips in Sekunden")
+    calibrate_parser.add_argument("--threads", type=int, help="Maximale Thread-Zahl (Standard: alle CPU-Kerne)")
+    calibrate_parser.add_argument("--profile", help="Zieldatei (Standard: Tuning-Profil im Cache-Ordner)")
+    calibrate_parser.set_defaults(func=cmd_calibrate)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,3995 @@
+# -*- coding: utf-8 -*-
+"""Verarbeitungs-Kern von wz5 ohne GUI-Abhängigkeiten.
+
+Font-Auflösung, Wasserzeichen-Rendering, Positionierung und Encoding. Wird von der
+Tk-Oberfläche (wz5.py), dem Headless-CLI (wz5_cli.py) und den Benchmarks genutzt.
+Importiert bewusst kein tkinter, damit es auf Render-Servern ohne Display läuft.
+NumPy und PIL werden erst in den Funktionen importiert, die sie brauchen (Startzeit der GUI).
+"""
+
+import os
+import sys
+import threading
+import platform
+import time
+import traceback
+import gc
+import subprocess # Für fc-match auf Linux und FFmpeg
+import shutil
+import re
+import tempfile
+import concurrent.futures
+import multiprocessing
+import multiprocessing.managers
+import functools
+import json
+import signal
+import datetime
+import hashlib
+import io
+import contextlib
+import math
+import string
+import bisect
+import queue
+from collections import OrderedDict
+from fractions import Fraction
+
+# --- Konstanten ---
+DEFAULT_WATERMARK_TEXT = "© BProgy"
+DEFAULT_FONT_SIZE = 40
+DEFAULT_FONT_COLOR = "#FFFFFF" # Weiß
+DEFAULT_FONT_NAME = "Arial"
+DEFAULT_POSITION = (0.5, 0.5) # Relative Position (Mittelpunkt) im Video
+WATERMARK_MARGIN = 5 # Mindestabstand des Wasserzeichens zum Videorand (px)
+MIN_RELATIVE_FONT_SIZE = 8 # Untergrenze (px) der Schriftgröße bei font_size_relative
+# Platzhalter im Wasserzeichentext (siehe parse_text_template)
+TEMPLATE_FILE_FIELDS = ("dateiname", "name", "datum") # pro Datei: Dateiname, ohne Endung, Verarbeitungsdatum
+TEMPLATE_FRAME_FIELDS = ("timecode", "frame", "zeit") # pro Frame: HH:MM:SS:FF, Frame-Nummer ab 0, HH:MM:SS.mmm
+TEMPLATE_DATE_FORMAT = "%d.%m.%Y"
+GLYPH_ATLAS_CACHE_SIZE = 8 # Glyphen-Atlanten (Schrift, Größe) pro Prozess
+ATLAS_CELL_GLYPHS = "0123456789:. " # Zeichen der Frame-Platzhalter; bestimmen die (feste) Zellenbreite
+ATLAS_METRIC_SAMPLE = "ÄÖÜÅgjpqy|()0123456789" # Ober-/Unterlängen für die gemeinsame Zeilenhöhe
+OUTPUT_SUFFIX = "_wasserzeichen.mp4"
+OUTPUT_MARKER = os.path.splitext(OUTPUT_SUFFIX)[0] # steckt in allen Ausgabenamen: <name>_wasserzeichen<suffix>.mp4
+PARTIAL_SUFFIX = ".part" # Ausgaben entstehen als <name>.part.mp4 und werden erst nach Erfolg umbenannt
+JOURNAL_FILENAME = "wz5_journal.jsonl" # Job-Journal im Ausgabeordner (eine JSON-Zeile pro Ergebnis)
+VARIANTS_MANIFEST_SUFFIX = "_varianten.json" # Zuordnung Variante -> Ausgabe neben den Ausgaben (siehe write_variants_manifest)
+HASH_SAMPLE_SIZE = 4 * 1024 * 1024 # Bytes je Stichprobe (Anfang/Mitte/Ende) für den Inhalts-Hash
+PROGRESS_INTERVAL = 0.25 # Sekunden zwischen zwei Fortschrittsmeldungen
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".wmv", ".flv") # Dateiauswahl der GUI und Watch-Ordner
+
+# --- Watch-Ordner (Daemon, siehe watch_folders) ---
+WATCH_POLL_INTERVAL = 2.0  # Sekunden zwischen zwei Durchläufen über die Eingabeordner
+WATCH_STABLE_SECONDS = 5.0 # so lange müssen Größe und mtime unverändert sein, bevor eine Datei als fertig gilt
+WATCH_QUEUE_SIZE = 8       # maximale Anzahl wartender Dateien (Backpressure: danach wird nicht mehr eingereiht)
+
+# --- Encoding Parameter (für beide Engines identisch) ---
+VIDEO_CODEC = 'libx264'
+AUDIO_CODEC = 'aac'
+ENCODER_PRESET = 'ultrafast' # Schnellstes Encoding (größere Dateien mögl.)
+ENCODER_CRF = "23"           # Qualität (18=besser, 28=schlechter)
+OUTPUT_PIX_FMT = "yuv420p"   # Maximale Kompatibilität
+# Audio-Codecs, die der MP4-Container direkt aufnimmt -> Stream-Copy statt AAC Re-Encode
+MP4_COPY_AUDIO_CODECS = {"aac", "mp3", "opus", "alac", "ac3", "eac3"}
+
+# --- Encoder-Tuning (Kalibrierung pro Rechner, siehe calibrate_encoder) ---
+TUNING_PROFILE_FILENAME = "tuning_profile.json"
+TUNING_PROFILE_VERSION = 1
+# Auflösungsklassen nach kürzerer Bildseite: (Name, max. kürzere Seite, Kalibrier-Auflösung)
+RESOLUTION_CLASSES = [
+    ("sd", 576, (854, 480)),
+    ("hd", 720, (1280, 720)),
+    ("fhd", 1080, (1920, 1080)),
+    ("uhd", 100000, (3840, 2160)),
+]
+CALIBRATION_PRESETS = ["ultrafast", "superfast", "veryfast", "faster", "fast", "medium"]
+CALIBRATION_CRFS = [ENCODER_CRF, "26", "28"]
+CALIBRATION_THREAD_PRESET = "veryfast" # Preset für die Messung der Thread-Skalierung
+CALIBRATION_FPS = 30
+CALIBRATION_DURATION = 3.0 # Sekunden pro Testclip
+TUNING_GOAL_SPEED = "speed" # Ziel: mind. `tuning_target`-fache Echtzeit, dabei kleinste Datei
+TUNING_GOAL_SIZE = "size"   # Ziel: höchstens `tuning_target` kbit/s Video, dabei schnellstes Preset
+DEFAULT_TUNING_GOAL = TUNING_GOAL_SPEED
+DEFAULT_TUNING_TARGET = 1.0
+
+# --- Verarbeitungs-Engines ---
+ENGINE_FFMPEG = "ffmpeg"   # Overlay komplett in FFmpeg, keine Frames in Python
+ENGINE_MOVIEPY = "moviepy" # Frames in Python (MoviePy + RoiCompositor)
+ENGINE_STREAM = "stream"   # Rohframes über Pipes in einen festen Ringpuffer (RoiCompositor, ohne MoviePy)
+ENGINE_LABELS = {
+    ENGINE_FFMPEG: "FFmpeg (nativ, schnell)",
+    ENGINE_MOVIEPY: "MoviePy (Python)",
+    ENGINE_STREAM: "Rohframe-Stream (Python, konstanter Speicher)",
+}
+DEFAULT_ENGINE = ENGINE_FFMPEG
+STREAM_RING_SLOTS = 4      # Frames im Ringpuffer der Stream-Engine (Dekodieren, Mischen, Encodieren überlappen)
+STREAM_PIX_FMT = "rgb24"   # Rohformat zwischen Decoder, RoiCompositor und Encoder
+
+# --- Speicher-Budget (Zulassung paralleler Jobs, siehe MemoryBudget) ---
+MEMORY_BUDGET_FRACTION = 0.8 # Anteil des freien Arbeitsspeichers beim Batch-Start, wenn kein Budget gesetzt ist
+MEMORY_SAMPLE_INTERVAL = 0.25 # Sekunden zwischen RSS-Messungen eines laufenden Jobs
+PROCESS_BASE_MB = 25         # Grundbedarf eines FFmpeg-Prozesses
+PYTHON_FRAME_OVERHEAD_MB = 60 # MoviePy: Python-Seite ohne Frames (Clip-Objekte, Reader/Writer)
+# RGB-Frames in den Warteschlangen von FFmpeg-Decoder/-Encoder an Rohframe-Pipes (gemessen mit FFmpeg 7)
+RAW_DECODER_FRAMES = {ENGINE_STREAM: 25, ENGINE_MOVIEPY: 16}
+RAW_ENCODER_FRAMES = {ENGINE_STREAM: 12, ENGINE_MOVIEPY: 0}
+RAW_PYTHON_FRAMES = {ENGINE_STREAM: STREAM_RING_SLOTS, ENGINE_MOVIEPY: 4} # Frames im Python-Prozess
+# Von x264 gehaltene Frames (Lookahead, Referenzen) je Preset: (Grundwert, zusätzlich pro Thread);
+# gemessen mit libx264 bei 360p, 1080p und 4K (Speicher wächst linear mit der Pixelzahl)
+X264_FRAME_BUFFERS = {
+    "ultrafast": (33, 3), "superfast": (45, 5), "veryfast": (74, 8), "faster": (95, 8), "fast": (115, 8),
+    "medium": (130, 8), "slow": (160, 8), "slower": (200, 8), "veryslow": (250, 8), "placebo": (250, 8),
+}
+
+# --- Vorab-Analyse (Preflight, siehe preflight_probe) ---
+PROBE_CACHE_SIZE = 4096  # Analyse-Ergebnisse im Speicher (Pfad + mtime + Größe)
+PROBE_WORKERS = 8        # parallele ffmpeg -i Aufrufe (I/O-gebunden, daher mehr als CPU-Kerne)
+
+# --- Vorschau-Frames ---
+PREVIEW_DECODE_SIZE = (960, 540) # Maximale Größe dekodierter Vorschau-Frames (Canvas skaliert daraus)
+PREVIEW_FRAME_CACHE_SIZE = 48    # Frames im Speicher-LRU
+THUMBNAIL_DIRNAME = "thumbnails" # Unterordner im Cache-Ordner für den Festplatten-Cache
+THUMBNAIL_DISK_LIMIT = 2000      # Maximale Anzahl Vorschaubilder auf der Festplatte (älteste werden gelöscht)
+
+# --- Segment-paralleles Encoding (lange Einzelvideos, nur FFmpeg-Engine) ---
+SEGMENT_MIN_DURATION = 600.0 # Sekunden; ab dieser Dauer wird ein Video in Segmenten parallel encodiert (0 = aus)
+SEGMENT_THREADS = 2          # Encoder-Threads pro Segment-Encode
+SEGMENTS_PER_ENCODE = 2      # Segmente pro parallelem Encode (Lastausgleich bei ungleich langen GOPs)
+# H.264-Profil der Quelle -> x264-Profil neu encodierter Abschnitte (Teilbereiche, siehe watermark_video_ranges)
+X264_PROFILES = {"Constrained Baseline": "baseline", "Baseline": "baseline", "Main": "main", "High": "high"}
+
+# --- Logging & Instrumentierung ---
+LOG_LEVELS = {"debug": 10, "info": 20, "warning": 30, "error": 40}
+LOG_PREFIXES = {"debug": "DEBUG", "info": "INFO", "warning": "WARNUNG", "error": "FEHLER"}
+LOG_FORMAT_TEXT = "text" # wie bisher: "INFO [datei]: Meldung"
+LOG_FORMAT_JSON = "json" # eine JSON-Zeile pro Meldung (ts, level, pid, video, msg, ...)
+# Umgebungsvariablen, damit auch GUI und Worker-Prozesse ohne Parameter konfigurierbar sind
+LOG_LEVEL_ENV = "WZ5_LOG_LEVEL"
+LOG_FORMAT_ENV = "WZ5_LOG_FORMAT"
+TRACE_ENV = "WZ5_TRACE" # "1": Stufen-Zeiten und Zähler erfassen, Zusammenfassung am Batch-Ende
+
+
+class Instrumentation:
+    """Log-Ausgabe, Stufen-Zeiten (Spans) und Zähler pro Datei und Batch.
+
+    Ohne `trace` liefert span() einen geteilten No-op-Kontext und count() kehrt sofort
+    zurück; die Kosten im abgeschalteten Zustand sind ein Attribut-Test pro Aufruf.
+    Spans und Zähler werden pro (Datei, Name) aggregiert; Worker-Prozesse geben ihre
+    Werte über drain()/merge() an den Hauptprozess zurück.
+    """
+    def __init__(self):
+        self.level = LOG_LEVELS["info"]
+        self.log_format = LOG_FORMAT_TEXT
+        self.trace = False
+        self.stream = None # None = sys.stdout zum Zeitpunkt der Ausgabe
+        self._lock = threading.Lock()
+        self._spans = {}    # (video, stage) -> [Anzahl, Summe s, Maximum s]
+        self._counters = {} # (video, name) -> Wert
+
+    def configure(self, level=None, log_format=None, trace=None, stream=None):
+        if level is not None:
+            if level not in LOG_LEVELS:
+                raise ValueError(f"Unbekanntes Log-Level '{level}' (erlaubt: {', '.join(LOG_LEVELS)})")
+            self.level = LOG_LEVELS[level]
+        if log_format is not None:
+            if log_format not in (LOG_FORMAT_TEXT, LOG_FORMAT_JSON):
+                raise ValueError(f"Unbekanntes Log-Format '{log_format}'")
+            self.log_format = log_format
+        if trace is not None:
+            self.trace = bool(trace)
+        if stream is not None:
+            self.stream = stream
+
+    def config(self):
+        """Picklebare Einstellungen für Worker-Prozesse."""
+        level_name = next(name for name, value in LOG_LEVELS.items() if value == self.level)
+        return {"level": level_name, "log_format": self.log_format, "trace": self.trace}
+
+    def log(self, level, message, video=None, **fields):
+        if LOG_LEVELS[level] < self.level:
+            return
+        if self.log_format == LOG_FORMAT_JSON:
+            record = {"ts": datetime.datetime.now().isoformat(timespec="milliseconds"), "level": level,
+                      "pid": os.getpid(), "video": video, "msg": message}
+            record.update(fields)
+            line = json.dumps(record, ensure_ascii=False, default=str)
+        else:
+            prefix = LOG_PREFIXES[level]
+            line = f"{prefix} [{video}]: {message}" if video else f"{prefix}: {message}"
+        print(line, file=self.stream or sys.stdout, flush=self.log_format == LOG_FORMAT_JSON)
+
+    def span(self, stage, video=None):
+        """Kontext, der die Dauer einer Stufe misst: `with instrumentation.span("encode", video=name):`."""
+        if not self.trace:
+            return _NULL_SPAN
+        return _Span(self, stage, video)
+
+    def add_time(self, stage, seconds, video=None):
+        if not self.trace:
+            return
+        with self._lock:
+            entry = self._spans.setdefault((video, stage), [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+
+    def count(self, name, value=1, video=None):
+        if not self.trace:
+            return
+        with self._lock:
+            self._counters[(video, name)] = self._counters.get((video, name), 0) + value
+
+    def reset(self):
+        with self._lock:
+            self._spans.clear()
+            self._counters.clear()
+
+    def drain(self):
+        """Gibt alle erfassten Werte zurück und leert den Speicher (für die Rückgabe aus Worker-Prozessen)."""
+        with self._lock:
+            data = {"spans": [[video, stage, *entry] for (video, stage), entry in self._spans.items()],
+                    "counters": [[video, name, value] for (video, name), value in self._counters.items()]}
+            self._spans.clear()
+            self._counters.clear()
+        return data
+
+    def merge(self, data):
+        with self._lock:
+            for video, stage, calls, total, longest in data.get("spans", []):
+                entry = self._spans.setdefault((video, stage), [0, 0.0, 0.0])
+                entry[0] += calls
+                entry[1] += total
+                entry[2] = max(entry[2], longest)
+            for video, name, value in data.get("counters", []):
+                self._counters[(video, name)] = self._counters.get((video, name), 0) + value
+
+    def summary(self):
+        """Aggregat über alle Dateien: {"stages": {stage: {...}}, "counters": {...}, "files": {video: {stage: s}}}."""
+        with self._lock:
+            stages, files, counters = {}, {}, {}
+            for (video, stage), (calls, total, longest) in self._spans.items():
+                row = stages.setdefault(stage, {"calls": 0, "total_s": 0.0, "max_s": 0.0})
+                row["calls"] += calls
+                row["total_s"] += total
+                row["max_s"] = max(row["max_s"], longest)
+                if video:
+                    files.setdefault(video, {})[stage] = round(total, 4)
+            for (video, name), value in self._counters.items():
+                counters[name] = counters.get(name, 0) + value
+        for row in stages.values():
+            row["mean_s"] = round(row["total_s"] / row["calls"], 4) if row["calls"] else 0.0
+            row["total_s"] = round(row["total_s"], 4)
+            row["max_s"] = round(row["max_s"], 4)
+        return {"stages": stages, "counters": counters, "files": files}
+
+    def emit_summary(self):
+        """Schreibt die Zusammenfassung als Tabelle (Text) bzw. als eine JSON-Zeile."""
+        if not self.trace:
+            return
+        summary = self.summary()
+        if self.log_format == LOG_FORMAT_JSON:
+            self.log("info", "Zusammenfassung", event="summary", **summary)
+            return
+        stream = self.stream or sys.stdout
+        print(f"\n{'Stufe':<18} {'Aufrufe':>8} {'Summe (s)':>10} {'Mittel (ms)':>12} {'Max (ms)':>10}", file=stream)
+        for stage, row in sorted(summary["stages"].items(), key=lambda item: -item[1]["total_s"]):
+            print(f"{stage:<18} {row['calls']:>8} {row['total_s']:>10.3f} {row['mean_s'] * 1000:>12.1f} {row['max_s'] * 1000:>10.1f}",
+                  file=stream)
+        for name, value in sorted(summary["counters"].items()):
+            print(f"{name:<18} {value:>8}", file=stream)
+
+
+class _Span:
+    __slots__ = ("owner", "stage", "video", "start")
+
+    def __init__(self, owner, stage, video):
+        self.owner, self.stage, self.video = owner, stage, video
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        self.owner.add_time(self.stage, elapsed, video=self.video)
+        self.owner.log("debug", f"{self.stage}: {elapsed * 1000:.1f} ms", video=self.video,
+                       event="span", stage=self.stage, seconds=round(elapsed, 6))
+        return False
+
+
+_NULL_SPAN = contextlib.nullcontext()
+instrumentation = Instrumentation()
+try:
+    instrumentation.configure(level=os.environ.get(LOG_LEVEL_ENV, "info").lower(),
+                              log_format=os.environ.get(LOG_FORMAT_ENV, LOG_FORMAT_TEXT).lower(),
+                              trace=os.environ.get(TRACE_ENV, "") not in ("", "0"))
+except ValueError as env_e:
+    print(f"WARNUNG: Ungültige Logging-Umgebungsvariable ignoriert: {env_e}")
+log = instrumentation.log
+
+
+# --- FFmpeg Konfiguration ---
+FFMPEG_MANUAL_PATH = None # Standard: Automatische Erkennung versuchen
+
+# Beschreibung der FFmpeg-Quelle; None, bis discover_ffmpeg() gelaufen ist. Die Suche
+# (imageio-ffmpeg) passiert erst beim ersten Bedarf, nicht beim Import dieses Moduls.
+ffmpeg_path_source = None
+_ffmpeg_discovery_lock = threading.Lock()
+
+
+def discover_ffmpeg():
+    """Einmalige FFmpeg-Suche (manuell, imageio-ffmpeg, System PATH); setzt IMAGEIO_FFMPEG_EXE.
+
+    Läuft beim ersten find_ffmpeg_exe() bzw. im Warm-up der GUI und liefert die
+    Beschreibung der Quelle für die Statuszeile.
+    """
+    global ffmpeg_path_source
+    with _ffmpeg_discovery_lock:
+        if ffmpeg_path_source is not None:
+            return ffmpeg_path_source
+        source = "Automatisch via imageio-ffmpeg / System PATH"
+        if FFMPEG_MANUAL_PATH and os.path.exists(FFMPEG_MANUAL_PATH):
+            os.environ["IMAGEIO_FFMPEG_EXE"] = FFMPEG_MANUAL_PATH
+            source = f"Manuell: {FFMPEG_MANUAL_PATH}"
+            log("info", f"Manueller FFmpeg Pfad wird verwendet: {FFMPEG_MANUAL_PATH}")
+        elif FFMPEG_MANUAL_PATH:
+            log("warning", f"Manueller FFmpeg Pfad '{FFMPEG_MANUAL_PATH}' existiert nicht. Versuche automatische Erkennung.")
+        elif "IMAGEIO_FFMPEG_EXE" in os.environ:
+            try:
+                from imageio_ffmpeg import get_ffmpeg_exe
+                default_exe = get_ffmpeg_exe()
+                log("info", f"Verwende FFmpeg von imageio-ffmpeg: {default_exe}")
+                os.environ["IMAGEIO_FFMPEG_EXE"] = default_exe
+                source = f"Automatisch via imageio-ffmpeg: {default_exe}"
+            except Exception:
+                if "IMAGEIO_FFMPEG_EXE" in os.environ:
+                    del os.environ["IMAGEIO_FFMPEG_EXE"]
+                log("info", "Versuche FFmpeg über System PATH zu finden.")
+                source = "System PATH"
+        else:
+            # Try to get path from imageio-ffmpeg if available but not set in env
+            try:
+                from imageio_ffmpeg import get_ffmpeg_exe
+                default_exe = get_ffmpeg_exe()
+                log("info", f"Verwende FFmpeg von imageio-ffmpeg (implizit): {default_exe}")
+                os.environ["IMAGEIO_FFMPEG_EXE"] = default_exe # Set for consistency
+                source = f"Automatisch via imageio-ffmpeg: {default_exe}"
+            except Exception:
+                log("info", "Versuche FFmpeg über System PATH zu finden (imageio-ffmpeg nicht gefunden/konfiguriert).")
+                source = "System PATH"
+        ffmpeg_path_source = source
+        return source
+
+
+# --- MoviePy Setup ---
+# MoviePy wird erst beim ersten Bedarf importiert (load_moviepy), der Import kostet
+# mehrere hundert Millisekunden und wird von der FFmpeg-Engine nicht gebraucht.
+MOVIEPY_AVAILABLE = None # None = noch nicht geladen, danach True/False
+VideoFileClip = None
+ImageClip = None
+CompositeVideoClip = None
+MoviePyProgressLogger = None
+MOVIEPY_IMPORT_ERROR = None # Text für die GUI-Fehlermeldung, falls der Import scheitert
+_moviepy_lock = threading.Lock()
+
+
+def load_moviepy():
+    """Importiert MoviePy beim ersten Aufruf (threadsicher). Liefert True, wenn MoviePy nutzbar ist."""
+    global MOVIEPY_AVAILABLE, VideoFileClip, ImageClip, CompositeVideoClip, MoviePyProgressLogger, MOVIEPY_IMPORT_ERROR
+    with _moviepy_lock:
+        if MOVIEPY_AVAILABLE is not None:
+            return MOVIEPY_AVAILABLE
+        try:
+            from moviepy.video.io.VideoFileClip import VideoFileClip
+            from moviepy.video.VideoClip import ImageClip
+            from moviepy.video.compositing.CompositeVideoClip import CompositeVideoClip
+            import proglog # Wird von MoviePy mitinstalliert (Fortschritts-Logger)
+            MoviePyProgressLogger = _define_progress_logger(proglog)
+            MOVIEPY_AVAILABLE = True
+            log("info", "MoviePy erfolgreich importiert.")
+        except ImportError:
+            log("error", "MoviePy konnte nicht importiert werden. Stelle sicher, dass es installiert ist (`pip install moviepy`).")
+            MOVIEPY_IMPORT_ERROR = "MoviePy konnte nicht gefunden werden.\nBitte installiere es (`pip install moviepy`) und starte die Anwendung neu."
+            MOVIEPY_AVAILABLE = False
+        except Exception as e:
+            log("error", f"Import von MoviePy fehlgeschlagen: {e}")
+            MOVIEPY_IMPORT_ERROR = f"Ein Fehler ist beim Import von MoviePy aufgetreten:\n{e}"
+            MOVIEPY_AVAILABLE = False
+        return MOVIEPY_AVAILABLE
+
+
+def warm_up():
+    """Lädt alles Teure vorab (FFmpeg-Suche, MoviePy), z. B. in einem Hintergrund-Thread der GUI.
+
+    Liefert {"ffmpeg_exe", "ffmpeg_source", "moviepy_available", "moviepy_error", "ffmpeg_s", "moviepy_s"}.
+    """
+    start = time.perf_counter()
+    ffmpeg_source = discover_ffmpeg()
+    ffmpeg_exe = find_ffmpeg_exe()
+    ffmpeg_done = time.perf_counter()
+    moviepy_available = load_moviepy()
+    return {
+        "ffmpeg_exe": ffmpeg_exe,
+        "ffmpeg_source": ffmpeg_source,
+        "moviepy_available": moviepy_available,
+        "moviepy_error": MOVIEPY_IMPORT_ERROR,
+        "ffmpeg_s": ffmpeg_done - start,
+        "moviepy_s": time.perf_counter() - ffmpeg_done,
+    }
+
+
+# --- Allgemeine Hilfsfunktionen ---
+def to_rgba_hex(color_hex):
+    """'#RRGGBB' -> '#RRGGBBFF'; ungültige Werte werden zu Weiß."""
+    try:
+        if len(color_hex) == 7: return color_hex + "FF"
+        elif len(color_hex) == 9: return color_hex
+    except Exception: pass
+    return "#FFFFFFFF"
+
+
+class LRUCache:
+    """Kleiner, threadsicherer LRU-Cache mit fester Maximalgröße."""
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+
+# --- Schriftarten-Index ---
+FONT_EXTENSIONS = ('.ttf', '.otf', '.ttc')
+REGULAR_STYLE_NAMES = ("regular", "normal", "book", "roman", "medium")
+
+
+def get_cache_dir():
+    """Plattformabhängiger Cache-Ordner der Anwendung (wird bei Bedarf angelegt)."""
+    system = platform.system()
+    if system == "Windows":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+        cache_dir = os.path.join(base, "BProgy", "wz5", "Cache")
+    elif system == "Darwin":
+        cache_dir = os.path.expanduser("~/Library/Caches/BProgy-wz5")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+        cache_dir = os.path.join(base, "bprogy-wz5")
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+
+def get_font_search_dirs():
+    """System-Schriftordner der aktuellen Plattform (nur existierende)."""
+    system = platform.system()
+    if system == "Windows":
+        candidates = [os.path.join(os.environ.get('WINDIR', 'C:\\Windows'), 'Fonts')]
+        local_app_data = os.environ.get("LOCALAPPDATA")
+        if local_app_data: # Benutzer-Fonts (Windows 10+)
+            candidates.append(os.path.join(local_app_data, "Microsoft", "Windows", "Fonts"))
+    elif system == "Darwin":
+        candidates = [os.path.expanduser("~/Library/Fonts"), "/Library/Fonts", "/System/Library/Fonts"]
+    else:
+        candidates = [os.path.expanduser("~/.fonts"), os.path.expanduser("~/.local/share/fonts"),
+                      "/usr/local/share/fonts", "/usr/share/fonts"]
+    return [p for p in candidates if os.path.isdir(p)]
+
+
+def _font_keys(name):
+    """Normalisierte Suchschlüssel für einen Font-/Dateinamen ("DejaVu Sans" -> "dejavu sans", "dejavusans")."""
+    normalized = " ".join(name.lower().replace("_", " ").split())
+    compact = normalized.replace(" ", "").replace("-", "")
+    return {normalized, compact}
+
+
+class FontIndex:
+    """Index Familien-/Stil-/Dateiname -> Schriftdatei.
+
+    Wird einmal (im Hintergrund) aufgebaut, als JSON im Cache-Ordner gespeichert und
+    beim nächsten Start wiederverwendet, solange sich die mtimes der Schriftordner
+    nicht geändert haben. Lookups sind danach reine Dictionary-Zugriffe.
+    """
+    INDEX_VERSION = 1
+
+    def __init__(self, search_dirs=None, cache_path=None):
+        self._search_dirs = search_dirs
+        self._cache_path = cache_path
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._entries = {}   # Schlüssel -> Pfad
+        self._fc_match = {}  # Font-Name -> Pfad oder None (Ergebnis von fc-match, nur im Speicher)
+
+    def build_in_background(self):
+        """Startet den Aufbau/das Laden des Index in einem Daemon-Thread."""
+        threading.Thread(target=self.ensure_loaded, name="FontIndex", daemon=True).start()
+
+    def ensure_loaded(self):
+        """Lädt den Index von Disk oder baut ihn neu auf (nur einmal pro Prozess)."""
+        with self._lock:
+            if self._loaded:
+                return
+            try:
+                search_dirs = self._search_dirs if self._search_dirs is not None else get_font_search_dirs()
+                cache_path = self._cache_path or os.path.join(get_cache_dir(), "font_index.json")
+                dir_mtimes = self._dir_mtimes(search_dirs)
+                if not self._load(cache_path, dir_mtimes):
+                    start = time.perf_counter()
+                    self._entries = self._scan(search_dirs)
+                    log("info", f"Font-Index aufgebaut: {len(self._entries)} Einträge in {time.perf_counter() - start:.2f}s.")
+                    self._save(cache_path, dir_mtimes)
+            except Exception as e:
+                log("warning", f"Font-Index konnte nicht aufgebaut werden (ignoriert): {e}")
+            self._loaded = True
+
+    def lookup(self, font_name):
+        """Liefert den Dateipfad zu einem Font-Namen oder None."""
+        self.ensure_loaded()
+        for key in _font_keys(font_name):
+            path = self._entries.get(key)
+            if path:
+                return path
+        if platform.system() == "Linux":
+            return self._lookup_fc_match(font_name)
+        return None
+
+    def _lookup_fc_match(self, font_name):
+        """fc-match als letzte Instanz; das Ergebnis wird pro Name gemerkt."""
+        if font_name in self._fc_match:
+            return self._fc_match[font_name]
+        fc_path = None
+        try:
+            proc = subprocess.run(['fc-match', '--format=%{file}', font_name], stdout=subprocess.PIPE,
+                                  stderr=subprocess.PIPE, timeout=2)
+            candidate = proc.stdout.decode().strip()
+            if candidate and os.path.exists(candidate):
+                fc_path = candidate
+                log("info", f"Font '{font_name}' via fc-match gefunden: {fc_path}")
+        except (FileNotFoundError, subprocess.TimeoutExpired, Exception) as fc_e:
+            log("info", f"fc-match Versuch fehlgeschlagen: {fc_e}")
+        self._fc_match[font_name] = fc_path
+        return fc_path
+
+    @staticmethod
+    def _dir_mtimes(search_dirs):
+        """mtimes aller (Unter-)Ordner; neue/gelöschte Dateien ändern die mtime ihres Ordners."""
+        mtimes = {}
+        for search_dir in search_dirs:
+            for root_dir, _, _ in os.walk(search_dir):
+                try:
+                    mtimes[root_dir] = os.stat(root_dir).st_mtime
+                except OSError:
+                    pass
+        return mtimes
+
+    @staticmethod
+    def _scan(search_dirs):
+        """Liest Familien- und Stilnamen aller Schriftdateien."""
+        from PIL import ImageFont
+        entries = {}
+        regular_families = set()
+        for search_dir in search_dirs:
+            for root_dir, _, files in os.walk(search_dir):
+                for file_name in files:
+                    stem, ext = os.path.splitext(file_name)
+                    if ext.lower() not in FONT_EXTENSIONS:
+                        continue
+                    path = os.path.join(root_dir, file_name)
+                    for key in _font_keys(stem):
+                        entries.setdefault(key, path)
+                    try:
+                        family, style = ImageFont.truetype(path, 12).getname()
+                    except Exception:
+                        continue # Datei nicht lesbar -> nur über Dateinamen auffindbar
+                    if not family:
+                        continue
+                    style = style or "Regular"
+                    for key in _font_keys(f"{family} {style}"):
+                        entries.setdefault(key, path)
+                    # Der reine Familienname zeigt bevorzugt auf den Regular-Schnitt
+                    is_regular = style.lower() in REGULAR_STYLE_NAMES
+                    for key in _font_keys(family):
+                        if key not in entries or (is_regular and key not in regular_families):
+                            entries[key] = path
+                            if is_regular:
+                                regular_families.add(key)
+        return entries
+
+    def _load(self, cache_path, dir_mtimes):
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if data.get("version") != self.INDEX_VERSION or data.get("dir_mtimes") != dir_mtimes:
+            log("info", "Font-Index veraltet, wird neu aufgebaut.")
+            return False
+        self._entries = data.get("entries", {})
+        log("info", f"Font-Index geladen ({len(self._entries)} Einträge).")
+        return True
+
+    def _save(self, cache_path, dir_mtimes):
+        tmp_path = cache_path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": self.INDEX_VERSION, "dir_mtimes": dir_mtimes, "entries": self._entries}, f)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            log("warning", f"Font-Index konnte nicht gespeichert werden: {e}")
+
+
+FONT_INDEX = FontIndex()
+
+
+@functools.lru_cache(maxsize=128)
+def load_truetype_font(font_path, font_size):
+    """Gecachtes ImageFont.truetype pro (Pfad, Größe)."""
+    from PIL import ImageFont
+    return ImageFont.truetype(font_path, font_size)
+
+
+@functools.lru_cache(maxsize=64)
+def resolve_font_path(font_name):
+    """Font-Name -> Pfad: Index-Lookup, sonst Name wie angegeben (PIL sucht selbst). None = nicht ladbar."""
+    path = FONT_INDEX.lookup(font_name)
+    if path:
+        return path
+    from PIL import ImageFont
+    for candidate in (font_name, f"{font_name}.ttf", f"{font_name.replace(' ', '')}.ttf"):
+        try:
+            ImageFont.truetype(candidate, 12)
+            return candidate
+        except (IOError, OSError):
+            continue
+    return None
+
+
+# --- FFmpeg Hilfsfunktionen ---
+# FFmpeg-Kindprozesse laufen in eigener Sitzung/Prozessgruppe: ein Strg+C im Terminal beendet sie nicht
+# unkontrolliert, abgebrochen wird ausschließlich über das Stop-Event (siehe run_ffmpeg).
+if platform.system() == "Windows":
+    SUBPROCESS_ISOLATION = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+else:
+    SUBPROCESS_ISOLATION = {"start_new_session": True}
+CANCEL_KILL_TIMEOUT = 1.0 # Sekunden zwischen terminate() und kill()
+
+
+class ProcessingCancelled(Exception):
+    """Die Verarbeitung wurde über das Stop-Event abgebrochen."""
+
+
+def _ignore_sigint():
+    """Initializer für Worker-/Manager-Prozesse: Strg+C behandelt nur der Hauptprozess."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def terminate_process(proc):
+    """Beendet einen Kindprozess sofort: terminate(), nach CANCEL_KILL_TIMEOUT kill()."""
+    if proc.poll() is not None:
+        return
+    proc.terminate()
+    try:
+        proc.wait(timeout=CANCEL_KILL_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
+def _terminate_on_stop(proc, stop_event):
+    """Watcher-Thread: beendet `proc`, sobald das Stop-Event gesetzt wird."""
+    while proc.poll() is None:
+        if stop_event.wait(0.2):
+            terminate_process(proc)
+            return
+
+
+def remove_partial_output(path):
+    """Löscht eine unvollständige Ausgabedatei (Abbruch/Fehler)."""
+    try:
+        if path and os.path.exists(path):
+            os.remove(path)
+            log("info", f"Unvollständige Ausgabe gelöscht: {path}")
+    except OSError as e:
+        log("warning", f"Unvollständige Ausgabe '{path}' konnte nicht gelöscht werden: {e}")
+
+
+class FFmpegError(RuntimeError):
+    """FFmpeg ist mit einem Fehlercode beendet worden."""
+    def __init__(self, returncode, stderr_text):
+        self.returncode = returncode
+        self.stderr_text = stderr_text or ""
+        tail = " ".join(self.stderr_text.strip().splitlines()[-3:])
+        super().__init__(f"FFmpeg Exit-Code {returncode}: {tail}")
+
+
+def run_ffmpeg(cmd, on_progress=None, stop_event=None):
+    """Führt einen FFmpeg-Aufruf aus und meldet den echten Encoder-Fortschritt.
+
+    FFmpeg schreibt über `-progress pipe:1` Blöcke mit frame=, out_time_us=, ...
+    `on_progress(frames_done, out_time_s)` wird pro Block aufgerufen.
+    Wird `stop_event` gesetzt, wird FFmpeg innerhalb einer Sekunde beendet und
+    ProcessingCancelled geworfen. Wirft FFmpegError bei Exit-Code != 0.
+    """
+    cmd = [cmd[0], "-progress", "pipe:1", "-nostats"] + list(cmd[1:])
+    with tempfile.TemporaryFile() as stderr_file: # Datei statt Pipe: kein Deadlock bei viel stderr
+        proc = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=stderr_file,
+                                **SUBPROCESS_ISOLATION)
+        if stop_event is not None:
+            threading.Thread(target=_terminate_on_stop, args=(proc, stop_event), daemon=True).start()
+        frames_done, out_time = 0, 0.0
+        for raw_line in proc.stdout:
+            key, _, value = raw_line.decode(errors="replace").strip().partition("=")
+            try:
+                if key == "frame":
+                    frames_done = int(value)
+                elif key == "out_time_us":
+                    out_time = max(0.0, int(value) / 1_000_000)
+            except ValueError: # "N/A" am Anfang
+                continue
+            if key == "progress" and on_progress:
+                on_progress(frames_done, out_time)
+        proc.wait()
+        if stop_event is not None and stop_event.is_set():
+            raise ProcessingCancelled()
+        if proc.returncode != 0:
+            stderr_file.seek(0)
+            raise FFmpegError(proc.returncode, stderr_file.read().decode(errors="replace"))
+
+
+def find_ffmpeg_exe():
+    """Liefert den Pfad zur FFmpeg-Binary (imageio-ffmpeg/manuell oder System PATH) oder None."""
+    discover_ffmpeg()
+    exe = os.environ.get("IMAGEIO_FFMPEG_EXE")
+    if exe and os.path.exists(exe):
+        return exe
+    return shutil.which("ffmpeg")
+
+
+def probe_media(video_path):
+    """Liest die Stream-Infos einer Datei über `ffmpeg -i` (funktioniert auch ohne ffprobe)."""
+    if not os.path.isfile(video_path):
+        raise FileNotFoundError(f"Datei nicht gefunden: {video_path}")
+    ffmpeg_exe = find_ffmpeg_exe()
+    if not ffmpeg_exe:
+        raise FileNotFoundError("ffmpeg wurde nicht gefunden.")
+    proc = subprocess.run([ffmpeg_exe, "-hide_banner", "-nostdin", "-i", video_path],
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    # FFmpeg beendet sich ohne Ausgabedatei immer mit Code 1, daher nur die Ausgabe auswerten
+    info_text = proc.stderr.decode(errors="replace")
+
+    # width/height sind die Anzeigegröße (nach der Rotation, die FFmpeg beim Dekodieren anwendet),
+    # rotation die Drehung im Uhrzeigersinn dorthin (0, 90, 180 oder 270, siehe rotation_filters)
+    info = {"duration": None, "bitrate": None, "width": None, "height": None, "rotation": 0,
+            "fps": None, "video_codec": None, "video_profile": None, "pix_fmt": None, "audio_codec": None}
+    match = re.search(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)", info_text)
+    if match:
+        h, m, sec = match.groups()
+        info["duration"] = int(h) * 3600 + int(m) * 60 + float(sec)
+    match = re.search(r"bitrate: (\d+) kb/s", info_text)
+    if match:
+        info["bitrate"] = int(match.group(1)) * 1000
+
+    in_video_stream = False # Zeilen nach der gewählten Videospur (Metadaten, Side data) bis zum nächsten Stream
+    for line in info_text.splitlines():
+        line = line.strip()
+        if not line.startswith("Stream #"):
+            if in_video_stream:
+                # "displaymatrix: rotation of -90.00 degrees" (gegen den Uhrzeigersinn) bzw. ältere Versionen "rotate : 90"
+                rotation_match = re.search(r"displaymatrix: rotation of (-?\d+(?:\.\d+)?) degrees", line)
+                tag_match = re.match(r"rotate\s*:\s*(-?\d+(?:\.\d+)?)$", line)
+                if rotation_match or tag_match:
+                    degrees = -float(rotation_match.group(1)) if rotation_match else float(tag_match.group(1))
+                    quarter = round(degrees / 90)
+                    # Schräge Winkel dreht FFmpeg beim Dekodieren nicht
+                    info["rotation"] = (quarter * 90) % 360 if abs(degrees - quarter * 90) < 1 else 0
+            continue
+        in_video_stream = False
+        if ": Video: " in line and info["video_codec"] is None and "attached pic" not in line:
+            in_video_stream = True
+            info["video_codec"] = line.split(": Video: ", 1)[1].split()[0].strip(",")
+            # "h264 (High) (avc1 / 0x31637661), yuv420p(progressive), 1280x720 ..."
+            profile_match = re.search(r": Video: \w+ \(([^)/]+)\)", line)
+            if profile_match:
+                info["video_profile"] = profile_match.group(1)
+            pix_fmt_match = re.search(r", (\w+)(?:\([^)]*\))?, \d{2,5}x\d{2,5}", line)
+            if pix_fmt_match:
+                info["pix_fmt"] = pix_fmt_match.group(1)
+            size_match = re.search(r", (\d{2,5})x(\d{2,5})", line)
+            if size_match:
+                info["width"], info["height"] = int(size_match.group(1)), int(size_match.group(2))
+            fps_match = re.search(r", (\d+(?:\.\d+)?) fps", line) or re.search(r", (\d+(?:\.\d+)?) tbr", line)
+            if fps_match:
+                info["fps"] = float(fps_match.group(1))
+        elif ": Audio: " in line and info["audio_codec"] is None:
+            info["audio_codec"] = line.split(": Audio: ", 1)[1].split()[0].strip(",")
+
+    if info["video_codec"] is None or not info["width"]:
+        last_line = info_text.strip().splitlines()[-1] if info_text.strip() else "keine Ausgabe"
+        raise ValueError(f"Keine lesbare Videospur gefunden ({last_line})")
+    if info["rotation"] in (90, 270):
+        info["width"], info["height"] = info["height"], info["width"]
+    return info
+
+
+def rotation_filters(rotation):
+    """FFmpeg-Filter, die ein kodiertes Bild um `rotation` Grad im Uhrzeigersinn drehen (wie die Auto-Rotation)."""
+    return {90: ["transpose=clock"], 180: ["hflip", "vflip"], 270: ["transpose=cclock"]}.get(rotation % 360, [])
+
+
+class MediaProbeCache:
+    """probe_media()-Ergebnisse pro Datei-Version (Pfad, mtime, Größe), auch Fehler.
+
+    Eine geänderte Datei wird neu analysiert; defekte Dateien werden nicht bei jedem
+    Zugriff erneut geöffnet. Threadsicher.
+    """
+    def __init__(self, maxsize=PROBE_CACHE_SIZE):
+        self._entries = LRUCache(maxsize)
+
+    def probe(self, video_path):
+        """Wie probe_media(), aber aus dem Cache; wirft den (gecachten) Analysefehler erneut."""
+        stat = os.stat(video_path)
+        key = (os.path.abspath(video_path), stat.st_mtime_ns, stat.st_size)
+        entry = self._entries.get(key)
+        if entry is None:
+            try:
+                entry = (probe_media(video_path), None)
+            except FileNotFoundError:
+                raise # ffmpeg fehlt: nichts cachen
+            except Exception as e:
+                entry = (None, str(e) or type(e).__name__)
+            self._entries.put(key, entry)
+        info, error = entry
+        if error:
+            raise ValueError(error)
+        return info
+
+
+probe_cache = MediaProbeCache()
+
+
+def media_problem(info):
+    """Grund, warum eine analysierte Datei nicht verarbeitet werden kann, sonst None."""
+    if info["video_codec"] in ("none", None):
+        return "Videocodec wird von FFmpeg nicht unterstützt"
+    if info["width"] < 16 or info["height"] < 16:
+        return f"Auflösung {info['width']}x{info['height']} zu klein"
+    if info["duration"] is not None and info["duration"] <= 0:
+        return "Dauer 0 (leere oder abgeschnittene Datei)"
+    return None
+
+
+def describe_media(info):
+    """Kurzbeschreibung für Listen/Logs, z.B. '1920x1080 · 0:10:00 · 30 fps · h264/aac · 5.2 Mbit/s'."""
+    parts = [f"{info['width']}x{info['height']}"]
+    if info.get("rotation"):
+        parts[0] += f" (gedreht {info['rotation']}°)"
+    if info["duration"] is not None:
+        parts.append(format_duration(info["duration"]))
+    if info["fps"]:
+        parts.append(f"{info['fps']:g} fps")
+    parts.append(f"{info['video_codec']}/{info['audio_codec'] or 'stumm'}")
+    if info["bitrate"]:
+        parts.append(f"{info['bitrate'] / 1e6:.1f} Mbit/s")
+    return " · ".join(parts)
+
+
+def preflight_probe(video_paths, max_workers=PROBE_WORKERS, on_result=None):
+    """Analysiert alle Dateien parallel vorab (gecacht über probe_cache).
+
+    Liefert {Pfad: (info, Fehler)}; `info` ist None, wenn die Datei nicht lesbar ist oder
+    media_problem() sie ablehnt (Fehler enthält dann den Grund). `on_result(path, info, error)`
+    wird pro Datei aufgerufen, sobald sie fertig ist (aus Worker-Threads).
+    """
+    def probe(path):
+        try:
+            info = probe_cache.probe(path)
+        except FileNotFoundError:
+            if os.path.isfile(path):
+                raise # ffmpeg fehlt
+            return path, None, f"Datei nicht gefunden: {path}"
+        except Exception as e:
+            return path, None, str(e)
+        problem = media_problem(info)
+        return path, (None if problem else info), problem
+
+    results = {}
+    if not video_paths:
+        return results
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(video_paths)))) as executor:
+        for future in concurrent.futures.as_completed([executor.submit(probe, path) for path in video_paths]):
+            path, info, error = future.result()
+            results[path] = (info, error)
+            if on_result:
+                on_result(path, info, error)
+    return results
+
+
+def compute_watermark_position(video_size, wm_size, relative_pos, margin=WATERMARK_MARGIN):
+    """Rechnet die relative Vorschau-Position (Mittelpunkt) in Pixel (oben links) um, begrenzt auf das Video."""
+    video_w, video_h = video_size
+    wm_w, wm_h = wm_size
+    pos_x = relative_pos[0] * video_w - wm_w / 2
+    pos_y = relative_pos[1] * video_h - wm_h / 2
+    pos_x = max(margin, min(pos_x, video_w - wm_w - margin))
+    pos_y = max(margin, min(pos_y, video_h - wm_h - margin))
+    return pos_x, pos_y
+
+
+def check_watermark_in_frame(video_size, wm_size, position):
+    """Wirft ValueError, wenn das Wasserzeichen an `position` (oben links, px) nicht ganz im Bild liegt.
+
+    Sonst entstünde ohne Fehlermeldung ein Video mit abgeschnittenem oder ganz fehlendem Wasserzeichen.
+    """
+    video_w, video_h = video_size
+    wm_w, wm_h = wm_size
+    pos_x, pos_y = (int(v) for v in position)
+    if pos_x < 0 or pos_y < 0 or pos_x + wm_w > video_w or pos_y + wm_h > video_h:
+        raise ValueError(f"Wasserzeichen ({wm_w}x{wm_h} bei {pos_x},{pos_y}) liegt nicht im Bild ({video_w}x{video_h}); "
+                         "Schriftgröße verkleinern oder Text kürzen.")
+
+
+def select_audio_codec(source_audio_codec):
+    """Entscheidet pro Datei: 'copy' (MP4-kompatibel), AUDIO_CODEC (Transkodierung) oder None (kein Ton)."""
+    if not source_audio_codec:
+        return None
+    if source_audio_codec.lower() in MP4_COPY_AUDIO_CODECS:
+        return "copy"
+    return AUDIO_CODEC
+
+
+def describe_audio_path(source_audio_codec, audio_codec):
+    """Text für das Log, welcher Audio-Weg gewählt wurde."""
+    if audio_codec is None:
+        return "keine Audiospur"
+    if audio_codec == "copy":
+        return f"{source_audio_codec} -> Stream-Copy (kein Re-Encode)"
+    return f"{source_audio_codec} -> {audio_codec} (Transkodierung)"
+
+
+def remux_with_source_audio(video_only_path, source_path, output_path):
+    """Kombiniert das stumm geschriebene Video mit der unveränderten Audiospur der Quelle."""
+    ffmpeg_exe = find_ffmpeg_exe()
+    cmd = [
+        ffmpeg_exe, "-hide_banner", "-nostdin", "-y", "-loglevel", "error",
+        "-i", video_only_path, "-i", source_path,
+        "-map", "0:v:0", "-map", "1:a:0",
+        "-c", "copy", "-movflags", "+faststart",
+        output_path,
+    ]
+    run_ffmpeg(cmd)
+
+
+def default_encoder():
+    """Encoder-Einstellungen ohne Tuning-Profil."""
+    return {"preset": ENCODER_PRESET, "crf": ENCODER_CRF}
+
+
+def encoder_args(encoder=None):
+    """x264-Argumente (-c:v, -preset, -crf) für FFmpeg."""
+    encoder = encoder or default_encoder()
+    return ["-c:v", VIDEO_CODEC, "-preset", encoder["preset"], "-crf", str(encoder["crf"])]
+
+
+def overlay_filter_graph(position, base="[0:v]", enable=None, output="[v]"):
+    """Filtergraph: Wasserzeichen (Eingang 1) an `position` über `base` legen, Ausgang `output`.
+
+    `enable` ist ein optionaler Zeitausdruck (siehe time_ranges_enable), außerhalb bleibt das Bild unverändert.
+    """
+    pos_x, pos_y = (int(v) for v in position)
+    enable_option = f":enable='{enable}'" if enable else ""
+    return f"{base}[1:v]overlay={pos_x}:{pos_y}:format=auto{enable_option},format={OUTPUT_PIX_FMT}{output}"
+
+
+def build_ffmpeg_overlay_command(ffmpeg_exe, video_path, wm_png_path, output_path, position, threads, audio_codec=AUDIO_CODEC, encoder=None,
+                                 enable=None):
+    """Baut den FFmpeg-Aufruf, der das Wasserzeichen-PNG per `overlay` Filter einbrennt.
+
+    `audio_codec` ist 'copy' (Stream-Copy), ein Encoder-Name oder None (kein Ton).
+    `encoder` ist ein dict mit preset/crf (Standard: default_encoder()).
+    `enable` beschränkt das Wasserzeichen auf Zeitbereiche (siehe time_ranges_enable).
+    """
+    cmd = [
+        ffmpeg_exe, "-hide_banner", "-nostdin", "-y", "-loglevel", "error",
+        "-i", video_path,
+        "-i", wm_png_path,
+        "-filter_complex", overlay_filter_graph(position, enable=enable),
+        "-map", "[v]",
+    ]
+    if audio_codec:
+        cmd += ["-map", "0:a:0", "-c:a", audio_codec]
+    cmd += encoder_args(encoder) + [
+        "-threads", str(threads),
+        "-movflags", "+faststart",
+        output_path,
+    ]
+    return cmd
+
+
+def watermark_video_ffmpeg(video_path, output_path, wm_png_path, wm_size, relative_pos, threads, info=None, on_progress=None, stop_event=None,
+                           segment_threshold=None, encoder=None, time_ranges=None):
+    """FFmpeg-Engine: ein einziger FFmpeg-Prozess, alle Pixel bleiben in FFmpeg.
+
+    `info` ist ein optionales, bereits vorhandenes probe_media()-Ergebnis,
+    `encoder` preset/crf aus dem Tuning-Profil (siehe select_encoder_settings).
+    Videos ab `segment_threshold` Sekunden werden in Segmenten parallel encodiert
+    (siehe watermark_video_segmented); None/0 schaltet das ab.
+    Mit `time_ranges` (siehe parse_time_ranges) bekommen nur diese Zeitbereiche das
+    Wasserzeichen; wenn möglich wird nur dort neu encodiert (watermark_video_ranges).
+    """
+    filename = os.path.basename(video_path)
+    ffmpeg_exe = find_ffmpeg_exe()
+    if not ffmpeg_exe:
+        raise FileNotFoundError("ffmpeg wurde nicht gefunden.")
+
+    if not info:
+        with instrumentation.span("probe", video=filename):
+            info = probe_media(video_path)
+    log("info", f"Video Größe: {info['width']}x{info['height']}, Dauer: {info['duration']}s", video=filename)
+    pos_x, pos_y = compute_watermark_position((info["width"], info["height"]), wm_size, relative_pos)
+    log("info", f"Wasserzeichen Position (px): ({pos_x:.1f}, {pos_y:.1f})", video=filename)
+    check_watermark_in_frame((info["width"], info["height"]), wm_size, (pos_x, pos_y))
+
+    audio_codec = select_audio_codec(info["audio_codec"])
+    log("info", f"Audio: {describe_audio_path(info['audio_codec'], audio_codec)}", video=filename)
+
+    enable = None
+    if time_ranges:
+        enable = time_ranges_enable(time_ranges)
+        if range_copy_profile(info):
+            try:
+                return watermark_video_ranges(video_path, output_path, wm_png_path, (pos_x, pos_y), threads, info,
+                                              audio_codec, time_ranges, on_progress, stop_event, encoder)
+            except (FFmpegError, ValueError) as range_e:
+                if stop_event is not None and stop_event.is_set():
+                    raise
+                log("warning", f"Teilbereich-Encoding nicht möglich ({range_e}), encodiere das ganze Video...", video=filename)
+        else:
+            log("info", f"Quelle ({info['video_codec']}, {info.get('pix_fmt')}) lässt sich nicht abschnittsweise kopieren, "
+                        "encodiere das ganze Video (Wasserzeichen nur in den Zeitbereichen).", video=filename)
+
+    parallel = segment_parallelism(info["duration"], threads, segment_threshold)
+    if parallel > 1:
+        try:
+            return watermark_video_segmented(video_path, output_path, wm_png_path, (pos_x, pos_y), parallel,
+                                             info, audio_codec, on_progress, stop_event, encoder, time_ranges)
+        except (FFmpegError, ValueError) as seg_e:
+            if stop_event is not None and stop_event.is_set():
+                raise
+            log("warning", f"Segment-Encoding fehlgeschlagen ({seg_e}), encodiere in einem Durchgang...", video=filename)
+
+    cmd = build_ffmpeg_overlay_command(ffmpeg_exe, video_path, wm_png_path, output_path, (pos_x, pos_y), threads, audio_codec, encoder,
+                                       enable)
+    log("info", f"Schreibe Ergebnis nach '{output_path}' (FFmpeg overlay)...", video=filename)
+    with instrumentation.span("encode", video=filename):
+        try:
+            run_ffmpeg(cmd, on_progress, stop_event)
+        except FFmpegError:
+            if audio_codec != "copy":
+                raise
+            # Manche Spuren lassen sich trotz passendem Codec nicht in MP4 kopieren -> einmal mit AAC versuchen
+            log("warning", f"Audio Stream-Copy fehlgeschlagen, transkodiere nach {AUDIO_CODEC}...", video=filename)
+            audio_codec = AUDIO_CODEC
+            cmd = build_ffmpeg_overlay_command(ffmpeg_exe, video_path, wm_png_path, output_path, (pos_x, pos_y), threads, audio_codec, encoder,
+                                               enable)
+            run_ffmpeg(cmd, on_progress, stop_event)
+    return describe_audio_path(info["audio_codec"], audio_codec)
+
+
+def parse_renditions(spec):
+    """Prüft Ausgabestufen (ABR-Leiter) und liefert eine normalisierte Liste oder None.
+
+    `spec` ist eine Liste von dicts (height/width, crf oder bitrate in kbit/s bzw. "3000k",
+    suffix) oder ein Text wie "1080:23,720:26,480:1200k:_mobil" (Höhe:CRF|Bitrate[:Suffix]).
+    Wirft ValueError mit verständlicher Meldung.
+    """
+    if not spec:
+        return None
+    if isinstance(spec, str):
+        items = []
+        for part in (p.strip() for p in spec.split(",")):
+            if not part:
+                continue
+            fields = part.split(":")
+            if len(fields) > 3:
+                raise ValueError(f"Ausgabestufe '{part}': erwartet Höhe[:CRF|Bitrate[:Suffix]]")
+            item = {"height": fields[0]}
+            if len(fields) > 1 and fields[1]:
+                item["bitrate" if fields[1].lower().endswith("k") else "crf"] = fields[1]
+            if len(fields) > 2:
+                item["suffix"] = fields[2]
+            items.append(item)
+        spec = items
+    if not isinstance(spec, list) or not spec:
+        raise ValueError("Ausgabestufen müssen eine Liste sein.")
+    renditions = []
+    for item in spec:
+        if not isinstance(item, dict):
+            raise ValueError("Jede Ausgabestufe braucht height/width und optional crf oder bitrate.")
+        try:
+            width = int(item["width"]) if item.get("width") not in (None, "") else None
+            height = int(item["height"]) if item.get("height") not in (None, "") else None
+            crf = int(item["crf"]) if item.get("crf") not in (None, "") else None
+            bitrate = item.get("bitrate")
+            if bitrate not in (None, ""):
+                bitrate = int(str(bitrate).lower().rstrip("k"))
+            else:
+                bitrate = None
+        except (TypeError, ValueError):
+            raise ValueError(f"Ausgabestufe {item}: width/height/crf/bitrate müssen Zahlen sein.")
+        if width is None and height is None:
+            raise ValueError(f"Ausgabestufe {item}: height oder width fehlt.")
+        if any(v is not None and v <= 0 for v in (width, height, bitrate)):
+            raise ValueError(f"Ausgabestufe {item}: Werte müssen > 0 sein.")
+        if crf is not None and not 0 <= crf <= 51:
+            raise ValueError(f"Ausgabestufe {item}: crf muss zwischen 0 und 51 liegen.")
+        if crf is not None and bitrate is not None:
+            raise ValueError(f"Ausgabestufe {item}: entweder crf oder bitrate angeben.")
+        suffix = str(item.get("suffix") or (f"_{height}p" if height else f"_{width}w"))
+        if not re.fullmatch(r"[\w.-]+", suffix):
+            raise ValueError(f"Ausgabestufe {item}: Suffix '{suffix}' enthält ungültige Zeichen.")
+        renditions.append({"width": width, "height": height, "crf": crf, "bitrate": bitrate, "suffix": suffix})
+    suffixes = [r["suffix"] for r in renditions]
+    if len(set(suffixes)) != len(suffixes):
+        raise ValueError("Die Suffixe der Ausgabestufen müssen eindeutig sein.")
+    return renditions
+
+
+def rendition_output_path(output_path, suffix):
+    """`<name>_wasserzeichen.mp4` -> `<name>_wasserzeichen<suffix>.mp4`."""
+    root, ext = os.path.splitext(output_path)
+    return f"{root}{suffix}{ext}"
+
+
+def job_output_paths(job):
+    """Alle Ausgabedateien eines Jobs (eine pro Ausgabestufe bzw. Variante, sonst nur output_path)."""
+    if job.get("renditions"):
+        return [r["output_path"] for r in job["renditions"]]
+    if job.get("variants"):
+        return [v["output_path"] for v in job["variants"]]
+    return [job["output_path"]]
+
+
+def ladder_filter_graph(position, renditions):
+    """Filtergraph: einmal Wasserzeichen einbrennen, dann per split auf alle Stufen skalieren (Ausgänge [r0], [r1], ...).
+
+    Das Wasserzeichen wird mit dem Bild skaliert; Größe und Randabstand bleiben so
+    in jeder Stufe relativ gleich.
+    """
+    graph = overlay_filter_graph(position)
+    graph += f";[v]split={len(renditions)}" + "".join(f"[s{i}]" for i in range(len(renditions)))
+    for i, rendition in enumerate(renditions):
+        width = rendition["width"] or -2 # -2: Seitenverhältnis halten, gerade Pixelzahl
+        height = rendition["height"] or -2
+        graph += f";[s{i}]scale={width}:{height}:flags=bicubic,setsar=1,format={OUTPUT_PIX_FMT}[r{i}]"
+    return graph
+
+
+def rendition_encoder_args(rendition, encoder=None):
+    """x264-Argumente einer Stufe: CRF (Stufe oder Encoder-Vorgabe) oder Zielbitrate mit VBV."""
+    encoder = encoder or default_encoder()
+    args = ["-c:v", VIDEO_CODEC, "-preset", encoder["preset"]]
+    if rendition["bitrate"]:
+        kbps = rendition["bitrate"]
+        return args + ["-b:v", f"{kbps}k", "-maxrate", f"{kbps}k", "-bufsize", f"{2 * kbps}k"]
+    return args + ["-crf", str(rendition["crf"] if rendition["crf"] is not None else encoder["crf"])]
+
+
+def build_ffmpeg_ladder_command(ffmpeg_exe, video_path, wm_png_path, output_paths, renditions, position, threads,
+                                audio_codec=AUDIO_CODEC, encoder=None):
+    """Ein FFmpeg-Aufruf, der einmal dekodiert und einbrennt und alle Ausgabestufen parallel encodiert."""
+    cmd = [
+        ffmpeg_exe, "-hide_banner", "-nostdin", "-y", "-loglevel", "error",
+        "-i", video_path,
+        "-i", wm_png_path,
+        "-filter_complex", ladder_filter_graph(position, renditions),
+    ]
+    # Thread-Budget des Jobs auf die Encoder der Stufen verteilen
+    encoder_threads = max(1, -(-threads // len(renditions)))
+    for index, (output_path, rendition) in enumerate(zip(output_paths, renditions)):
+        cmd += ["-map", f"[r{index}]"]
+        if audio_codec:
+            cmd += ["-map", "0:a:0", "-c:a", audio_codec]
+        cmd += rendition_encoder_args(rendition, encoder) + [
+            "-threads", str(encoder_threads),
+            "-movflags", "+faststart",
+            output_path,
+        ]
+    return cmd
+
+
+def watermark_video_ladder(video_path, output_paths, renditions, wm_png_path, wm_size, relative_pos, threads, info=None,
+                           on_progress=None, stop_event=None, encoder=None):
+    """FFmpeg-Engine mit mehreren Ausgabestufen aus einem einzigen Decode (ABR-Leiter).
+
+    `output_paths` gehört in gleicher Reihenfolge zu `renditions` (siehe parse_renditions).
+    """
+    filename = os.path.basename(video_path)
+    ffmpeg_exe = find_ffmpeg_exe()
+    if not ffmpeg_exe:
+        raise FileNotFoundError("ffmpeg wurde nicht gefunden.")
+    if not info:
+        with instrumentation.span("probe", video=filename):
+            info = probe_media(video_path)
+    position = compute_watermark_position((info["width"], info["height"]), wm_size, relative_pos)
+    check_watermark_in_frame((info["width"], info["height"]), wm_size, position)
+    audio_codec = select_audio_codec(info["audio_codec"])
+    labels = ", ".join(r["suffix"].lstrip("_") for r in renditions)
+    log("info", f"Video Größe: {info['width']}x{info['height']}, Dauer: {info['duration']}s, "
+                f"{len(renditions)} Ausgabestufen ({labels}) aus einem Decode", video=filename)
+    log("info", f"Audio: {describe_audio_path(info['audio_codec'], audio_codec)}", video=filename)
+
+    cmd = build_ffmpeg_ladder_command(ffmpeg_exe, video_path, wm_png_path, output_paths, renditions, position, threads, audio_codec, encoder)
+    with instrumentation.span("encode", video=filename):
+        try:
+            run_ffmpeg(cmd, on_progress, stop_event)
+        except FFmpegError:
+            if audio_codec != "copy":
+                raise
+            log("warning", f"Audio Stream-Copy fehlgeschlagen, transkodiere nach {AUDIO_CODEC}...", video=filename)
+            audio_codec = AUDIO_CODEC
+            cmd = build_ffmpeg_ladder_command(ffmpeg_exe, video_path, wm_png_path, output_paths, renditions, position, threads,
+                                              audio_codec, encoder)
+            run_ffmpeg(cmd, on_progress, stop_event)
+    return describe_audio_path(info["audio_codec"], audio_codec)
+
+
+# --- Varianten (ein Decode, ein Wasserzeichen pro Empfänger) ---
+def parse_variants(spec):
+    """Prüft Wasserzeichen-Varianten und liefert eine normalisierte Liste oder None.
+
+    `spec` ist eine Liste von dicts (text, optional color, position [x, y], suffix) oder
+    ein Text wie "Lizenziert für A; Lizenziert für B" (ein Wasserzeichentext pro Variante,
+    Farbe und Position aus den übrigen Einstellungen). Wirft ValueError mit verständlicher Meldung.
+    """
+    if not spec:
+        return None
+    if isinstance(spec, str):
+        spec = [{"text": part.strip()} for part in spec.split(";") if part.strip()]
+    if not isinstance(spec, list) or not spec:
+        raise ValueError("Varianten müssen eine Liste sein.")
+    variants = []
+    for index, item in enumerate(spec):
+        if not isinstance(item, dict) or not isinstance(item.get("text"), str) or not item["text"].strip():
+            raise ValueError(f"Variante {index + 1}: 'text' fehlt.")
+        color = item.get("color")
+        if color is not None and (not isinstance(color, str) or not re.fullmatch(r"#[0-9A-Fa-f]{6}([0-9A-Fa-f]{2})?", color)):
+            raise ValueError(f"Variante {index + 1}: 'color' muss im Format #RRGGBB oder #RRGGBBAA angegeben werden.")
+        position = item.get("position")
+        if position is not None:
+            try:
+                position = tuple(float(v) for v in position)
+            except (TypeError, ValueError):
+                position = ()
+            if len(position) != 2 or not all(0.0 <= v <= 1.0 for v in position):
+                raise ValueError(f"Variante {index + 1}: 'position' muss eine Liste [x, y] mit Werten zwischen 0 und 1 sein.")
+        suffix = str(item.get("suffix") or f"_v{index + 1:02d}")
+        if not re.fullmatch(r"[\w.-]+", suffix):
+            raise ValueError(f"Variante {index + 1}: Suffix '{suffix}' enthält ungültige Zeichen.")
+        variants.append({"text": item["text"], "color": color, "position": position, "suffix": suffix})
+    suffixes = [v["suffix"] for v in variants]
+    if len(set(suffixes)) != len(suffixes):
+        raise ValueError("Die Suffixe der Varianten müssen eindeutig sein.")
+    return variants
+
+
+def variants_manifest_path(output_path):
+    """`<name>_wasserzeichen.mp4` -> `<name>_wasserzeichen_varianten.json`."""
+    return f"{os.path.splitext(output_path)[0]}{VARIANTS_MANIFEST_SUFFIX}"
+
+
+def write_variants_manifest(job):
+    """Schreibt die Zuordnung Variante -> Ausgabedatei eines Jobs als JSON (atomar ersetzt)."""
+    manifest = {
+        "input": os.path.abspath(job["video_path"]),
+        "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "variants": [{"suffix": v["suffix"], "text": v["text"], "color": v["color"], "position": list(v["relative_pos"]),
+                      "output": os.path.abspath(v["output_path"]), "output_size": os.path.getsize(v["output_path"]),
+                      "status": "ok"}
+                     for v in job["variants"]],
+    }
+    temp_path = job["manifest_path"] + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, job["manifest_path"])
+
+
+def variants_filter_graph(positions, enable=None):
+    """Filtergraph: Quelle per split verteilen, je Zweig das eigene Wasserzeichen (Eingang i+1) einbrennen.
+
+    Ausgänge [v0], [v1], ...; `enable` wie bei overlay_filter_graph.
+    """
+    enable_option = f":enable='{enable}'" if enable else ""
+    graph = f"[0:v]split={len(positions)}" + "".join(f"[b{i}]" for i in range(len(positions)))
+    for i, (pos_x, pos_y) in enumerate(positions):
+        graph += f";[b{i}][{i + 1}:v]overlay={int(pos_x)}:{int(pos_y)}:format=auto{enable_option},format={OUTPUT_PIX_FMT}[v{i}]"
+    return graph
+
+
+def build_ffmpeg_variants_command(ffmpeg_exe, video_path, output_paths, variants, positions, threads, audio_codec=AUDIO_CODEC, encoder=None,
+                                  enable=None):
+    """Ein FFmpeg-Aufruf, der einmal dekodiert und alle Varianten parallel einbrennt und encodiert."""
+    cmd = [ffmpeg_exe, "-hide_banner", "-nostdin", "-y", "-loglevel", "error", "-i", video_path]
+    for variant in variants:
+        cmd += ["-i", variant["wm_png_path"]]
+    cmd += ["-filter_complex", variants_filter_graph(positions, enable)]
+    # Thread-Budget des Jobs auf die Encoder der Varianten verteilen
+    encoder_threads = max(1, -(-threads // len(variants)))
+    for index, output_path in enumerate(output_paths):
+        cmd += ["-map", f"[v{index}]"]
+        if audio_codec:
+            cmd += ["-map", "0:a:0", "-c:a", audio_codec]
+        cmd += encoder_args(encoder) + [
+            "-threads", str(encoder_threads),
+            "-movflags", "+faststart",
+            output_path,
+        ]
+    return cmd
+
+
+def watermark_video_variants(video_path, output_paths, variants, threads, info=None, on_progress=None, stop_event=None, encoder=None,
+                             time_ranges=None):
+    """FFmpeg-Engine mit einer Ausgabe pro Variante aus einem einzigen Decode.
+
+    `output_paths` gehört in gleicher Reihenfolge zu `variants` (siehe parse_variants,
+    ergänzt um wm_png_path, wm_size und relative_pos). Jede Variante bekommt ihr eigenes, vorab gerastertes Wasserzeichen und ihren
+    eigenen Encoder. `time_ranges` beschränkt die Wasserzeichen auf diese Zeitbereiche.
+    """
+    filename = os.path.basename(video_path)
+    ffmpeg_exe = find_ffmpeg_exe()
+    if not ffmpeg_exe:
+        raise FileNotFoundError("ffmpeg wurde nicht gefunden.")
+    if not info:
+        with instrumentation.span("probe", video=filename):
+            info = probe_media(video_path)
+    positions = [compute_watermark_position((info["width"], info["height"]), v["wm_size"], v["relative_pos"]) for v in variants]
+    for variant, position in zip(variants, positions):
+        check_watermark_in_frame((info["width"], info["height"]), variant["wm_size"], position)
+    audio_codec = select_audio_codec(info["audio_codec"])
+    enable = time_ranges_enable(time_ranges) if time_ranges else None
+    log("info", f"Video Größe: {info['width']}x{info['height']}, Dauer: {info['duration']}s, "
+                f"{len(variants)} Varianten aus einem Decode", video=filename)
+    log("info", f"Audio: {describe_audio_path(info['audio_codec'], audio_codec)}", video=filename)
+
+    cmd = build_ffmpeg_variants_command(ffmpeg_exe, video_path, output_paths, variants, positions, threads, audio_codec, encoder, enable)
+    with instrumentation.span("encode", video=filename):
+        try:
+            run_ffmpeg(cmd, on_progress, stop_event)
+        except FFmpegError:
+            if audio_codec != "copy":
+                raise
+            log("warning", f"Audio Stream-Copy fehlgeschlagen, transkodiere nach {AUDIO_CODEC}...", video=filename)
+            audio_codec = AUDIO_CODEC
+            cmd = build_ffmpeg_variants_command(ffmpeg_exe, video_path, output_paths, variants, positions, threads, audio_codec, encoder, enable)
+            run_ffmpeg(cmd, on_progress, stop_event)
+    return describe_audio_path(info["audio_codec"], audio_codec)
+
+
+def segment_parallelism(duration, threads, segment_threshold):
+    """Anzahl paralleler Segment-Encodes für ein Video (1 = in einem Durchgang encodieren)."""
+    if not segment_threshold or not duration or duration < segment_threshold:
+        return 1
+    return max(1, threads // SEGMENT_THREADS)
+
+
+def read_video_packets(video_path):
+    """Liest Zeitstempel und Keyframe-Flags aller Videopakete, ohne zu dekodieren.
+
+    Nutzt den framecrc-Muxer mit Stream-Copy (eine Zeile pro Paket). Liefert
+    (time_base, packets) mit packets = [(pts, duration, is_keyframe), ...] in
+    Präsentationsreihenfolge; Zeitstempel relativ zum Dateianfang.
+    """
+    ffmpeg_exe = find_ffmpeg_exe()
+    if not ffmpeg_exe:
+        raise FileNotFoundError("ffmpeg wurde nicht gefunden.")
+    cmd = [ffmpeg_exe, "-hide_banner", "-nostdin", "-loglevel", "error",
+           "-i", video_path, "-map", "0:v:0", "-c", "copy", "-f", "framecrc", "-"]
+    result = subprocess.run(cmd, stdin=subprocess.DEVNULL, capture_output=True, text=True, errors="replace",
+                            **SUBPROCESS_ISOLATION)
+    if result.returncode != 0:
+        raise FFmpegError(result.returncode, result.stderr)
+    time_base = None
+    packets = []
+    for line in result.stdout.splitlines():
+        if line.startswith("#tb 0:"):
+            num, den = line.split(":", 1)[1].strip().split("/")
+            time_base = Fraction(int(num), int(den))
+        elif line.startswith("0,"):
+            # stream, dts, pts, duration, size, crc[, F=flags] -- F fehlt bei reinen Keyframes
+            fields = [f.strip() for f in line.split(",")]
+            flags = int(fields[6][2:], 16) if len(fields) > 6 and fields[6].startswith("F=") else 0x1
+            if flags & 0x4: # AV_PKT_FLAG_DISCARD: wird nicht angezeigt
+                continue
+            try:
+                packets.append((int(fields[2]), int(fields[3]), bool(flags & 0x1)))
+            except ValueError:
+                raise ValueError(f"Videopaket ohne Zeitstempel: {line}")
+    if time_base is None or not packets:
+        raise ValueError("Keine Videopakete gefunden.")
+    packets.sort()
+    return time_base, packets
+
+
+def plan_segments(time_base, packets, count):
+    """Teilt die Frames an Keyframes in bis zu `count` etwa gleich große Segmente.
+
+    Liefert [(seek_s, frame_count, duration_s), ...]; seek_s liegt einen halben Frame
+    vor dem Keyframe (None für das erste Segment), damit die Eingabesuche den Keyframe
+    sicher einschließt und den Frame davor sicher ausschließt. duration_s ist der
+    Abstand bis zum ersten Frame des nächsten Segments (letztes: inkl. Frame-Dauer).
+    """
+    keyframes = [i for i, (_, _, is_key) in enumerate(packets) if is_key and i > 0]
+    total = len(packets)
+    bounds = [0]
+    for k in range(1, count):
+        wanted = k * total / count
+        candidates = [i for i in keyframes if i > bounds[-1]]
+        if not candidates:
+            break
+        best = min(candidates, key=lambda i: abs(i - wanted))
+        if best not in bounds:
+            bounds.append(best)
+    bounds.append(total)
+    return [segment_timing(time_base, packets, start, end) for start, end in zip(bounds, bounds[1:])]
+
+
+def segment_timing(time_base, packets, start, end):
+    """(seek_s, frame_count, duration_s) für die Frames `start` bis ausschließlich `end`."""
+    seek_s = None if start == 0 else float((packets[start - 1][0] + packets[start][0]) * time_base / 2)
+    end_pts = packets[end][0] if end < len(packets) else packets[-1][0] + packets[-1][1]
+    return seek_s, end - start, float((end_pts - packets[start][0]) * time_base)
+
+
+def write_concat_list(list_path, paths, durations=None):
+    """Schreibt eine Eingabeliste für den concat-Demuxer.
+
+    Mit `durations` (Sekunden) versetzt concat jede Datei exakt um die Dauer ihrer
+    Vorgänger, statt sie aus dem Container zu schätzen (fehlende letzte Frame-Dauer).
+    """
+    with open(list_path, "w", encoding="utf-8") as f:
+        for index, path in enumerate(paths):
+            escaped = os.path.abspath(path).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+            if durations:
+                f.write(f"duration {durations[index]:.9f}\n")
+
+
+def concat_with_source_audio(list_path, source_path, output_path, audio_codec, stop_event=None, coded_rotation=None):
+    """Fügt stumme Videosegmente per concat-Demuxer verlustfrei zusammen und legt die
+    ununterbrochene Audiospur der Quelle darunter (+faststart).
+
+    `coded_rotation` (probe_media "rotation") setzt die Rotations-Matrix der Quelle für
+    Segmente in kodierter Ausrichtung; concat übernimmt sie sonst nur vom ersten Segment.
+    """
+    ffmpeg_exe = find_ffmpeg_exe()
+    cmd = [ffmpeg_exe, "-hide_banner", "-nostdin", "-y", "-loglevel", "error"]
+    if coded_rotation:
+        cmd += ["-display_rotation", str((360 - coded_rotation) % 360)] # gegen den Uhrzeigersinn
+    cmd += [
+        "-f", "concat", "-safe", "0", "-i", list_path,
+        "-i", source_path,
+        "-map", "0:v:0",
+    ]
+    if audio_codec:
+        cmd += ["-map", "1:a:0", "-c:a", audio_codec]
+    cmd += ["-c:v", "copy", "-movflags", "+faststart", output_path]
+    run_ffmpeg(cmd, stop_event=stop_event)
+
+
+def build_segment_encode_command(ffmpeg_exe, video_path, wm_png_path, output_path, position, seek_s, frame_count,
+                                 time_base, threads, encoder=None, x264_profile=None, enable=None, coded_rotation=None):
+    """FFmpeg-Aufruf für ein stummes Segment: ab `seek_s` genau `frame_count` Frames mit Wasserzeichen.
+
+    Das Segment beginnt bei Zeitstempel 0 (concat versetzt um die Dauer der Vorgänger)
+    und behält die Zeitbasis der Quelle, damit die Zeitstempel ohne Rundung exakt bleiben.
+    `enable` bezieht sich daher auf die Zeit ab Segmentbeginn (time_ranges_enable mit offset).
+    Mit `coded_rotation` (probe_media "rotation") bleibt das Segment wie kopierte Abschnitte
+    in der kodierten Ausrichtung samt Rotations-Matrix; das Wasserzeichen wird dafür in der
+    Anzeige-Ausrichtung eingebrannt und das Bild danach zurückgedreht.
+    """
+    cmd = [ffmpeg_exe, "-hide_banner", "-nostdin", "-y", "-loglevel", "error"]
+    if seek_s is not None:
+        cmd += ["-ss", f"{seek_s:.6f}"]
+    graph = "[0:v]" + ",".join(["setpts=PTS-STARTPTS"] + rotation_filters(coded_rotation or 0)) + "[base];"
+    if coded_rotation:
+        cmd.append("-noautorotate")
+        graph += (overlay_filter_graph(position, "[base]", enable, "[shown]")
+                  + ";[shown]" + ",".join(rotation_filters(-coded_rotation)) + "[v]")
+    else:
+        graph += overlay_filter_graph(position, "[base]", enable)
+    cmd += [
+        "-i", video_path,
+        "-i", wm_png_path,
+        "-filter_complex", graph,
+        "-map", "[v]", "-frames:v", str(frame_count), "-fps_mode", "passthrough", "-an",
+    ] + encoder_args(encoder) + ["-threads", str(threads)]
+    if x264_profile:
+        cmd += ["-profile:v", x264_profile]
+    if time_base.numerator == 1:
+        cmd += ["-video_track_timescale", str(time_base.denominator)]
+    return cmd + [output_path]
+
+
+def run_ffmpeg_parallel(commands, parallel, progress_for, stop_event=None):
+    """Führt FFmpeg-Aufrufe mit bis zu `parallel` gleichzeitig aus; `progress_for(index)`
+    liefert den on_progress-Callback je Aufruf. Der erste Fehler bricht alles ab."""
+    with concurrent.futures.ThreadPoolExecutor(max_workers=parallel) as executor:
+        futures = [executor.submit(run_ffmpeg, cmd, progress_for(index), stop_event)
+                   for index, cmd in enumerate(commands)]
+        try:
+            for future in concurrent.futures.as_completed(futures):
+                future.result()
+        except BaseException:
+            for future in futures:
+                future.cancel() # noch nicht gestartete Aufrufe verwerfen
+            raise
+
+
+def concat_segments(list_path, source_path, output_path, audio_codec, stop_event=None, filename=None, coded_rotation=None):
+    """concat_with_source_audio() mit AAC-Fallback, falls der Audio-Stream-Copy scheitert.
+    Liefert den tatsächlich verwendeten Audio-Codec."""
+    try:
+        concat_with_source_audio(list_path, source_path, output_path, audio_codec, stop_event, coded_rotation)
+    except FFmpegError:
+        if audio_codec != "copy":
+            raise
+        log("warning", f"Audio Stream-Copy fehlgeschlagen, transkodiere nach {AUDIO_CODEC}...", video=filename)
+        audio_codec = AUDIO_CODEC
+        concat_with_source_audio(list_path, source_path, output_path, audio_codec, stop_event, coded_rotation)
+    return audio_codec
+
+
+def verify_output_frames(output_path, time_base, packets):
+    """Prüft Frame-Anzahl und letzten Zeitstempel der Ausgabe gegen die Quelle (ValueError bei Abweichung)."""
+    output_time_base, output_packets = read_video_packets(output_path)
+    if len(output_packets) != len(packets):
+        raise ValueError(f"Ausgabe hat {len(output_packets)} statt {len(packets)} Frames")
+    drift = abs(output_packets[-1][0] * output_time_base - packets[-1][0] * time_base)
+    if drift > packets[-1][1] * time_base / 2:
+        raise ValueError(f"Zeitstempel der Ausgabe weichen um {float(drift):.3f}s ab")
+
+
+def watermark_video_segmented(video_path, output_path, wm_png_path, position, parallel, info, audio_codec,
+                              on_progress=None, stop_event=None, encoder=None, time_ranges=None):
+    """Segment-paralleles Encoding eines langen Videos mit der FFmpeg-Engine.
+
+    Das Video wird an Keyframes in Segmente geteilt, die Segmente werden stumm und
+    parallel (je SEGMENT_THREADS Threads) mit Wasserzeichen encodiert, per
+    concat-Demuxer ohne Re-Encode verbunden und mit der Original-Audiospur gemuxt.
+    Jedes Segment schreibt exakt seine Frame-Anzahl; am Ende werden Frame-Anzahl und
+    letzter Zeitstempel der Ausgabe gegen die Quelle geprüft (ValueError bei Abweichung).
+    `time_ranges` beschränkt das Wasserzeichen auf diese Zeitbereiche.
+    """
+    filename = os.path.basename(video_path)
+    ffmpeg_exe = find_ffmpeg_exe()
+    with instrumentation.span("segment_plan", video=filename):
+        time_base, packets = read_video_packets(video_path)
+        segments = plan_segments(time_base, packets, parallel * SEGMENTS_PER_ENCODE)
+    if len(segments) < 2:
+        raise ValueError("zu wenige Keyframes für eine Aufteilung")
+    log("info", f"Segment-Encoding: {len(packets)} Frames in {len(segments)} Segmenten, {parallel} parallel.", video=filename)
+
+    frames_done = [0] * len(segments)
+    progress_lock = threading.Lock()
+    def segment_progress(index):
+        def report(frames, out_time):
+            with progress_lock:
+                frames_done[index] = frames
+                if on_progress:
+                    done = sum(frames_done)
+                    on_progress(done, done / (info.get("fps") or 25.0))
+        return report
+
+    # Segmente neben der Ausgabe ablegen (gleiches Dateisystem, genug Platz für große Dateien)
+    segment_dir = tempfile.mkdtemp(prefix=".wz5_segmente_", dir=os.path.dirname(os.path.abspath(output_path)))
+    try:
+        segment_paths = []
+        commands = []
+        start_s = float(packets[0][0] * time_base)
+        for index, (seek_s, frame_count, duration_s) in enumerate(segments):
+            segment_path = os.path.join(segment_dir, f"segment_{index:04d}.mp4")
+            segment_paths.append(segment_path)
+            enable = time_ranges_enable(time_ranges, start_s) if time_ranges else None
+            commands.append(build_segment_encode_command(ffmpeg_exe, video_path, wm_png_path, segment_path, position,
+                                                         seek_s, frame_count, time_base, SEGMENT_THREADS, encoder,
+                                                         enable=enable))
+            start_s += duration_s
+
+        instrumentation.count("segments", len(commands), video=filename)
+        with instrumentation.span("segment_encode", video=filename):
+            run_ffmpeg_parallel(commands, parallel, segment_progress, stop_event)
+
+        list_path = os.path.join(segment_dir, "segmente.txt")
+        write_concat_list(list_path, segment_paths, [duration_s for _, _, duration_s in segments])
+        log("info", f"Verbinde {len(segment_paths)} Segmente (concat, Stream-Copy)...", video=filename)
+        with instrumentation.span("concat", video=filename):
+            audio_codec = concat_segments(list_path, video_path, output_path, audio_codec, stop_event, filename)
+        with instrumentation.span("verify", video=filename):
+            verify_output_frames(output_path, time_base, packets)
+        return describe_audio_path(info["audio_codec"], audio_codec)
+    finally:
+        shutil.rmtree(segment_dir, ignore_errors=True)
+
+
+# --- Teilbereiche (Wasserzeichen nur in ausgewählten Zeitbereichen) ---
+def parse_time_ranges(spec):
+    """Prüft Zeitbereiche (Sekunden) für das Wasserzeichen und liefert eine sortierte,
+    zusammengefasste Liste [(start, end), ...] oder None (ganzes Video); end None = bis zum Ende.
+
+    `spec` ist eine Liste von Paaren ([[0, 30], [90, None]]) oder ein Text wie
+    "0-30,90-120,300-". Wirft ValueError mit verständlicher Meldung.
+    """
+    if not spec:
+        return None
+    if isinstance(spec, str):
+        items = []
+        for part in (p.strip() for p in spec.split(",")):
+            if not part:
+                continue
+            if "-" not in part:
+                raise ValueError(f"Zeitbereich '{part}': erwartet Start-Ende in Sekunden (z.B. 10-25, offen: 300-)")
+            start, end = part.split("-", 1)
+            items.append([start.strip(), end.strip()])
+        spec = items
+    if not isinstance(spec, (list, tuple)) or not spec:
+        raise ValueError("Zeitbereiche müssen eine Liste sein.")
+    ranges = []
+    for item in spec:
+        if not isinstance(item, (list, tuple)) or len(item) != 2:
+            raise ValueError(f"Zeitbereich {item}: erwartet [Start, Ende].")
+        try:
+            start = float(item[0])
+            end = float(item[1]) if item[1] not in (None, "") else None
+        except (TypeError, ValueError):
+            raise ValueError(f"Zeitbereich {item}: Start und Ende müssen Zahlen (Sekunden) sein.")
+        if not 0 <= start < float("inf") or (end is not None and not start < end < float("inf")):
+            raise ValueError(f"Zeitbereich {item}: Start muss >= 0 und kleiner als das Ende sein.")
+        ranges.append((start, end))
+    ranges.sort(key=lambda r: r[0])
+    merged = [ranges[0]]
+    for start, end in ranges[1:]:
+        last_start, last_end = merged[-1]
+        if last_end is None or start <= last_end:
+            merged[-1] = (last_start, None if last_end is None or end is None else max(last_end, end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def time_ranges_enable(ranges, offset=0.0):
+    """overlay-`enable`-Ausdruck für die Zeitbereiche; `offset` (s) wird von allen Zeiten abgezogen."""
+    return "+".join(f"between(t,{start - offset:.6f},{end - offset:.6f})" if end is not None
+                    else f"gte(t,{start - offset:.6f})" for start, end in ranges)
+
+
+def range_copy_profile(info):
+    """x264-Profil, mit dem neu encodierte Abschnitte zur Quelle passen, oder None, wenn
+    sich die Quelle nicht abschnittsweise kopieren lässt (nur H.264 in yuv420p)."""
+    if info.get("video_codec") != "h264" or info.get("pix_fmt") != OUTPUT_PIX_FMT:
+        return None
+    return X264_PROFILES.get(info.get("video_profile"))
+
+
+def plan_range_pieces(time_base, packets, ranges):
+    """Teilt die Frames in Abschnitte zum Kopieren und zum Neu-Encodieren.
+
+    Jeder Zeitbereich wird auf ganze GOPs erweitert: vom Keyframe vor dem ersten
+    betroffenen Frame bis vor den ersten Keyframe nach dem letzten. Liefert
+    [(start, end, encode), ...] als Frame-Indizes (end exklusiv), lückenlos über alle Frames.
+    """
+    total = len(packets)
+    times = [pts * time_base for pts, _, _ in packets]
+    keyframes = [i for i, (_, _, is_key) in enumerate(packets) if is_key]
+    if not keyframes or keyframes[0] != 0:
+        raise ValueError("Video beginnt nicht mit einem Keyframe")
+    spans = []
+    for start_s, end_s in ranges:
+        first = bisect.bisect_left(times, Fraction(start_s))
+        last = total if end_s is None else bisect.bisect_right(times, Fraction(end_s))
+        if first >= last:
+            continue
+        span_start = keyframes[bisect.bisect_right(keyframes, first) - 1]
+        next_key = bisect.bisect_left(keyframes, last)
+        span_end = keyframes[next_key] if next_key < len(keyframes) else total
+        if spans and span_start <= spans[-1][1]:
+            spans[-1] = (spans[-1][0], max(spans[-1][1], span_end))
+        else:
+            spans.append((span_start, span_end))
+    pieces = []
+    position = 0
+    for span_start, span_end in spans:
+        if span_start > position:
+            pieces.append((position, span_start, False))
+        pieces.append((span_start, span_end, True))
+        position = span_end
+    if position < total:
+        pieces.append((position, total, False))
+    return pieces
+
+
+def watermark_video_ranges(video_path, output_path, wm_png_path, position, threads, info, audio_codec, time_ranges,
+                           on_progress=None, stop_event=None, encoder=None):
+    """Wasserzeichen nur in `time_ranges`: betroffene GOPs neu encodieren, den Rest kopieren.
+
+    Der Videostream wird per segment-Muxer ohne Re-Encode an den Keyframes der
+    Abschnittsgrenzen (plan_range_pieces) geteilt. Die Abschnitte mit Wasserzeichen
+    werden aus der Quelle neu encodiert (parallel, im H.264-Profil der Quelle, Overlay
+    framegenau nur innerhalb der Zeitbereiche) und ersetzen die kopierten; danach wie
+    bei watermark_video_segmented concat mit der Original-Audiospur und Prüfung der
+    Frame-Anzahl. Voraussetzung: range_copy_profile(info). ValueError, wenn es nichts
+    zu kopieren gibt oder der Schnitt nicht aufgeht.
+    """
+    filename = os.path.basename(video_path)
+    ffmpeg_exe = find_ffmpeg_exe()
+    with instrumentation.span("segment_plan", video=filename):
+        time_base, packets = read_video_packets(video_path)
+        pieces = plan_range_pieces(time_base, packets, time_ranges)
+    encode_indices = [index for index, (_, _, encode) in enumerate(pieces) if encode]
+    if len(encode_indices) == len(pieces):
+        raise ValueError("die Zeitbereiche umfassen das ganze Video")
+    encode_frames = sum(pieces[index][1] - pieces[index][0] for index in encode_indices)
+    log("info", f"Teilbereiche: {encode_frames} von {len(packets)} Frames in {len(encode_indices)} Abschnitten neu encodieren, "
+                "Rest Stream-Copy.", video=filename)
+
+    copied_frames = len(packets) - encode_frames
+    frames_done = [0] * len(pieces)
+    progress_lock = threading.Lock()
+    def piece_progress(index):
+        def report(frames, out_time):
+            with progress_lock:
+                frames_done[index] = frames
+                if on_progress:
+                    done = copied_frames + sum(frames_done)
+                    on_progress(done, done / (info.get("fps") or 25.0))
+        return report
+
+    piece_dir = tempfile.mkdtemp(prefix=".wz5_segmente_", dir=os.path.dirname(os.path.abspath(output_path)))
+    try:
+        # Videostream verlustfrei an den (Keyframe-)Abschnittsgrenzen teilen
+        split_frames = ",".join(str(start) for start, _, _ in pieces[1:]) or str(len(packets))
+        cmd = [ffmpeg_exe, "-hide_banner", "-nostdin", "-y", "-loglevel", "error",
+               "-i", video_path, "-map", "0:v:0", "-c", "copy",
+               "-f", "segment", "-segment_frames", split_frames, "-reset_timestamps", "1", "-segment_format", "mp4"]
+        if time_base.numerator == 1:
+            cmd += ["-segment_format_options", f"video_track_timescale={time_base.denominator}"]
+        cmd.append(os.path.join(piece_dir, "kopie_%04d.mp4"))
+        with instrumentation.span("segment_copy", video=filename):
+            run_ffmpeg(cmd, stop_event=stop_event)
+        piece_paths = [os.path.join(piece_dir, f"kopie_{index:04d}.mp4") for index in range(len(pieces))]
+        if not all(os.path.isfile(path) for path in piece_paths) or os.path.isfile(os.path.join(piece_dir, f"kopie_{len(pieces):04d}.mp4")):
+            raise ValueError("Stream-Copy hat die Abschnitte nicht an den erwarteten Keyframes geteilt")
+        if on_progress:
+            on_progress(copied_frames, copied_frames / (info.get("fps") or 25.0))
+
+        parallel = max(1, min(len(encode_indices), threads // SEGMENT_THREADS))
+        x264_profile = range_copy_profile(info)
+        commands = []
+        for index in encode_indices:
+            start, end, _ = pieces[index]
+            seek_s, frame_count, _ = segment_timing(time_base, packets, start, end)
+            piece_paths[index] = os.path.join(piece_dir, f"wasserzeichen_{index:04d}.mp4")
+            enable = time_ranges_enable(time_ranges, float(packets[start][0] * time_base))
+            # Kopierte Abschnitte behalten die kodierte Ausrichtung, die neu encodierten müssen dazu passen
+            commands.append(build_segment_encode_command(ffmpeg_exe, video_path, wm_png_path, piece_paths[index], position,
+                                                         seek_s, frame_count, time_base, max(1, threads // parallel),
+                                                         encoder, x264_profile, enable, info.get("rotation")))
+        instrumentation.count("segments", len(commands), video=filename)
+        with instrumentation.span("segment_encode", video=filename):
+            run_ffmpeg_parallel(commands, parallel, lambda n: piece_progress(encode_indices[n]), stop_event)
+
+        list_path = os.path.join(piece_dir, "abschnitte.txt")
+        write_concat_list(list_path, piece_paths, [segment_timing(time_base, packets, start, end)[2] for start, end, _ in pieces])
+        log("info", f"Verbinde {len(piece_paths)} Abschnitte (concat, Stream-Copy)...", video=filename)
+        with instrumentation.span("concat", video=filename):
+            audio_codec = concat_segments(list_path, video_path, output_path, audio_codec, stop_event, filename, info.get("rotation"))
+        with instrumentation.span("verify", video=filename):
+            verify_output_frames(output_path, time_base, packets)
+        return describe_audio_path(info["audio_codec"], audio_codec)
+    finally:
+        shutil.rmtree(piece_dir, ignore_errors=True)
+
+
+# --- Encoder-Tuning ---
+def resolution_class(width, height):
+    """Auflösungsklasse (sd/hd/fhd/uhd) nach der kürzeren Bildseite (Hochformat zählt wie Querformat)."""
+    short_side = min(width, height)
+    for name, max_short_side, _ in RESOLUTION_CLASSES:
+        if short_side <= max_short_side:
+            return name
+    return RESOLUTION_CLASSES[-1][0]
+
+
+def get_tuning_profile_path():
+    return os.path.join(get_cache_dir(), TUNING_PROFILE_FILENAME)
+
+
+def load_tuning_profile(path=None):
+    """Lädt das Tuning-Profil oder liefert None (nicht kalibriert / veraltet / unlesbar)."""
+    path = path or get_tuning_profile_path()
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            profile = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        log("warning", f"Tuning-Profil '{path}' nicht lesbar ({e}), verwende Standard-Encoder.")
+        return None
+    if profile.get("version") != TUNING_PROFILE_VERSION or not profile.get("classes"):
+        log("warning", "Tuning-Profil veraltet, bitte neu kalibrieren (wz5_cli.py calibrate).")
+        return None
+    return profile
+
+
+def save_tuning_profile(profile, path=None):
+    """Speichert das Tuning-Profil atomar."""
+    path = path or get_tuning_profile_path()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(profile, f, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+
+def _calibration_thread_counts(max_threads):
+    counts = {max_threads}
+    count = 1
+    while count < max_threads:
+        counts.add(count)
+        count *= 2
+    return sorted(counts)
+
+
+def calibrate_encoder(class_names=None, duration=CALIBRATION_DURATION, presets=None, crfs=None,
+                      max_threads=None, on_result=None, stop_event=None):
+    """Misst libx264 auf diesem Rechner und liefert ein Tuning-Profil (dict).
+
+    Pro Auflösungsklasse wird ein synthetischer Testclip (testsrc2 mit leichtem
+    Rauschen als Näherung an Kamerabilder) erzeugt und neu encodiert:
+    alle Presets x CRFs mit `max_threads` Threads sowie die Thread-Skalierung mit
+    CALIBRATION_THREAD_PRESET. Gemessen werden Encode-fps (inkl. Dekodieren) und
+    Bytes pro Sekunde Video. `on_result(class_name, measurement)` meldet jede Messung.
+    ENCODER_CRF wird immer gemessen, auch wenn `crfs` ihn nicht enthält: darauf beruhen
+    die Thread-Skalierung und das Ziel TUNING_GOAL_SPEED in select_encoder_settings.
+    """
+    ffmpeg_exe = find_ffmpeg_exe()
+    if not ffmpeg_exe:
+        raise FileNotFoundError("ffmpeg wurde nicht gefunden.")
+    class_names = class_names or [name for name, _, _ in RESOLUTION_CLASSES]
+    presets = presets or CALIBRATION_PRESETS
+    crfs = [str(crf) for crf in (crfs or CALIBRATION_CRFS)]
+    if ENCODER_CRF not in crfs:
+        crfs.insert(0, ENCODER_CRF)
+    max_threads = max_threads or os.cpu_count() or 4
+    frame_count = int(round(duration * CALIBRATION_FPS))
+    profile = {
+        "version": TUNING_PROFILE_VERSION,
+        "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "host": platform.node(),
+        "cpu_count": os.cpu_count(),
+        "max_threads": max_threads,
+        "calibration_fps": CALIBRATION_FPS,
+        "classes": {},
+    }
+    work_dir = tempfile.mkdtemp(prefix="wz5_kalibrierung_")
+    try:
+        for name, _, (width, height) in RESOLUTION_CLASSES:
+            if name not in class_names:
+                continue
+            source_path = os.path.join(work_dir, f"quelle_{name}.mp4")
+            run_ffmpeg([
+                ffmpeg_exe, "-hide_banner", "-nostdin", "-y", "-loglevel", "error",
+                "-f", "lavfi", "-i", f"testsrc2=size={width}x{height}:rate={CALIBRATION_FPS}:duration={duration},noise=alls=8:allf=t",
+                "-c:v", VIDEO_CODEC, "-preset", "ultrafast", "-crf", "12", "-pix_fmt", OUTPUT_PIX_FMT, source_path,
+            ], stop_event=stop_event)
+            grid = [(preset, crf, max_threads) for preset in presets for crf in crfs]
+            grid += [(CALIBRATION_THREAD_PRESET, ENCODER_CRF, t) for t in _calibration_thread_counts(max_threads) if t != max_threads]
+            measurements = []
+            for preset, crf, threads in grid:
+                output_path = os.path.join(work_dir, "messung.mp4")
+                start = time.perf_counter()
+                run_ffmpeg([
+                    ffmpeg_exe, "-hide_banner", "-nostdin", "-y", "-loglevel", "error",
+                    "-i", source_path, "-map", "0:v:0", "-an",
+                    "-c:v", VIDEO_CODEC, "-preset", preset, "-crf", crf, "-threads", str(threads),
+                    "-pix_fmt", OUTPUT_PIX_FMT, output_path,
+                ], stop_event=stop_event)
+                elapsed = time.perf_counter() - start
+                measurement = {
+                    "preset": preset, "crf": crf, "threads": threads,
+                    "encode_fps": round(frame_count / elapsed, 2),
+                    "bytes_per_s": int(os.path.getsize(output_path) / duration),
+                }
+                measurements.append(measurement)
+                if on_result:
+                    on_result(name, measurement)
+            profile["classes"][name] = {"width": width, "height": height, "measurements": measurements}
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return profile
+
+
+def select_encoder_settings(profile, width, height, fps, threads, goal=DEFAULT_TUNING_GOAL, target=DEFAULT_TUNING_TARGET):
+    """Wählt preset/crf/threads für ein Video aus dem Tuning-Profil.
+
+    Ziel TUNING_GOAL_SPEED: mindestens `target`-fache Echtzeit, darunter die kleinste
+    Datei (CRF bleibt bei ENCODER_CRF, Qualität wird nicht für Tempo geopfert).
+    Ziel TUNING_GOAL_SIZE: höchstens `target` kbit/s Video, darunter das schnellste
+    Preset (CRF darf bis zum größten kalibrierten Wert steigen).
+    Ist kein Kandidat gut genug, gewinnt der beste Kompromiss (schnellster bzw. kleinster).
+    `threads` ist das Thread-Budget des Jobs. Liefert dict mit preset, crf, threads,
+    est_speed, est_kbps, class.
+    """
+    name = resolution_class(width, height)
+    classes = profile["classes"]
+    if name not in classes: # nächstgelegene kalibrierte Klasse, Werte nach Pixelzahl skaliert
+        name = min(classes, key=lambda n: abs(classes[n]["width"] * classes[n]["height"] - width * height))
+    entry = classes[name]
+    pixel_scale = (entry["width"] * entry["height"]) / max(1, width * height)
+    fps = fps or profile.get("calibration_fps", CALIBRATION_FPS)
+    rate_scale = fps / profile.get("calibration_fps", CALIBRATION_FPS)
+    max_threads = profile.get("max_threads")
+
+    # Thread-Skalierung: schnellste gemessene Thread-Zahl innerhalb des Budgets
+    scaling = {m["threads"]: m["encode_fps"] for m in entry["measurements"]
+               if m["preset"] == CALIBRATION_THREAD_PRESET and m["crf"] == ENCODER_CRF}
+    if scaling and max_threads in scaling:
+        usable = [t for t in scaling if t <= threads] or [min(scaling)]
+        best_threads = max(usable, key=lambda t: (scaling[t], -t))
+        thread_factor = scaling[best_threads] / scaling[max_threads]
+    else:
+        best_threads, thread_factor = threads, 1.0
+
+    candidates = []
+    for m in entry["measurements"]:
+        if m["threads"] != max_threads:
+            continue
+        if goal == TUNING_GOAL_SPEED and m["crf"] != ENCODER_CRF:
+            continue
+        candidates.append({
+            "preset": m["preset"], "crf": m["crf"],
+            "est_speed": m["encode_fps"] * thread_factor * pixel_scale / fps,
+            "est_kbps": m["bytes_per_s"] * 8 / 1000 / pixel_scale * rate_scale,
+        })
+    if not candidates:
+        return dict(default_encoder(), threads=threads, est_speed=None, est_kbps=None, **{"class": name})
+    if goal == TUNING_GOAL_SIZE:
+        fitting = [c for c in candidates if c["est_kbps"] <= target]
+        choice = max(fitting, key=lambda c: c["est_speed"]) if fitting else min(candidates, key=lambda c: c["est_kbps"])
+    else:
+        fitting = [c for c in candidates if c["est_speed"] >= target]
+        choice = min(fitting, key=lambda c: c["est_kbps"]) if fitting else max(candidates, key=lambda c: c["est_speed"])
+    return dict(choice, threads=best_threads, **{"class": name})
+
+
+def apply_tuning(jobs, settings, profile):
+    """Setzt job["encoder"]/job["threads"] aus dem Tuning-Profil (Jobs ohne Probe behalten die Standardwerte)."""
+    goal = settings.get("tuning_goal", DEFAULT_TUNING_GOAL)
+    target = float(settings.get("tuning_target", DEFAULT_TUNING_TARGET))
+    for job in jobs:
+        info = job.get("info")
+        if not info:
+            continue
+        choice = select_encoder_settings(profile, info["width"], info["height"], info.get("fps"), job["threads"], goal, target)
+        job["encoder"] = {"preset": choice["preset"], "crf": choice["crf"]}
+        job["threads"] = choice["threads"]
+        estimate = ""
+        if choice["est_speed"] is not None:
+            estimate = f", ca. {choice['est_speed']:.1f}x Echtzeit, {choice['est_kbps']:.0f} kbit/s"
+        log("info", f"Encoder preset={choice['preset']}, crf={choice['crf']}, threads={choice['threads']} "
+                    f"(Profil {choice['class']}{estimate})", video=os.path.basename(job["video_path"]))
+
+
+# --- Compositor ---
+def _blend_premultiplied(roi, inv_alpha, premultiplied, scratch, carry):
+    """roi = round((roi * (255 - a) + rgb * a) / 255) in den uint16-Puffern scratch/carry (siehe RoiCompositor)."""
+    import numpy as np
+    np.multiply(roi, inv_alpha, out=scratch)
+    np.add(scratch, premultiplied, out=scratch)
+    # Exakte Division durch 255 ohne Float: (x + (x >> 8)) >> 8, +128 steckt bereits in x
+    np.right_shift(scratch, 8, out=carry)
+    np.add(scratch, carry, out=scratch)
+    np.right_shift(scratch, 8, out=scratch)
+    np.copyto(roi, scratch, casting="unsafe")
+
+
+class RoiCompositor:
+    """Alpha-Blending des Wasserzeichens nur im Rechteck, das es tatsächlich bedeckt.
+
+    Das RGBA-Wasserzeichen wird einmal vorbereitet: auf die Pixel mit Alpha > 0
+    zugeschnitten, an den Frame-Rand geclippt und mit Alpha vormultipliziert.
+    Pro Frame wird dann nur der ROI-Ausschnitt mit Ganzzahl-Arithmetik (uint16)
+    in vorallokierten Puffern gemischt:
+
+        out = round((frame * (255 - a) + rgb * a) / 255)
+
+    `blend_inplace(frame)` schreibt direkt in einen beschreibbaren Frame,
+    `__call__(frame)` ist für MoviePy `image_transform` gedacht.
+    """
+    def __init__(self, wm_rgba, position, frame_size):
+        import numpy as np
+        frame_w, frame_h = frame_size
+        wm_rgba = np.asarray(wm_rgba, dtype=np.uint8)
+        if wm_rgba.ndim != 3 or wm_rgba.shape[2] != 4:
+            raise ValueError(f"Wasserzeichen muss ein RGBA-Array (H, W, 4) sein, nicht {wm_rgba.shape}.")
+        pos_x, pos_y = (int(v) for v in position)
+
+        # Transparente Ränder weglassen: Zeilen/Spalten ohne deckende Pixel ändern den Frame nicht
+        rows = np.flatnonzero(wm_rgba[:, :, 3].any(axis=1))
+        cols = np.flatnonzero(wm_rgba[:, :, 3].any(axis=0))
+        if rows.size == 0:
+            self.roi = None
+        else:
+            top, bottom, left, right = int(rows[0]), int(rows[-1]) + 1, int(cols[0]), int(cols[-1]) + 1
+            # ROI im Frame, an den Bildrand geclippt
+            x0, y0 = max(0, pos_x + left), max(0, pos_y + top)
+            x1, y1 = min(frame_w, pos_x + right), min(frame_h, pos_y + bottom)
+            self.roi = (slice(y0, y1), slice(x0, x1)) if x0 < x1 and y0 < y1 else None
+        if self.roi is None:
+            return
+
+        wm = wm_rgba[y0 - pos_y:y1 - pos_y, x0 - pos_x:x1 - pos_x]
+        alpha = wm[:, :, 3:4].astype(np.uint16)
+        self._inv_alpha = 255 - alpha # (h, w, 1), per Broadcasting auf RGB
+        # rgb * a + 128 (Rundung): bleibt mit frame * (255 - a) zusammen <= 65153, passt in uint16
+        self._premultiplied = wm[:, :, :3].astype(np.uint16) * alpha + 128
+        self._scratch = np.empty(self._premultiplied.shape, dtype=np.uint16)
+        self._carry = np.empty(self._premultiplied.shape, dtype=np.uint16)
+        self._frame_buffer = None
+
+    def blend_inplace(self, frame):
+        """Mischt das Wasserzeichen in den (beschreibbaren, RGB uint8) Frame und gibt ihn zurück."""
+        if self.roi is None:
+            return frame
+        _blend_premultiplied(frame[self.roi][:, :, :3], self._inv_alpha, self._premultiplied, self._scratch, self._carry)
+        return frame
+
+    def __call__(self, frame):
+        # MoviePy liefert schreibgeschützte Frames (np.frombuffer): einmalig in einen
+        # wiederverwendeten Puffer kopieren, gemischt wird trotzdem nur der ROI.
+        if not frame.flags.writeable:
+            import numpy as np
+            if self._frame_buffer is None or self._frame_buffer.shape != frame.shape:
+                self._frame_buffer = np.empty_like(frame)
+            np.copyto(self._frame_buffer, frame)
+            frame = self._frame_buffer
+        return self.blend_inplace(frame)
+
+
+class _TimedCompositor:
+    """Misst Zeit und Anzahl der Compositing-Aufrufe (nur bei aktivem Tracing eingesetzt)."""
+    def __init__(self, compositor, video):
+        self._compositor = compositor
+        self._video = video
+
+    def __call__(self, frame):
+        start = time.perf_counter()
+        result = self._compositor(frame)
+        instrumentation.add_time("compositing", time.perf_counter() - start, video=self._video)
+        instrumentation.count("frames", video=self._video)
+        return result
+
+
+class GlyphAtlas:
+    """Alpha-Masken von Zeichen und festen Textstücken einer Schrift in einer Größe, je einmal gerastert.
+
+    Alle Einträge haben dieselbe Höhe und Grundlinie; get(text) liefert (Maske uint8 (h, w), Vorschub px).
+    Frame-Texte werden daraus nur noch zusammengesetzt, PIL zeichnet pro Frame nichts.
+    """
+    def __init__(self, pil_font):
+        self.font = pil_font
+        _, top, _, bottom = pil_font.getbbox(ATLAS_METRIC_SAMPLE)
+        self._top = top
+        self.height = max(1, bottom - top)
+        self._entries = {}
+        self.cell_width = max(self.get(glyph)[1] for glyph in ATLAS_CELL_GLYPHS)
+
+    def get(self, text):
+        entry = self._entries.get(text)
+        if entry is None:
+            import numpy as np
+            from PIL import Image, ImageDraw
+            advance = int(math.ceil(self.font.getlength(text)))
+            image = Image.new("L", (max(1, advance), self.height), 0)
+            ImageDraw.Draw(image).text((0, -self._top), text, font=self.font, fill=255)
+            entry = self._entries[text] = (np.array(image), advance)
+        return entry
+
+
+_glyph_atlases = LRUCache(GLYPH_ATLAS_CACHE_SIZE)
+_glyph_atlas_lock = threading.Lock()
+
+
+def get_glyph_atlas(font_name, font_size):
+    """Glyphen-Atlas für Schrift und Größe, pro Prozess nur einmal erzeugt."""
+    key = (font_name, int(font_size))
+    with _glyph_atlas_lock:
+        atlas = _glyph_atlases.get(key)
+        if atlas is None:
+            pil_font, font_path_used = load_watermark_font(font_name, int(font_size))
+            with instrumentation.span("watermark_render"):
+                atlas = GlyphAtlas(pil_font)
+            log("info", f"Glyphen-Atlas erstellt mit Font: {font_path_used}, Größe: {font_size}")
+            _glyph_atlases.put(key, atlas)
+        return atlas
+
+
+class TextTemplateCompositor:
+    """Wasserzeichen mit Frame-Platzhaltern ({timecode}, {frame}, {zeit}), pro Frame aus dem Glyphen-Atlas.
+
+    `parts` kommt aus resolve_file_fields(). Feste Textstücke liegen einmal in einer Maske;
+    jeder Frame-Platzhalter bekommt feste Zellen in Ziffernbreite (rechtsbündig), damit
+    Größe und Position stabil bleiben. Pro Frame werden nur Zellen neu belegt, deren
+    Zeichen sich geändert haben (beim Timecode meist eine), und nur deren Spalten der
+    vormultiplizierten Puffer neu berechnet; das Mischen kostet so viel wie bei
+    RoiCompositor. Die Frames müssen in Reihenfolge kommen (Zähler ab 0).
+    """
+    def __init__(self, atlas, parts, color_rgba, relative_pos, frame_size, fps, last_frame=0, padding=(0, 0)):
+        self.atlas = atlas
+        self.parts = parts
+        self.fps = fps
+        self.relative_pos = relative_pos
+        self.frame_size = frame_size
+        self.padding = padding
+        import numpy as np
+        self._rgb = np.array(color_rgba[:3], dtype=np.uint16).reshape(1, 1, 3)
+        self._opacity = int(color_rgba[3])
+        self._frame_index = 0
+        # Zellen je Platzhalter: so viele Zeichen wie der längste Wert im Video
+        last_values = frame_field_values(last_frame, fps)
+        self._build([len(format(last_values[field], spec)) if field else 0 for _, field, spec in parts])
+
+    def _build(self, widths):
+        import numpy as np
+        pad_x, pad_y = self.padding
+        cell_w = self.atlas.cell_width
+        x = pad_x
+        pieces, self._fields = [], []
+        for (literal, field, spec), width in zip(self.parts, widths):
+            if literal:
+                mask, advance = self.atlas.get(literal)
+                pieces.append((x, mask))
+                x += advance
+            if field:
+                self._fields.append((field, spec, [x + i * cell_w for i in range(width)], [None] * width))
+                x += width * cell_w
+        self.size = (x + pad_x, self.atlas.height + 2 * pad_y)
+        self._mask = np.zeros((self.size[1], self.size[0]), dtype=np.uint8)
+        for x0, mask in pieces:
+            target = self._mask[pad_y:pad_y + mask.shape[0], x0:x0 + mask.shape[1]]
+            target[:] = mask[:, :target.shape[1]]
+
+        frame_w, frame_h = self.frame_size
+        pos_x, pos_y = (int(v) for v in compute_watermark_position(self.frame_size, self.size, self.relative_pos))
+        x0, y0 = max(0, pos_x), max(0, pos_y)
+        x1, y1 = min(frame_w, pos_x + self.size[0]), min(frame_h, pos_y + self.size[1])
+        self.roi = (slice(y0, y1), slice(x0, x1)) if x0 < x1 and y0 < y1 else None
+        self._window = (slice(y0 - pos_y, y1 - pos_y), x0 - pos_x, x1 - pos_x) # ROI in Masken-Koordinaten
+        shape = (max(0, y1 - y0), max(0, x1 - x0))
+        self._inv_alpha = np.empty(shape + (1,), dtype=np.uint16)
+        self._premultiplied = np.empty(shape + (3,), dtype=np.uint16)
+        self._scratch = np.empty(shape + (3,), dtype=np.uint16)
+        self._carry = np.empty(shape + (3,), dtype=np.uint16)
+        self._refresh(0, self.size[0])
+
+    def _refresh(self, mx0, mx1):
+        """Berechnet die Puffer für die Masken-Spalten mx0..mx1 neu (soweit im ROI)."""
+        import numpy as np
+        rows, wx0, wx1 = self._window
+        mx0, mx1 = max(mx0, wx0), min(mx1, wx1)
+        if self.roi is None or mx0 >= mx1:
+            return
+        alpha = self._mask[rows, mx0:mx1, None].astype(np.uint16)
+        alpha *= self._opacity
+        alpha += 127
+        alpha //= 255
+        cols = slice(mx0 - wx0, mx1 - wx0)
+        np.subtract(255, alpha, out=self._inv_alpha[:, cols])
+        # rgb * a + 128 (Rundung), wie bei RoiCompositor
+        np.multiply(self._rgb, alpha, out=self._premultiplied[:, cols])
+        self._premultiplied[:, cols] += 128
+
+    def _set_cell(self, x0, glyph):
+        pad_y = self.padding[1]
+        cell_w = self.atlas.cell_width
+        cell = self._mask[pad_y:pad_y + self.atlas.height, x0:x0 + cell_w]
+        cell[:] = 0
+        if glyph != " ":
+            mask, advance = self.atlas.get(glyph)
+            offset = max(0, (cell_w - advance) // 2)
+            width = min(mask.shape[1], cell_w - offset)
+            cell[:, offset:offset + width] = mask[:, :width]
+        self._refresh(x0, x0 + cell_w)
+
+    def blend_inplace(self, frame):
+        """Mischt den Text des nächsten Frames in den (beschreibbaren, RGB uint8) Frame und gibt ihn zurück."""
+        values = frame_field_values(self._frame_index, self.fps)
+        self._frame_index += 1
+        texts = [format(values[field], spec) for field, spec, _, _ in self._fields]
+        if any(len(text) > len(cells) for text, (_, _, cells, _) in zip(texts, self._fields)):
+            # Wert länger als geschätzt (Dauer ungenau): Zellen einmalig verbreitern
+            widths = iter(max(len(text), len(cells)) for text, (_, _, cells, _) in zip(texts, self._fields))
+            self._build([next(widths) if field else 0 for _, field, _ in self.parts])
+        for text, (_, _, cells, shown) in zip(texts, self._fields):
+            text = text.rjust(len(cells))
+            for index, glyph in enumerate(text):
+                if shown[index] != glyph:
+                    self._set_cell(cells[index], glyph)
+                    shown[index] = glyph
+        if self.roi is not None:
+            _blend_premultiplied(frame[self.roi], self._inv_alpha, self._premultiplied, self._scratch, self._carry)
+        return frame
+
+    def __call__(self, frame):
+        return self.blend_inplace(frame)
+
+
+def _define_progress_logger(proglog):
+    """Erzeugt MoviePyProgressLogger, sobald proglog (mit MoviePy) geladen ist."""
+    class MoviePyProgressLogger(proglog.ProgressBarLogger):
+        """Leitet den Frame-Zähler von write_videofile an `on_progress(frames_done, out_time_s)` weiter.
+
+        Wird pro Frame aufgerufen und bricht das Schreiben bei gesetztem `stop_event` ab.
+        """
+        def __init__(self, on_progress, fps, stop_event=None):
+            super().__init__()
+            self._on_progress = on_progress
+            self._fps = fps or 25.0
+            self._stop_event = stop_event
+            self._last_report = 0.0
+
+        def bars_callback(self, bar, attr, value, old_value=None):
+            if self._stop_event is not None and self._stop_event.is_set():
+                raise ProcessingCancelled()
+            if bar != "frame_index" or attr != "index" or not self._on_progress:
+                return
+            now = time.monotonic()
+            if now - self._last_report < PROGRESS_INTERVAL:
+                return
+            self._last_report = now
+            frames_done = value + 1
+            self._on_progress(frames_done, frames_done / self._fps)
+    return MoviePyProgressLogger
+
+
+def watermark_video_moviepy(video_path, output_path, wm_numpy_image, relative_pos, threads, on_progress=None, stop_event=None, encoder=None):
+    """MoviePy-Engine: Komposition Frame für Frame in Python (RoiCompositor statt CompositeVideoClip)."""
+    if not load_moviepy():
+        raise RuntimeError(MOVIEPY_IMPORT_ERROR)
+    filename = os.path.basename(video_path)
+    clip = None
+    final = None
+    video_only_path = None
+    try:
+        log("info", "Lade Video...", video=filename)
+        with instrumentation.span("clip_open", video=filename):
+            clip = VideoFileClip(video_path)
+        video_w, video_h = clip.size
+        log("info", f"Video Größe: {video_w}x{video_h}, Dauer: {clip.duration}s", video=filename)
+
+        wm_h, wm_w = wm_numpy_image.shape[:2]
+        pos_x, pos_y = compute_watermark_position((video_w, video_h), (wm_w, wm_h), relative_pos)
+        log("info", f"Wasserzeichen Position (px): ({pos_x:.1f}, {pos_y:.1f})", video=filename)
+        check_watermark_in_frame((video_w, video_h), (wm_w, wm_h), (pos_x, pos_y))
+
+        # Nur der Bereich unter dem Wasserzeichen wird pro Frame gemischt
+        compositor = RoiCompositor(wm_numpy_image, (pos_x, pos_y), (video_w, video_h))
+        if instrumentation.trace: # Zeitmessung pro Frame nur bei aktivem Tracing
+            compositor = _TimedCompositor(compositor, filename)
+        final = clip.image_transform(compositor)
+
+        # Kopierbare Audiospur: Video stumm schreiben und die Originalspur danach unverändert muxen
+        try:
+            source_audio_codec = probe_media(video_path)["audio_codec"] if clip.audio is not None else None
+        except Exception as probe_e:
+            log("warning", f"Audio-Codec nicht ermittelbar ({probe_e}), transkodiere.", video=filename)
+            source_audio_codec = "unbekannt"
+        audio_codec = select_audio_codec(source_audio_codec)
+        log("info", f"Audio: {describe_audio_path(source_audio_codec, audio_codec)}", video=filename)
+        if audio_codec == "copy":
+            video_only_path = f"{os.path.splitext(output_path)[0]}.video_only.mp4"
+
+        log("info", f"Schreibe Ergebnis nach '{output_path}' mit optimierten Parametern...", video=filename)
+        encoder = encoder or default_encoder()
+        with instrumentation.span("write", video=filename):
+            final.write_videofile(
+                video_only_path if audio_codec == "copy" else output_path,
+                codec=VIDEO_CODEC,       # Standard H.264
+                audio=audio_codec != "copy",
+                audio_codec=AUDIO_CODEC, # Standard AAC Audio (nur bei Transkodierung)
+                threads=threads,
+                preset=encoder["preset"],
+                ffmpeg_params=[
+                    "-crf", str(encoder["crf"]),
+                    "-pix_fmt", OUTPUT_PIX_FMT,
+                    "-movflags", "+faststart" # Für Web-Streaming optimiert
+                ],
+                # Kein Konsolen-Balken; Fortschritt geht (falls gewünscht) an on_progress
+                logger=MoviePyProgressLogger(on_progress, clip.fps, stop_event) if (on_progress or stop_event) else None
+            )
+        if video_only_path:
+            with instrumentation.span("remux", video=filename):
+                remux_with_source_audio(video_only_path, video_path, output_path)
+        return describe_audio_path(source_audio_codec, audio_codec)
+    finally:
+        if video_only_path and os.path.exists(video_only_path):
+            os.remove(video_only_path)
+        # Resource cleanup (unchanged)
+        try:
+            with instrumentation.span("close", video=filename):
+                if final: final.close()
+                if clip: clip.close()
+            with instrumentation.span("gc", video=filename):
+                gc.collect()
+            log("info", "Ressourcen freigegeben, GC durchgeführt.", video=filename)
+        except Exception as close_e:
+             log("warning", f"Fehler beim Schließen der Clips (ignoriert): {close_e}", video=filename)
+
+
+def stream_frame_rate(fps):
+    """Bildrate als FFmpeg-Bruch; NTSC-Raten (29.97, 23.976, ...) exakt als n*1000/1001."""
+    ntsc = round(fps * 1.001)
+    if abs(fps - ntsc * 1000 / 1001) < 0.005 and abs(fps - ntsc) > 0.005:
+        return f"{ntsc * 1000}/1001"
+    return f"{fps:g}"
+
+
+def _read_frame(stream, view):
+    """Liest genau einen Frame per readinto direkt in `view`; False bei Stream-Ende."""
+    filled = 0
+    while filled < len(view):
+        count = stream.readinto(view[filled:])
+        if not count:
+            return False
+        filled += count
+    return True
+
+
+def _write_frame(stream, view):
+    """Schreibt `view` vollständig (rohe Pipes schreiben u. U. nur teilweise)."""
+    written = 0
+    while written < len(view):
+        written += stream.write(view[written:])
+
+
+def watermark_video_stream(video_path, output_path, wm_numpy_image, relative_pos, threads, info=None, on_progress=None,
+                           stop_event=None, encoder=None, ring_slots=STREAM_RING_SLOTS, text_overlay=None):
+    """Stream-Engine: Rohframes von einem FFmpeg-Decoder über einen festen Ringpuffer zum FFmpeg-Encoder.
+
+    Drei überlappende Stufen: ein Thread liest per readinto in freie Slots (ohne
+    Zwischenkopie), der aufrufende Thread mischt das Wasserzeichen im Slot
+    (RoiCompositor.blend_inplace, nur der ROI), ein Thread schreibt denselben Slot in die
+    Encoder-Pipe und gibt ihn wieder frei. Der Speicher bleibt bei `ring_slots` Frames,
+    unabhängig von Länge und Auflösung; gc.collect() ist nicht nötig. Die Ausgabe hat
+    konstante Bildrate (wie bei MoviePy), die Audiospur kommt direkt aus der Quelle.
+    Mit `text_overlay` (siehe build_job: parts, font, font_size, font_size_relative, color)
+    statt `wm_numpy_image` wird ein Text mit Frame-Platzhaltern pro Frame aus dem
+    Glyphen-Atlas gesetzt (TextTemplateCompositor).
+    """
+    import numpy as np
+    from PIL import ImageColor
+    filename = os.path.basename(video_path)
+    ffmpeg_exe = find_ffmpeg_exe()
+    if not ffmpeg_exe:
+        raise FileNotFoundError("ffmpeg wurde nicht gefunden.")
+    if not info:
+        with instrumentation.span("probe", video=filename):
+            info = probe_media(video_path)
+    width, height, fps = info["width"], info["height"], info["fps"] or 25.0
+    rate = stream_frame_rate(fps)
+    if text_overlay:
+        font_size = (relative_font_size(text_overlay["font_size_relative"], height) if text_overlay.get("font_size_relative")
+                     else int(text_overlay["font_size"]))
+        compositor = TextTemplateCompositor(get_glyph_atlas(text_overlay["font"], font_size), text_overlay["parts"],
+                                            ImageColor.getrgb(to_rgba_hex(text_overlay["color"])), relative_pos,
+                                            (width, height), float(Fraction(rate)),
+                                            int((info["duration"] or 0) * float(Fraction(rate))), watermark_padding(font_size))
+    else:
+        wm_h, wm_w = wm_numpy_image.shape[:2]
+        pos_x, pos_y = compute_watermark_position((width, height), (wm_w, wm_h), relative_pos)
+        check_watermark_in_frame((width, height), (wm_w, wm_h), (pos_x, pos_y))
+        compositor = RoiCompositor(wm_numpy_image, (pos_x, pos_y), (width, height))
+    if instrumentation.trace:
+        compositor = _TimedCompositor(compositor, filename)
+    audio_codec = select_audio_codec(info["audio_codec"])
+    frame_bytes = width * height * 3
+    log("info", f"Video Größe: {width}x{height}, Dauer: {info['duration']}s, {rate} fps, "
+                f"Ringpuffer {ring_slots} x {frame_bytes / 1e6:.1f} MB", video=filename)
+    log("info", f"Audio: {describe_audio_path(info['audio_codec'], audio_codec)}", video=filename)
+
+    # Ringpuffer: einmal allokiert, Decoder, Compositor und Encoder arbeiten auf denselben Bytes
+    slots = [np.empty((height, width, 3), dtype=np.uint8) for _ in range(ring_slots)]
+    views = [memoryview(slot).cast("B") for slot in slots]
+
+    # Drehung selbst anwenden statt der Auto-Rotation: die Rohframes haben so sicher die Größe der Slots
+    decode_cmd = [
+        ffmpeg_exe, "-hide_banner", "-nostdin", "-loglevel", "error",
+        "-noautorotate", "-i", video_path, "-map", "0:v:0",
+    ]
+    if info.get("rotation"):
+        decode_cmd += ["-vf", ",".join(rotation_filters(info["rotation"]))]
+    decode_cmd += ["-r", rate, "-f", "rawvideo", "-pix_fmt", STREAM_PIX_FMT, "pipe:1"]
+
+    def encode_cmd(audio_codec):
+        cmd = [
+            ffmpeg_exe, "-hide_banner", "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", STREAM_PIX_FMT, "-s", f"{width}x{height}", "-r", rate, "-i", "pipe:0",
+            "-i", video_path, "-map", "0:v:0",
+        ]
+        if audio_codec:
+            cmd += ["-map", "1:a:0", "-c:a", audio_codec]
+        return cmd + encoder_args(encoder) + [
+            "-pix_fmt", OUTPUT_PIX_FMT, "-threads", str(threads), "-movflags", "+faststart", output_path,
+        ]
+
+    def run_pipeline(audio_codec):
+        free, decoded, blended = queue.Queue(), queue.Queue(), queue.Queue()
+        for index in range(ring_slots):
+            free.put(index)
+        failures = []
+        with tempfile.TemporaryFile() as decode_err, tempfile.TemporaryFile() as encode_err:
+            # bufsize=0: rohe Pipes, readinto/write gehen ohne Python-Puffer direkt in die Slots
+            decoder = subprocess.Popen(decode_cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=decode_err,
+                                       bufsize=0, **SUBPROCESS_ISOLATION)
+            encoder_proc = subprocess.Popen(encode_cmd(audio_codec), stdin=subprocess.PIPE, stdout=subprocess.DEVNULL,
+                                            stderr=encode_err, bufsize=0, **SUBPROCESS_ISOLATION)
+
+            killed = set() # von uns beendete Prozesse: deren Exit-Code ist kein eigener Fehler
+            def abort():
+                for proc in (decoder, encoder_proc):
+                    if proc.poll() is None:
+                        killed.add(proc.pid)
+                        proc.kill()
+                for stage_queue in (free, decoded, blended):
+                    stage_queue.put(None)
+
+            def reader():
+                try:
+                    while True:
+                        index = free.get()
+                        if index is None or not _read_frame(decoder.stdout, views[index]):
+                            break
+                        decoded.put(index)
+                except Exception as e:
+                    failures.append(e)
+                    abort()
+                decoded.put(None)
+
+            frames_written = [0]
+            def writer():
+                last_report = 0.0
+                try:
+                    while True:
+                        index = blended.get()
+                        if index is None:
+                            break
+                        _write_frame(encoder_proc.stdin, views[index])
+                        free.put(index)
+                        frames_written[0] += 1
+                        now = time.monotonic()
+                        if on_progress and now - last_report >= PROGRESS_INTERVAL:
+                            last_report = now
+                            on_progress(frames_written[0], frames_written[0] / fps)
+                    encoder_proc.stdin.close() # EOF: Encoder schreibt die Datei fertig
+                except Exception as e:
+                    failures.append(e)
+                    abort()
+
+            stages = [threading.Thread(target=reader, name="wz5-stream-read", daemon=True),
+                      threading.Thread(target=writer, name="wz5-stream-write", daemon=True)]
+            for stage in stages:
+                stage.start()
+            cancelled = False
+            try:
+                while True:
+                    index = decoded.get()
+                    if index is None:
+                        break
+                    if stop_event is not None and stop_event.is_set():
+                        cancelled = True
+                        abort()
+                        break
+                    compositor(slots[index])
+                    blended.put(index)
+            except BaseException:
+                abort() # sonst warten Leser und Schreiber ewig auf ihre Queues
+                raise
+            finally:
+                blended.put(None)
+                for stage in stages:
+                    stage.join()
+                decoder.wait()
+                encoder_proc.wait()
+            if cancelled:
+                raise ProcessingCancelled()
+            for proc, err_file in ((encoder_proc, encode_err), (decoder, decode_err)):
+                if proc.returncode != 0 and proc.pid not in killed:
+                    err_file.seek(0)
+                    raise FFmpegError(proc.returncode, err_file.read().decode(errors="replace"))
+            if failures:
+                raise failures[0]
+
+    log("info", f"Schreibe Ergebnis nach '{output_path}' (Rohframe-Stream)...", video=filename)
+    with instrumentation.span("encode", video=filename):
+        try:
+            run_pipeline(audio_codec)
+        except FFmpegError:
+            if audio_codec != "copy" or (stop_event is not None and stop_event.is_set()):
+                raise
+            log("warning", f"Audio Stream-Copy fehlgeschlagen, transkodiere nach {AUDIO_CODEC}...", video=filename)
+            audio_codec = AUDIO_CODEC
+            run_pipeline(audio_codec)
+    return describe_audio_path(info["audio_codec"], audio_codec)
+
+
+def describe_processing_error(filename, e):
+    """Übersetzt eine Exception in eine verständliche Fehlermeldung für die Zusammenfassung."""
+    error_type = type(e).__name__
+    error_details = str(e)
+    error_msg = f"FEHLER '{filename}': {error_type}"
+    if isinstance(e, (FileNotFoundError, OSError)) and ('ffmpeg' in error_details.lower() or 'ffprobe' in error_details.lower()):
+        error_msg += f" -> FFmpeg/FFprobe nicht gefunden oder Pfad falsch? (Pfad: {os.environ.get('IMAGEIO_FFMPEG_EXE', 'System PATH / imageio')})"
+    elif isinstance(e, OSError) and ("Permission denied" in error_details or "Errno 13" in error_details):
+        error_msg += " -> Keine Schreibrechte im Ausgabeordner?"
+    elif "Unknown encoder" in error_details:
+         error_msg += f" -> FFmpeg kennt Codec nicht ({'libx264' if 'libx264' in error_details else 'aac'}?). FFmpeg aktuell?"
+    elif "AttributeError" in error_type and ("with_position" in error_details or "with_duration" in error_details):
+         error_msg += " -> MoviePy API Fehler. Bitte melden."
+    elif "MemoryError" in error_type:
+         error_msg += " -> Nicht genug Arbeitsspeicher. memory_budget_mb verringern oder weniger parallele Jobs."
+    else:
+         detail_snippet = error_details.replace('\n', ' ').strip()[:100]
+         error_msg += f" -> Details: {detail_snippet}..."
+    return error_msg
+
+
+def load_watermark_array(wm_png_path):
+    """Wasserzeichen-PNG als RGBA-Array (H, W, 4) für RoiCompositor."""
+    import numpy as np
+    from PIL import Image
+    with Image.open(wm_png_path) as image:
+        return np.array(image.convert("RGBA"))
+
+
+def process_video_job(job, on_progress=None, stop_event=None):
+    """Verarbeitet ein einzelnes Video. Läuft im Verarbeitungs-Thread oder in einem Worker-Prozess.
+
+    `job` ist ein einfaches dict (picklebar): index, video_path, output_path, engine,
+    wm_png_path, wm_size, relative_pos, threads, segment_threshold, encoder, info und
+    optional renditions (Ausgabestufen mit output_path, dann nur FFmpeg-Engine),
+    variants (ein Wasserzeichen und eine Ausgabe pro Variante, nur FFmpeg-Engine),
+    time_ranges (Wasserzeichen nur in diesen Zeitbereichen, nur FFmpeg-Engine) und
+    text_overlay (Text mit Frame-Platzhaltern, nur Stream-Engine).
+    Liefert {"status": "ok"|"error"|"cancelled", "error": Meldung oder None,
+    "peak_memory_mb": gemessener Spitzen-Speicher des Jobs (MemorySampler) oder None}.
+    Geschrieben wird nach partial_output_path(); erst nach Erfolg wird atomar auf den
+    Zielnamen umbenannt. Bei Fehler oder Abbruch wird die Teil-Ausgabe gelöscht, eine
+    vorhandene fertige Ausgabe bleibt unangetastet.
+    """
+    with MemorySampler() as sampler:
+        outcome = _process_video_job(job, on_progress, stop_event)
+    outcome["peak_memory_mb"] = round(sampler.peak_mb, 1) if sampler.peak_mb is not None else None
+    return outcome
+
+
+def _process_video_job(job, on_progress, stop_event):
+    video_path = job["video_path"]
+    filename = os.path.basename(video_path)
+    work_path = partial_output_path(job["output_path"])
+    stopped = lambda: stop_event is not None and stop_event.is_set()
+    with instrumentation.span("job", video=filename):
+        try:
+            if stopped():
+                raise ProcessingCancelled()
+            if job.get("renditions"):
+                work_paths = [partial_output_path(path) for path in job_output_paths(job)]
+                watermark_video_ladder(video_path, work_paths, job["renditions"], job["wm_png_path"], job["wm_size"],
+                                       job["relative_pos"], job["threads"], info=job.get("info"), on_progress=on_progress,
+                                       stop_event=stop_event, encoder=job.get("encoder"))
+                for work, final in zip(work_paths, job_output_paths(job)):
+                    os.replace(work, final)
+                    instrumentation.count("output_bytes", os.path.getsize(final), video=filename)
+                log("info", f"Erfolgreich abgeschlossen ({len(work_paths)} Ausgabestufen).", video=filename)
+                return {"status": "ok", "error": None}
+            if job.get("variants"):
+                work_paths = [partial_output_path(path) for path in job_output_paths(job)]
+                watermark_video_variants(video_path, work_paths, job["variants"], job["threads"], info=job.get("info"),
+                                         on_progress=on_progress, stop_event=stop_event, encoder=job.get("encoder"),
+                                         time_ranges=job.get("time_ranges"))
+                for work, final in zip(work_paths, job_output_paths(job)):
+                    os.replace(work, final)
+                    instrumentation.count("output_bytes", os.path.getsize(final), video=filename)
+                write_variants_manifest(job)
+                log("info", f"Erfolgreich abgeschlossen ({len(work_paths)} Varianten, Zuordnung in "
+                            f"'{os.path.basename(job['manifest_path'])}').", video=filename)
+                return {"status": "ok", "error": None}
+            if job["engine"] == ENGINE_STREAM:
+                wm_numpy_image = None if job.get("text_overlay") else load_watermark_array(job["wm_png_path"])
+                watermark_video_stream(video_path, work_path, wm_numpy_image, job["relative_pos"], job["threads"],
+                                       info=job.get("info"), on_progress=on_progress, stop_event=stop_event,
+                                       encoder=job.get("encoder"), text_overlay=job.get("text_overlay"))
+                os.replace(work_path, job["output_path"])
+                instrumentation.count("output_bytes", os.path.getsize(job["output_path"]), video=filename)
+                log("info", "Erfolgreich abgeschlossen.", video=filename)
+                return {"status": "ok", "error": None}
+            if job["engine"] == ENGINE_FFMPEG:
+                try:
+                    watermark_video_ffmpeg(video_path, work_path, job["wm_png_path"], job["wm_size"], job["relative_pos"], job["threads"],
+                                           info=job.get("info"), on_progress=on_progress, stop_event=stop_event,
+                                           segment_threshold=job.get("segment_threshold"), encoder=job.get("encoder"),
+                                           time_ranges=job.get("time_ranges"))
+                    os.replace(work_path, job["output_path"])
+                    instrumentation.count("output_bytes", os.path.getsize(job["output_path"]), video=filename)
+                    log("info", "Erfolgreich abgeschlossen.", video=filename)
+                    return {"status": "ok", "error": None}
+                except FFmpegError as ff_e:
+                    if stopped() or not load_moviepy() or job.get("time_ranges"):
+                        raise
+                    log("warning", f"FFmpeg-Engine fehlgeschlagen ({ff_e}). Fallback auf MoviePy...", video=filename)
+
+            wm_numpy_image = load_watermark_array(job["wm_png_path"])
+            watermark_video_moviepy(video_path, work_path, wm_numpy_image, job["relative_pos"], job["threads"],
+                                    on_progress=on_progress, stop_event=stop_event, encoder=job.get("encoder"))
+            os.replace(work_path, job["output_path"])
+            instrumentation.count("output_bytes", os.path.getsize(job["output_path"]), video=filename)
+            log("info", "Erfolgreich abgeschlossen.", video=filename)
+            return {"status": "ok", "error": None}
+
+        except Exception as e:
+            for path in job_output_paths(job):
+                remove_partial_output(partial_output_path(path))
+            if isinstance(e, ProcessingCancelled) or stopped():
+                log("info", "Verarbeitung abgebrochen.", video=filename)
+                return {"status": "cancelled", "error": None}
+            log("error", f"Verarbeitung fehlgeschlagen: {type(e).__name__}: {e}\n{traceback.format_exc()}", video=filename)
+            return {"status": "error", "error": describe_processing_error(filename, e)}
+
+
+def _process_video_job_in_worker(job, progress_queue, cancel_event):
+    """Einstieg im Worker-Prozess: Fortschritt geht gedrosselt über eine Manager-Queue zurück,
+    der Abbruch kommt über ein Manager-Event."""
+    last_report = [0.0]
+    def report(frames_done, out_time):
+        now = time.monotonic()
+        if now - last_report[0] >= PROGRESS_INTERVAL:
+            last_report[0] = now
+            progress_queue.put((job["index"], frames_done, out_time))
+    outcome = process_video_job(job, on_progress=report, stop_event=cancel_event)
+    if instrumentation.trace:
+        outcome["metrics"] = instrumentation.drain() # Hauptprozess führt die Werte zusammen
+    return outcome
+
+
+def _init_worker(instrumentation_config):
+    """Initialisierung der Worker-Prozesse: Strg+C ignorieren, Logging wie im Hauptprozess."""
+    _ignore_sigint()
+    instrumentation.configure(**instrumentation_config)
+
+
+# --- Fortschritt ---
+class BatchProgress:
+    """Batch-Fortschritt aus echten Encoder-Daten: Frames, fps, Geschwindigkeit, ETA.
+
+    Die ETA gewichtet nach Videodauer: verbleibende Sekunden Material geteilt durch den
+    bisherigen Durchsatz (Sekunden Material pro Sekunde Laufzeit, über alle Worker).
+    """
+    def __init__(self, jobs):
+        self._names = [os.path.basename(job["video_path"]) for job in jobs]
+        self._durations = [float((job.get("info") or {}).get("duration") or 0.0) for job in jobs]
+        self._fps = [float((job.get("info") or {}).get("fps") or 0.0) for job in jobs]
+        self._total_media = sum(self._durations)
+        self._start = time.monotonic()
+        self._active = {}   # index -> {"start", "frames", "out_time"}
+        self._done = set()
+        self._done_media = 0.0
+
+    def start_file(self, index):
+        self._active[index] = {"start": time.monotonic(), "frames": 0, "out_time": 0.0}
+
+    def update(self, index, frames_done, out_time):
+        state = self._active.get(index)
+        if state is not None:
+            state["frames"] = frames_done
+            state["out_time"] = out_time
+
+    def finish_file(self, index):
+        self._active.pop(index, None)
+        self._done.add(index)
+        self._done_media += self._durations[index]
+
+    def snapshot(self):
+        """Momentaufnahme als dict (für GUI, CLI und Logs)."""
+        now = time.monotonic()
+        elapsed = now - self._start
+        active = []
+        active_media = 0.0
+        for index, state in sorted(self._active.items()):
+            file_elapsed = max(1e-6, now - state["start"])
+            duration = self._durations[index]
+            out_time = min(state["out_time"], duration) if duration else state["out_time"]
+            active_media += out_time
+            active.append({
+                "file": self._names[index],
+                "frames": state["frames"],
+                "total_frames": int(round(duration * self._fps[index])) if duration and self._fps[index] else None,
+                "fps": state["frames"] / file_elapsed,
+                "speed": out_time / file_elapsed,
+            })
+
+        processed_media = self._done_media + active_media
+        total_files = len(self._names)
+        if self._total_media > 0:
+            fraction = processed_media / self._total_media
+        else:
+            fraction = len(self._done) / total_files if total_files else 1.0
+        throughput = processed_media / elapsed if elapsed > 0 else 0.0
+        remaining_media = max(0.0, self._total_media - processed_media)
+        return {
+            "done_files": len(self._done),
+            "total_files": total_files,
+            "percent": min(100.0, 100.0 * fraction),
+            "elapsed_s": elapsed,
+            "encode_fps": sum(a["fps"] for a in active),
+            "speed": sum(a["speed"] for a in active),
+            "eta_s": remaining_media / throughput if throughput > 0 and processed_media > 0 else None,
+            "active": active,
+        }
+
+
+def format_duration(seconds):
+    """Sekunden -> 'H:MM:SS'."""
+    seconds = int(max(0, seconds))
+    return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def format_progress(snapshot):
+    """Einzeilige Fortschrittsanzeige für Statusleiste und Konsole."""
+    parts = [f"{snapshot['done_files']}/{snapshot['total_files']} fertig"]
+    for item in snapshot["active"]:
+        frames = f"{item['frames']}/{item['total_frames']}" if item["total_frames"] else str(item["frames"])
+        parts.append(f"{item['file']}: {frames} Frames, {item['fps']:.1f} fps, {item['speed']:.2f}x")
+    if snapshot["eta_s"] is not None:
+        parts.append(f"Rest ca. {format_duration(snapshot['eta_s'])}")
+    return " | ".join(parts)
+
+
+# --- Vorschau-Frames ---
+def extract_preview_frame(video_path, time_s, max_size=PREVIEW_DECODE_SIZE):
+    """Dekodiert einen einzelnen Frame für die Vorschau als PIL-Bild (RGB).
+
+    Schnelle Suche ohne exaktes Seeking: FFmpeg springt zum Keyframe vor `time_s` und
+    liefert diesen, bereits in FFmpeg auf `max_size` (Seitenverhältnis bleibt) verkleinert.
+    """
+    ffmpeg_exe = find_ffmpeg_exe()
+    if not ffmpeg_exe:
+        raise FileNotFoundError("ffmpeg wurde nicht gefunden.")
+    max_w, max_h = max_size
+    cmd = [
+        ffmpeg_exe, "-hide_banner", "-nostdin", "-loglevel", "error",
+        "-noaccurate_seek", "-ss", f"{max(0.0, time_s):.3f}", "-i", video_path,
+        # passthrough: sonst verwirft die CFR-Synchronisation Frames bis Zeitstempel 0 (dekodiert bis zum Zielpunkt)
+        "-map", "0:v:0", "-frames:v", "1", "-fps_mode", "passthrough",
+        "-vf", f"scale=w={max_w}:h={max_h}:force_original_aspect_ratio=decrease",
+        "-f", "image2pipe", "-c:v", "bmp", "-",
+    ]
+    result = subprocess.run(cmd, stdin=subprocess.DEVNULL, capture_output=True, **SUBPROCESS_ISOLATION)
+    if result.returncode != 0:
+        raise FFmpegError(result.returncode, result.stderr.decode("utf-8", "replace"))
+    if not result.stdout:
+        raise ValueError(f"Kein Frame bei {time_s:.2f}s gefunden.")
+    from PIL import Image
+    image = Image.open(io.BytesIO(result.stdout))
+    return image.convert("RGB")
+
+
+class PreviewFrameCache:
+    """Vorschau-Frames mit Speicher-LRU und optionalem Festplatten-Cache.
+
+    Schlüssel sind (Pfad, mtime, Größe, Zeitpunkt): ändert sich die Datei, werden
+    alte Einträge nicht mehr getroffen. Auf der Festplatte liegen die Frames als
+    JPEG im Cache-Ordner (THUMBNAIL_DIRNAME). Threadsicher, gedacht für Hintergrund-Threads.
+    """
+    def __init__(self, maxsize=PREVIEW_FRAME_CACHE_SIZE, disk_dir=None, use_disk=True):
+        self._frames = LRUCache(maxsize)
+        self._disk_dir = (disk_dir or os.path.join(get_cache_dir(), THUMBNAIL_DIRNAME)) if use_disk else None
+        self._disk_pruned = False
+
+    @staticmethod
+    def _file_key(video_path):
+        stat = os.stat(video_path)
+        return (os.path.abspath(video_path), stat.st_mtime_ns, stat.st_size)
+
+    def media_info(self, video_path):
+        """probe_media()-Ergebnis, gecacht pro Datei-Version (gemeinsam mit der Vorab-Analyse)."""
+        return probe_cache.probe(video_path)
+
+    def get_frame(self, video_path, time_s):
+        """Frame nahe `time_s` (Sekunden) als PIL-Bild: Speicher -> Festplatte -> Dekodieren."""
+        key = self._file_key(video_path) + (round(time_s, 3),)
+        image = self._frames.get(key)
+        if image is not None:
+            return image
+        disk_path = None
+        if self._disk_dir:
+            disk_path = os.path.join(self._disk_dir, hashlib.sha1(repr(key).encode("utf-8")).hexdigest() + ".jpg")
+            from PIL import Image
+            try:
+                with Image.open(disk_path) as cached:
+                    image = cached.convert("RGB")
+            except (OSError, ValueError):
+                image = None
+        if image is None:
+            image = extract_preview_frame(video_path, time_s)
+            if disk_path:
+                self._save_to_disk(image, disk_path)
+        self._frames.put(key, image)
+        return image
+
+    def _save_to_disk(self, image, disk_path):
+        try:
+            os.makedirs(self._disk_dir, exist_ok=True)
+            tmp_path = disk_path + ".tmp"
+            image.save(tmp_path, format="JPEG", quality=85)
+            os.replace(tmp_path, disk_path)
+            if not self._disk_pruned:
+                self._disk_pruned = True
+                self._prune_disk()
+        except OSError as e:
+            log("warning", f"Vorschaubild konnte nicht gespeichert werden: {e}")
+
+    def _prune_disk(self):
+        """Hält den Festplatten-Cache unter THUMBNAIL_DISK_LIMIT Dateien (älteste zuerst weg)."""
+        try:
+            entries = [e for e in os.scandir(self._disk_dir) if e.name.endswith(".jpg")]
+        except OSError:
+            return
+        if len(entries) <= THUMBNAIL_DISK_LIMIT:
+            return
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for entry in entries[:len(entries) - THUMBNAIL_DISK_LIMIT]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+
+# --- Wasserzeichen ---
+class WatermarkError(Exception):
+    """Wasserzeichen konnte nicht erstellt werden. `title` dient als Dialog-Titel in der GUI."""
+    def __init__(self, title, message):
+        super().__init__(message)
+        self.title = title
+
+
+def parse_text_template(text):
+    """Zerlegt einen Wasserzeichentext mit Platzhaltern in [(text, feld, format), ...] (feld None = nur Text).
+
+    Platzhalter stehen in geschweiften Klammern, optional mit Format wie bei str.format:
+    {dateiname}, {name}, {datum} pro Datei und {timecode}, {frame}, {zeit} pro Frame,
+    z.B. "{name} TC {timecode} #{frame:06d}"; "{{" und "}}" ergeben Klammern. Wirft ValueError.
+    """
+    try:
+        parsed = list(string.Formatter().parse(text))
+    except ValueError as e:
+        raise ValueError(f"Platzhalter im Text ungültig ({e}); Klammern als {{{{ bzw. }}}} schreiben.")
+    samples = frame_field_values(0, 25.0)
+    parts = []
+    for literal, field, spec, conversion in parsed:
+        if field is not None:
+            if field not in TEMPLATE_FILE_FIELDS + TEMPLATE_FRAME_FIELDS:
+                allowed = ", ".join(f"{{{name}}}" for name in TEMPLATE_FILE_FIELDS + TEMPLATE_FRAME_FIELDS)
+                raise ValueError(f"Unbekannter Platzhalter {{{field}}}; erlaubt sind {allowed}.")
+            try:
+                if conversion:
+                    raise ValueError(conversion)
+                format(samples.get(field, ""), spec)
+            except ValueError:
+                raise ValueError(f"Format '{spec or conversion}' passt nicht zum Platzhalter {{{field}}}.")
+        parts.append((literal, field, spec or ""))
+    return parts
+
+
+def text_template_fields(text):
+    """Menge der Platzhalter im Text (siehe parse_text_template)."""
+    return {field for _, field, _ in parse_text_template(text) if field}
+
+
+def frame_field_values(frame_index, fps):
+    """Werte der Frame-Platzhalter; der Timecode zählt mit der gerundeten Bildrate (ohne Drop-Frame)."""
+    nominal = max(1, round(fps))
+    seconds = frame_index // nominal
+    millis = int(frame_index * 1000 / fps)
+    return {
+        "timecode": f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}:{frame_index % nominal:02d}",
+        "frame": frame_index,
+        "zeit": f"{millis // 3600000:02d}:{millis // 60000 % 60:02d}:{millis // 1000 % 60:02d}.{millis % 1000:03d}",
+    }
+
+
+def resolve_file_fields(text, video_path, today=None):
+    """Setzt die Datei-Platzhalter ein; liefert [(text, feld, format), ...] mit nur noch Frame-Platzhaltern
+    (letzter Eintrag ohne Feld)."""
+    filename = os.path.basename(video_path)
+    values = {"dateiname": filename, "name": os.path.splitext(filename)[0],
+              "datum": (today or datetime.date.today()).strftime(TEMPLATE_DATE_FORMAT)}
+    parts, pending = [], ""
+    for literal, field, spec in parse_text_template(text):
+        pending += literal
+        if field in values:
+            pending += format(values[field], spec)
+        elif field:
+            parts.append((pending, field, spec))
+            pending = ""
+    parts.append((pending, None, ""))
+    return parts
+
+
+def render_text_template(text, video_path, frame_index=0, fps=25.0):
+    """Fertiger Wasserzeichentext für eine Datei und einen Frame (z.B. Vorschau)."""
+    values = frame_field_values(frame_index, fps)
+    return "".join(literal + (format(values[field], spec) if field else "")
+                   for literal, field, spec in resolve_file_fields(text, video_path))
+
+
+def watermark_padding(font_size):
+    """Transparenter Rand (x, y) in px um den Wasserzeichentext."""
+    return max(5, int(font_size * 0.1)), max(3, int(font_size * 0.05))
+
+
+def load_watermark_font(font_name, font_size):
+    """Lädt die Schrift über den FONT_INDEX, sonst den PIL-Standard-Font.
+
+    Liefert (pil_font, Beschreibung) und wirft WatermarkError, wenn gar keine Schrift geladen werden kann.
+    """
+    from PIL import ImageFont
+    pil_font = None
+    font_path_used = "PIL Standard (Fallback)"
+    with instrumentation.span("font_lookup"):
+        font_path = resolve_font_path(font_name)
+        if font_path:
+            try:
+                pil_font = load_truetype_font(font_path, font_size)
+                font_path_used = f"'{font_path}'"
+            except (IOError, OSError) as load_err:
+                log("warning", f"Font existiert bei '{font_path}', aber Laden fehlgeschlagen: {load_err}")
+
+    if not pil_font:
+        try:
+            log("warning", f"Konnte Font '{font_name}' nach mehreren Versuchen nicht finden. Verwende PIL Standard-Font (Größe wird ignoriert!).")
+            pil_font = ImageFont.load_default()
+            font_path_used = "PIL Standard (Fallback - keine Größenänderung)"
+        except Exception as def_e:
+            log("error", f"Konnte auch Standard-Font nicht laden: {def_e}")
+            raise WatermarkError("Schriftart Fehler", f"Konnte weder '{font_name}' noch die Standard-Schriftart laden.\n{def_e}")
+    return pil_font, font_path_used
+
+
+def create_watermark_image(text, font_name, font_size, font_color_hex):
+    """Erstellt ein PIL Bild mit dem Wasserzeichentext. Font-Suche über den FONT_INDEX.
+
+    Liefert None bei leerem Text/Größe 0 und wirft WatermarkError, wenn nichts gezeichnet werden kann.
+    """
+    if not text or font_size <= 0: return None
+    from PIL import Image, ImageDraw
+    pil_font, font_path_used = load_watermark_font(font_name, font_size)
+
+    try:
+        with instrumentation.span("watermark_render"):
+            text_bbox = pil_font.getbbox(text)
+            text_width = text_bbox[2] - text_bbox[0]
+            text_height = text_bbox[3] - text_bbox[1]
+            padding_x, padding_y = watermark_padding(font_size)
+            img_width = text_width + 2 * padding_x
+            img_height = text_height + 2 * padding_y
+
+            image = Image.new("RGBA", (img_width, img_height), (0, 0, 0, 0))
+            draw = ImageDraw.Draw(image)
+            draw_x = padding_x - text_bbox[0]
+            draw_y = padding_y - text_bbox[1]
+            draw.text((draw_x, draw_y), text, font=pil_font, fill=font_color_hex)
+
+        log("info", f"Wasserzeichenbild erstellt mit Font: {font_path_used}, Größe: {font_size}")
+        return image
+
+    except Exception as e:
+        log("error", f"Erstellen des Wasserzeichenbildes mit Font {font_path_used} fehlgeschlagen: {e}\n{traceback.format_exc()}")
+        raise WatermarkError("Bild Erstellungsfehler", f"Fehler beim Zeichnen des Wasserzeichens:\n{e}")
+
+
+# --- Speicher-Budget ---
+def available_memory_mb():
+    """Freier Arbeitsspeicher in MB (Linux: MemAvailable, sonst sysconf), None wenn unbekannt."""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def process_tree_rss_mb(pid=None):
+    """Summe der RSS eines Prozesses und aller Nachfahren (FFmpeg) in MB; None ohne /proc."""
+    page_mb = os.sysconf("SC_PAGE_SIZE") / (1024 * 1024) if hasattr(os, "sysconf") else None
+    pending, total = [pid or os.getpid()], 0.0
+    try:
+        while pending:
+            current = pending.pop()
+            try:
+                with open(f"/proc/{current}/statm") as f:
+                    total += int(f.read().split()[1]) * page_mb
+                for tid in os.listdir(f"/proc/{current}/task"):
+                    with open(f"/proc/{current}/task/{tid}/children") as f:
+                        pending.extend(int(child) for child in f.read().split())
+            except (FileNotFoundError, ProcessLookupError):
+                if current == (pid or os.getpid()):
+                    raise
+                continue # Kindprozess inzwischen beendet
+    except (OSError, TypeError):
+        return None
+    return total
+
+
+class MemorySampler:
+    """Misst im Hintergrund den Spitzen-Speicher eines Jobs (Prozessbaum über dem Stand beim Start).
+
+    Ohne /proc (Windows, macOS) bleibt `peak_mb` None.
+    """
+    def __init__(self, interval=MEMORY_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.peak_mb = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        baseline = process_tree_rss_mb()
+        if baseline is not None:
+            self.peak_mb = 0.0
+            self._thread = threading.Thread(target=self._sample, args=(baseline,), name="wz5-memory", daemon=True)
+            self._thread.start()
+        return self
+
+    def _sample(self, baseline):
+        while True:
+            current = process_tree_rss_mb()
+            if current is not None:
+                self.peak_mb = max(self.peak_mb, current - baseline)
+            if self._stop.wait(self.interval):
+                return
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        return False
+
+
+def _x264_frames_mb(width, height, threads, encoder=None):
+    """Von libx264 gehaltene Frames in MB (gemessen inkl. Decoder im selben FFmpeg-Prozess)."""
+    preset = (encoder or default_encoder())["preset"]
+    base_frames, frames_per_thread = X264_FRAME_BUFFERS.get(preset, X264_FRAME_BUFFERS["medium"])
+    return width * height * 1.5 / 1e6 * (base_frames + frames_per_thread * threads)
+
+
+def estimate_job_memory_mb(job):
+    """Geschätzter Spitzen-Speicher eines Jobs in MB aus Auflösung, Engine, Threads (und Ausgabestufen/Varianten).
+
+    Ohne Auflösung (keine Vorab-Analyse) wird 1080p angenommen.
+    """
+    info = job.get("info") or {}
+    width, height = info.get("width") or 1920, info.get("height") or 1080
+    threads = job.get("threads") or 1
+    encoder = job.get("encoder")
+    if job.get("renditions"):
+        per_output = max(1, -(-threads // len(job["renditions"])))
+        total = PROCESS_BASE_MB
+        for rendition in job["renditions"]:
+            out_h = rendition["height"] or round(height * rendition["width"] / width)
+            out_w = rendition["width"] or round(width * out_h / height)
+            total += _x264_frames_mb(out_w, out_h, per_output, encoder)
+        return total
+    if job.get("variants"):
+        per_output = max(1, -(-threads // len(job["variants"])))
+        return PROCESS_BASE_MB + len(job["variants"]) * _x264_frames_mb(width, height, per_output, encoder)
+    if job["engine"] == ENGINE_FFMPEG:
+        parallel = segment_parallelism(info.get("duration"), threads, job.get("segment_threshold"))
+        if parallel > 1:
+            return parallel * (PROCESS_BASE_MB + _x264_frames_mb(width, height, SEGMENT_THREADS, encoder))
+        return PROCESS_BASE_MB + _x264_frames_mb(width, height, threads, encoder)
+    # Python-Engines: eigener Decoder-Prozess, RGB-Frames in Pipes und Python zusätzlich zum Encoder
+    engine = job["engine"]
+    rgb_frames = RAW_DECODER_FRAMES[engine] + RAW_ENCODER_FRAMES[engine] + RAW_PYTHON_FRAMES[engine]
+    total = 2 * PROCESS_BASE_MB + width * height * 3 / 1e6 * rgb_frames + _x264_frames_mb(width, height, threads, encoder)
+    if engine == ENGINE_MOVIEPY:
+        total += PYTHON_FRAME_OVERHEAD_MB
+    return total
+
+
+class MemoryBudget:
+    """Zulassung paralleler Jobs nach geschätztem Speicherbedarf.
+
+    Ein Job startet nur, wenn seine Schätzung zusammen mit den laufenden Jobs in
+    `budget_mb` passt; läuft nichts, startet er in jedem Fall (einzelner Job größer als
+    das Budget). Gemessene Spitzenwerte (observe) korrigieren die Schätzungen pro
+    Engine. `budget_mb` None = unbegrenzt. Threadsicher (Watch-Worker).
+    """
+    def __init__(self, budget_mb=None):
+        self.budget_mb = budget_mb
+        self.in_use_mb = 0.0
+        self._running = 0
+        self._factors = {} # Engine -> gemessen / geschätzt (gleitend)
+        self._cond = threading.Condition()
+
+    @classmethod
+    def from_settings(cls, settings):
+        """Budget aus settings["memory_budget_mb"]: Zahl in MB, 0 = aus, None = Anteil des freien Speichers."""
+        budget = settings.get("memory_budget_mb")
+        if budget is None:
+            available = available_memory_mb()
+            budget = available * MEMORY_BUDGET_FRACTION if available else None
+        return cls(float(budget) if budget else None)
+
+    def estimate(self, job):
+        """Schätzung für `job` in MB inklusive der bisher gemessenen Korrektur."""
+        return estimate_job_memory_mb(job) * self._factors.get(job["engine"], 1.0)
+
+    def _fits(self, mb):
+        return self.budget_mb is None or self._running == 0 or self.in_use_mb + mb <= self.budget_mb
+
+    def try_acquire(self, mb):
+        """Reserviert `mb`, wenn sie ins Budget passen (blockiert nicht)."""
+        with self._cond:
+            if not self._fits(mb):
+                return False
+            self.in_use_mb += mb
+            self._running += 1
+            return True
+
+    def acquire(self, mb, stop_event=None):
+        """Wartet, bis `mb` ins Budget passen; False, wenn vorher `stop_event` gesetzt wird."""
+        with self._cond:
+            while not self._fits(mb):
+                if stop_event is not None and stop_event.is_set():
+                    return False
+                self._cond.wait(0.5)
+            self.in_use_mb += mb
+            self._running += 1
+            return True
+
+    def release(self, mb):
+        with self._cond:
+            self.in_use_mb = max(0.0, self.in_use_mb - mb)
+            self._running -= 1
+            self._cond.notify_all()
+
+    def observe(self, job, peak_mb):
+        """Gemessenen Spitzenwert eines fertigen Jobs in die Korrektur der Schätzungen einrechnen."""
+        if not peak_mb:
+            return
+        ratio = peak_mb / estimate_job_memory_mb(job)
+        with self._cond:
+            previous = self._factors.get(job["engine"])
+            self._factors[job["engine"]] = ratio if previous is None else (previous + ratio) / 2
+
+
+# --- Batch-Verarbeitung ---
+def default_settings():
+    """Standard-Einstellungen eines Batches (entspricht den GUI-Vorgaben)."""
+    return {
+        "text": DEFAULT_WATERMARK_TEXT,
+        "font": DEFAULT_FONT_NAME,
+        "font_size": DEFAULT_FONT_SIZE,
+        "color": DEFAULT_FONT_COLOR,
+        "position": DEFAULT_POSITION,
+        "engine": DEFAULT_ENGINE,
+        "workers": 1,
+        "segment_threshold": SEGMENT_MIN_DURATION,
+        "tuning_goal": DEFAULT_TUNING_GOAL,
+        "tuning_target": DEFAULT_TUNING_TARGET,
+        "resume": True, # unveränderte, bereits fertige Dateien laut Journal überspringen
+        "renditions": None, # Ausgabestufen (ABR-Leiter), siehe parse_renditions; None = eine Ausgabe in Originalgröße
+        "time_ranges": None, # Wasserzeichen nur in diesen Zeitbereichen (s), z.B. "0-30,90-"; siehe parse_time_ranges
+        "variants": None, # eine Ausgabe pro Wasserzeichen-Variante (Empfänger) aus einem Decode; siehe parse_variants
+        "font_size_relative": None, # Schriftgröße als Anteil der Videohöhe (z.B. 0.05); None = font_size in px
+        "memory_budget_mb": None, # Speicher für parallele Jobs; None = 80 % des freien Speichers, 0 = unbegrenzt
+    }
+
+
+def relative_font_size(fraction, video_height):
+    """Schriftgröße in px für einen Anteil der Videohöhe."""
+    return max(MIN_RELATIVE_FONT_SIZE, int(round(fraction * video_height)))
+
+
+class WatermarkAssets:
+    """Wasserzeichen-PNGs eines Batches, pro Auflösung genau einmal gerastert.
+
+    Ohne settings["font_size_relative"] gibt es ein einziges Bild in font_size px
+    (optional vorgegeben als `wm_image`). Mit Anteil wird pro Videoauflösung in
+    nativer Größe gerastert (keine Skalierung, auch nicht pro Frame) und unter
+    (Breite, Höhe) zwischengespeichert. Mit settings["variants"] kommt je Variante
+    ein eigenes Bild (Text/Farbe der Variante) dazu. Datei-Platzhalter wie {dateiname}
+    werden pro Job eingesetzt (ein Bild pro entstehendem Text); Jobs mit Frame-Platzhaltern
+    bekommen kein Bild (siehe TextTemplateCompositor). Thread-sicher (Watch-Worker).
+    """
+    def __init__(self, settings, temp_dir, wm_image=None):
+        self.settings = settings
+        self.temp_dir = temp_dir
+        self.fraction = settings.get("font_size_relative")
+        self.variants = parse_variants(settings.get("variants")) or []
+        # (Variante oder None, (Breite, Höhe) oder None, Text oder None) -> (PNG-Pfad, Bildgröße)
+        self._assets = {}
+        self._lock = threading.Lock()
+        if wm_image is not None and not self.fraction and not text_template_fields(settings["text"]):
+            self._store((None, None, None), wm_image)
+
+    def _store(self, key, image):
+        variant, resolution, text = key
+        name = "wasserzeichen"
+        if variant is not None:
+            name += self.variants[variant]["suffix"]
+        if resolution is not None:
+            name += f"_{resolution[0]}x{resolution[1]}"
+        if text is not None:
+            name += "_" + hashlib.sha1(text.encode("utf-8")).hexdigest()[:12]
+        path = os.path.join(self.temp_dir, f"{name}.png")
+        image.save(path)
+        self._assets[key] = (path, image.size)
+        return self._assets[key]
+
+    def get(self, resolution=None, variant=None, text=None):
+        """(PNG-Pfad, Bildgröße) für eine Videoauflösung; ohne Auflösung die absolute Größe font_size.
+
+        `variant` ist der Index in settings["variants"] (None = Text/Farbe der Einstellungen),
+        `text` ersetzt deren Text (z.B. mit eingesetzten Datei-Platzhaltern).
+        """
+        key = (variant, tuple(resolution) if self.fraction and resolution else None, text)
+        with self._lock:
+            if key in self._assets:
+                return self._assets[key]
+            resolution = key[1]
+            font_size = relative_font_size(self.fraction, resolution[1]) if resolution else int(self.settings["font_size"])
+            color = self.settings["color"]
+            if variant is not None:
+                color = self.variants[variant]["color"] or color
+            if text is None:
+                text = self.variants[variant]["text"] if variant is not None else self.settings["text"]
+            with instrumentation.span("watermark_build"):
+                image = create_watermark_image(text, self.settings["font"], font_size, to_rgba_hex(color))
+            if not image:
+                raise WatermarkError("Vorbereitungsfehler", "Konnte Wasserzeichenbild nicht erstellen (siehe vorherige Logs).")
+            label = f"{resolution[0]}x{resolution[1]}" if resolution else "absolut"
+            if variant is not None:
+                label += f", Variante {self.variants[variant]['suffix'].lstrip('_')}"
+            log("info", f"Wasserzeichen für {label}: Schriftgröße {font_size}px, Bildgröße {image.size}")
+            return self._store(key, image)
+
+    def shared_png_path(self):
+        """PNG des gemeinsamen Bildes aller Jobs (für batch_settings_hash), sonst None.
+
+        Bei relativer Schriftgröße oder Platzhaltern im Text gibt es kein gemeinsames Bild;
+        das wörtliche Muster (z.B. "{dateiname} {timecode}") wird dann nicht gerastert.
+        """
+        if self.fraction or text_template_fields(self.settings["text"]):
+            return None
+        return self.get()[0]
+
+    def assign(self, job):
+        """Setzt wm_png_path/wm_size eines Jobs (und seiner Varianten) passend zur Auflösung aus job["info"]."""
+        info = job.get("info")
+        if self.fraction and not info:
+            log("warning", f"Auflösung unbekannt, verwende feste Schriftgröße {self.settings['font_size']}px.",
+                video=os.path.basename(job["video_path"]))
+        resolution = (info["width"], info["height"]) if info else None
+        if job.get("text_overlay"):
+            job["wm_png_path"], job["wm_size"] = None, None
+            return
+        job["wm_png_path"], job["wm_size"] = self.get(resolution, text=self._job_text(self.settings["text"], job))
+        for index, variant in enumerate(job.get("variants") or []):
+            variant["wm_png_path"], variant["wm_size"] = self.get(resolution, index, self._job_text(variant["text"], job))
+
+    @staticmethod
+    def _job_text(template, job):
+        """Text mit eingesetzten Datei-Platzhaltern, None ohne Platzhalter (gemeinsames Bild)."""
+        return render_text_template(template, job["video_path"]) if text_template_fields(template) else None
+
+    def count(self):
+        return len(self._assets)
+
+
+def output_path_for(video_path, output_dir):
+    """Zielpfad `<name>_wasserzeichen.mp4` im Ausgabeordner."""
+    filename = os.path.basename(video_path)
+    return os.path.join(output_dir, f"{os.path.splitext(filename)[0]}{OUTPUT_SUFFIX}")
+
+
+def build_job(video_path, output_dir, engine, wm_png_path, wm_size, settings, renditions=None):
+    """Job-dict für process_video_job (ohne index/threads, die setzt der Aufrufer)."""
+    output_path = output_path_for(video_path, output_dir)
+    job = {
+        "video_path": video_path,
+        "output_path": output_path,
+        "engine": engine,
+        "wm_png_path": wm_png_path,
+        "wm_size": wm_size,
+        "relative_pos": tuple(settings.get("position", DEFAULT_POSITION)),
+        "segment_threshold": settings.get("segment_threshold", SEGMENT_MIN_DURATION),
+        "encoder": None,
+        "info": None,
+        "time_ranges": parse_time_ranges(settings.get("time_ranges")),
+    }
+    text = settings.get("text") or ""
+    if text_template_fields(text) & set(TEMPLATE_FRAME_FIELDS):
+        job["text_overlay"] = {"parts": resolve_file_fields(text, video_path), "font": settings.get("font", DEFAULT_FONT_NAME),
+                               "font_size": settings.get("font_size", DEFAULT_FONT_SIZE),
+                               "font_size_relative": settings.get("font_size_relative"),
+                               "color": settings.get("color", DEFAULT_FONT_COLOR)}
+    if renditions:
+        job["renditions"] = [dict(r, output_path=rendition_output_path(output_path, r["suffix"])) for r in renditions]
+        job["output_path"] = job["renditions"][0]["output_path"]
+    variants = parse_variants(settings.get("variants"))
+    if variants:
+        job["variants"] = [dict(v, color=v["color"] or settings.get("color"), relative_pos=v["position"] or job["relative_pos"],
+                                wm_png_path=None, wm_size=None, output_path=rendition_output_path(output_path, v["suffix"]))
+                           for v in variants]
+        job["output_path"] = job["variants"][0]["output_path"]
+        job["manifest_path"] = variants_manifest_path(output_path)
+    return job
+
+
+def job_result(job, status, error=None):
+    """Ergebnis-Eintrag eines Jobs (input, output, status, error; bei Ausgabestufen/Varianten zusätzlich outputs,
+    bei Varianten außerdem variants mit Suffix, Text und Ausgabe je Variante sowie manifest)."""
+    result = {"input": job["video_path"], "output": job["output_path"], "status": status, "error": error}
+    if job.get("renditions") or job.get("variants"):
+        result["outputs"] = job_output_paths(job)
+    if job.get("variants"):
+        result["variants"] = [{"suffix": v["suffix"], "text": v["text"], "output": v["output_path"]} for v in job["variants"]]
+        result["manifest"] = job["manifest_path"]
+    return result
+
+
+def partial_output_path(output_path):
+    """Arbeitsname während des Encodes: `<name>.part.mp4` (Endung bleibt für FFmpeg erkennbar)."""
+    root, ext = os.path.splitext(output_path)
+    return f"{root}{PARTIAL_SUFFIX}{ext}"
+
+
+# --- Job-Journal (fortsetzbare Batches) ---
+def sample_file_hash(path, sample_size=HASH_SAMPLE_SIZE):
+    """Inhalts-Hash aus Dateigröße und drei Stichproben (Anfang, Mitte, Ende).
+
+    Liest höchstens 3 x `sample_size` Bytes, auch bei mehreren GB großen Videos;
+    erkennt kopierte/umbenannte Dateien mit neuem mtime, aber gleichem Inhalt.
+    """
+    size = os.path.getsize(path)
+    digest = hashlib.sha256(str(size).encode("ascii"))
+    with open(path, "rb") as f:
+        for offset in sorted({0, max(0, size // 2 - sample_size // 2), max(0, size - sample_size)}):
+            f.seek(offset)
+            digest.update(f.read(sample_size))
+    return digest.hexdigest()
+
+
+def batch_settings_hash(settings, wm_png_path=None, tuning_profile=None):
+    """Hash aller Einstellungen, die das Ergebnis bestimmen (Wasserzeichen-PNG, Position, Encoder).
+
+    Bei relativer Schriftgröße oder Platzhaltern im Text gibt es kein einzelnes PNG
+    (wm_png_path None), dann zählen Anteil bzw. Text-Muster und Schrift-Einstellungen.
+    """
+    payload = {key: settings.get(key) for key in ("text", "font", "font_size", "color")}
+    if settings.get("font_size_relative"):
+        payload["font_size"] = None
+        payload["font_size_relative"] = round(float(settings["font_size_relative"]), 6)
+    payload["position"] = [round(float(v), 6) for v in settings.get("position", DEFAULT_POSITION)]
+    payload["renditions"] = parse_renditions(settings.get("renditions"))
+    if settings.get("time_ranges"):
+        payload["time_ranges"] = parse_time_ranges(settings["time_ranges"])
+    if settings.get("variants"):
+        payload["variants"] = parse_variants(settings["variants"])
+    if tuning_profile:
+        payload["encoder"] = {"profile": tuning_profile.get("created_at"),
+                              "goal": settings.get("tuning_goal", DEFAULT_TUNING_GOAL),
+                              "target": float(settings.get("tuning_target", DEFAULT_TUNING_TARGET))}
+    else:
+        payload["encoder"] = default_encoder()
+    digest = hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8"))
+    if wm_png_path:
+        with open(wm_png_path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+class BatchJournal:
+    """Append-only Journal der Job-Ergebnisse im Ausgabeordner (JSON Lines).
+
+    Pro fertigem Job eine Zeile mit Eingabe (Größe, mtime, Inhalts-Hash),
+    Einstellungs-Hash, Ausgabe und Status; die jeweils letzte Zeile je Eingabe gilt.
+    Jede Zeile wird sofort auf die Platte geschrieben, eine nach einem Absturz
+    abgeschnittene letzte Zeile wird beim Laden ignoriert. Threadsicher: is_done()
+    und record() dürfen aus mehreren Threads kommen (Watch-Scan und -Worker).
+    """
+    def __init__(self, output_dir):
+        self.path = os.path.join(output_dir, JOURNAL_FILENAME)
+        self._records = {}
+        self._lock = threading.Lock() # schützt _records und das Anhängen an die Datei
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue # abgebrochene Zeile
+                    self._records[record.get("input")] = record
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            log("warning", f"Journal '{self.path}' nicht lesbar ({e}), alle Dateien werden verarbeitet.")
+        log("info", f"Journal geladen: {len(self._records)} Einträge ({self.path}).")
+
+    def _append(self, record):
+        with self._lock:
+            self._records[record["input"]] = record
+            try:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+            except OSError as e:
+                log("warning", f"Journal-Eintrag konnte nicht geschrieben werden: {e}")
+
+    def is_done(self, job, settings_hash):
+        """True, wenn Eingabe und Einstellungen unverändert sind und die Ausgabe vollständig vorliegt."""
+        input_path = os.path.abspath(job["video_path"])
+        with self._lock:
+            record = self._records.get(input_path)
+        if not record or record.get("status") != "ok" or record.get("settings_hash") != settings_hash:
+            return False
+        try:
+            stat = os.stat(input_path)
+            if os.path.getsize(job["output_path"]) != record.get("output_size"):
+                return False
+            for path, size in record.get("outputs", {}).items():
+                if os.path.getsize(path) != size:
+                    return False
+        except OSError:
+            return False
+        if stat.st_size != record.get("input_size"):
+            return False
+        if stat.st_mtime_ns == record.get("input_mtime_ns"):
+            return True
+        # mtime geändert (kopiert/angefasst): über den Inhalt entscheiden
+        if sample_file_hash(input_path) != record.get("input_hash"):
+            return False
+        self._append(dict(record, input_mtime_ns=stat.st_mtime_ns)) # nächster Lauf spart sich das Hashen
+        return True
+
+    def record(self, job, result, settings_hash):
+        """Hält das Ergebnis eines Jobs fest."""
+        record = {
+            "input": os.path.abspath(job["video_path"]),
+            "output": os.path.abspath(job["output_path"]),
+            "status": result["status"],
+            "error": result.get("error"),
+            "settings_hash": settings_hash,
+            "finished_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        }
+        try:
+            stat = os.stat(job["video_path"])
+            record.update(input_size=stat.st_size, input_mtime_ns=stat.st_mtime_ns)
+            if result["status"] == "ok":
+                record["input_hash"] = sample_file_hash(job["video_path"])
+                record["output_size"] = os.path.getsize(job["output_path"])
+                if job.get("renditions") or job.get("variants"):
+                    record["outputs"] = {os.path.abspath(path): os.path.getsize(path) for path in job_output_paths(job)}
+        except OSError as e:
+            log("warning", f"Journal-Angaben für '{job['video_path']}' unvollständig: {e}")
+        self._append(record)
+
+
+def run_jobs(jobs, workers, stop_event, on_event=None, memory_budget=None):
+    """Führt Jobs nacheinander (workers=1) oder in einem Prozess-Pool aus.
+
+    Im Pool startet ein Job nur, wenn seine Speicher-Schätzung in `memory_budget`
+    (MemoryBudget) passt; sonst wartet er, und kleinere Jobs dahinter dürfen vor.
+    Der gemessene Spitzen-Speicher jedes Jobs korrigiert die folgenden Schätzungen.
+
+    Nach einem Abbruch über `stop_event` werden keine neuen Jobs mehr gestartet und die
+    laufenden Encoder innerhalb einer Sekunde beendet (Status "cancelled", Teil-Ausgaben gelöscht).
+    `on_event(event, **data)` meldet "job_started", "job_finished" und (gedrosselt)
+    "progress" mit einer BatchProgress-Momentaufnahme (z. B. für die GUI).
+    Liefert eine Ergebnisliste in Job-Reihenfolge: dicts mit input, output, status, error;
+    nicht mehr gestartete Jobs haben den Status "cancelled".
+    """
+    on_event = on_event or (lambda event, **data: None)
+    memory_budget = memory_budget or MemoryBudget()
+    results = [job_result(job, "pending") for job in jobs]
+    total = len(jobs)
+    done_count = 0
+    progress = BatchProgress(jobs)
+    last_progress_event = [0.0]
+    reserved = {} # Job-Index -> reservierte MB
+
+    def emit_progress(force=False):
+        now = time.monotonic()
+        if force or now - last_progress_event[0] >= PROGRESS_INTERVAL:
+            last_progress_event[0] = now
+            on_event("progress", total=total, snapshot=progress.snapshot())
+
+    def start(index, job):
+        progress.start_file(index)
+        on_event("job_started", index=index, total=total, job=job)
+
+    def finish(index, outcome):
+        nonlocal done_count
+        done_count += 1
+        progress.finish_file(index)
+        if index in reserved:
+            memory_budget.release(reserved.pop(index))
+        peak_mb = outcome.get("peak_memory_mb")
+        if peak_mb: # sehr kurze Jobs enden vor der ersten Messung
+            log("info", f"Speicher: {peak_mb:.0f} MB gemessen, {estimate_job_memory_mb(jobs[index]):.0f} MB geschätzt.",
+                video=os.path.basename(jobs[index]["video_path"]))
+            if outcome["status"] == "ok":
+                memory_budget.observe(jobs[index], peak_mb)
+        if "metrics" in outcome:
+            instrumentation.merge(outcome["metrics"])
+        instrumentation.count(f"files_{outcome['status']}")
+        results[index]["status"] = outcome["status"]
+        results[index]["error"] = outcome["error"]
+        on_event("job_finished", index=index, done=done_count, total=total, result=results[index])
+        emit_progress(force=True)
+
+    if workers <= 1:
+        for index, job in enumerate(jobs):
+            if stop_event.is_set():
+                log("info", "Verarbeitungsschleife wegen Abbruchsignal verlassen.")
+                break
+            start(index, job)
+            def on_progress(frames_done, out_time, index=index):
+                progress.update(index, frames_done, out_time)
+                emit_progress()
+            finish(index, process_video_job(job, on_progress=on_progress, stop_event=stop_event))
+            time.sleep(0.01) # Kleine Pause
+    else:
+        pending = list(enumerate(jobs))
+        running = {}
+        waiting_logged = set()
+        if memory_budget.budget_mb:
+            log("info", f"Speicher-Budget: {memory_budget.budget_mb:.0f} MB für parallele Jobs.")
+        # "spawn" statt fork: der Aufrufer läuft ggf. in einem Thread neben Tk, ein fork wäre dort unsicher
+        mp_context = multiprocessing.get_context("spawn")
+        manager = multiprocessing.managers.SyncManager(ctx=mp_context)
+        manager.start(_ignore_sigint)
+        try:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=workers, mp_context=mp_context,
+                                                        initializer=_init_worker,
+                                                        initargs=(instrumentation.config(),)) as executor:
+                progress_queue = manager.Queue()
+                cancel_event = manager.Event() # Prozessübergreifendes Gegenstück zu stop_event
+                while pending or running:
+                    if stop_event.is_set() and not cancel_event.is_set():
+                        cancel_event.set()
+                    while pending and len(running) < workers and not stop_event.is_set():
+                        # Erster wartender Job, der ins Speicher-Budget passt (längere zuerst, kleinere füllen auf)
+                        for position, (index, job) in enumerate(pending):
+                            estimate_mb = memory_budget.estimate(job)
+                            if memory_budget.try_acquire(estimate_mb):
+                                break
+                            if index not in waiting_logged:
+                                waiting_logged.add(index)
+                                log("info", f"Wartet auf Speicher: ~{estimate_mb:.0f} MB benötigt, "
+                                            f"{memory_budget.in_use_mb:.0f} von {memory_budget.budget_mb:.0f} MB belegt.",
+                                    video=os.path.basename(job["video_path"]))
+                        else:
+                            break
+                        pending.pop(position)
+                        reserved[index] = estimate_mb
+                        start(index, job)
+                        running[executor.submit(_process_video_job_in_worker, job, progress_queue, cancel_event)] = index
+                    if not running:
+                        break
+                    finished, _ = concurrent.futures.wait(running, timeout=PROGRESS_INTERVAL,
+                                                          return_when=concurrent.futures.FIRST_COMPLETED)
+                    while not progress_queue.empty():
+                        progress.update(*progress_queue.get_nowait())
+                    emit_progress()
+                    for future in finished:
+                        index = running.pop(future)
+                        try:
+                            outcome = future.result()
+                        except Exception as e: # z. B. BrokenProcessPool
+                            log("error", f"Worker-Prozess abgestürzt: {e}\n{traceback.format_exc()}")
+                            for path in job_output_paths(jobs[index]):
+                                remove_partial_output(partial_output_path(path))
+                            outcome = {"status": "error", "error": f"FEHLER Worker-Prozess: {type(e).__name__} -> {str(e)[:100]}"}
+                        finish(index, outcome)
+        finally:
+            manager.shutdown()
+
+    for result in results:
+        if result["status"] == "pending":
+            result["status"] = "cancelled"
+    return results
+
+
+def probe_jobs(jobs, max_workers=PROBE_WORKERS):
+    """Analysiert alle Jobs parallel vorab (preflight_probe) und setzt job["info"].
+
+    Liefert {Job-Index in `jobs`: Fehler} der abgelehnten Dateien (defekt, nicht
+    unterstützt). Ohne FFmpeg bleibt info None und nichts wird abgelehnt.
+    """
+    if not find_ffmpeg_exe():
+        return {}
+    probed = preflight_probe([job["video_path"] for job in jobs], max_workers)
+    rejected = {}
+    for index, job in enumerate(jobs):
+        job["info"], error = probed[job["video_path"]]
+        if error:
+            rejected[index] = error
+        else:
+            log("info", describe_media(job["info"]), video=os.path.basename(job["video_path"]))
+    return rejected
+
+
+def run_watermark_batch(video_files, output_dir, settings, stop_event=None, on_event=None, wm_image=None):
+    """Kompletter Batch: Wasserzeichen rendern, Jobs bauen, ausführen, aufräumen.
+
+    `settings` wie default_settings(). Ein bereits gerendertes `wm_image` (z. B. aus dem
+    Vorschau-Cache der GUI) wird wiederverwendet. Mit settings["resume"] werden Dateien,
+    deren Eingabe und Einstellungen laut Journal unverändert sind, übersprungen
+    (Status "skipped"). Alle Dateien werden vorab parallel analysiert; defekte oder nicht
+    unterstützte werden sofort mit Status "error" abgelehnt, die übrigen laufen längste
+    zuerst. Wirft WatermarkError, wenn das Wasserzeichen nicht erstellt
+    werden kann; sonst Ergebnisliste wie run_jobs() in der Reihenfolge von `video_files`.
+    Bei aktivem Tracing (instrumentation.trace) folgt am Ende eine Zusammenfassung der Stufen-Zeiten.
+    """
+    stop_event = stop_event or threading.Event()
+    instrumentation.reset() # Stufen-Zeiten und Zähler gelten pro Batch
+    batch_start = time.perf_counter()
+    try:
+        return _run_watermark_batch(video_files, output_dir, settings, stop_event, on_event, wm_image)
+    finally:
+        instrumentation.add_time("batch", time.perf_counter() - batch_start)
+        instrumentation.emit_summary()
+
+
+def _run_watermark_batch(video_files, output_dir, settings, stop_event, on_event, wm_image):
+    engine, renditions = select_batch_engine(settings)
+
+    # PNGs werden einmal pro Batch (bzw. pro Auflösung) geschrieben und von jedem Job gelesen
+    wm_temp_dir = tempfile.mkdtemp(prefix="wz5_")
+    try:
+        assets = WatermarkAssets(settings, wm_temp_dir, wm_image)
+        wm_png_path = assets.shared_png_path()
+        tuning_profile = load_tuning_profile()
+        settings_hash = batch_settings_hash(settings, wm_png_path, tuning_profile)
+        jobs = [build_job(video_path, output_dir, engine, None, None, settings, renditions)
+                for video_path in video_files]
+
+        results = [None] * len(jobs)
+        todo = []
+        with instrumentation.span("journal_check"):
+            journal = BatchJournal(output_dir)
+            for position, job in enumerate(jobs):
+                if settings.get("resume", True) and journal.is_done(job, settings_hash):
+                    log("info", "Unverändert und bereits fertig, übersprungen.", video=os.path.basename(job["video_path"]))
+                    results[position] = job_result(job, "skipped")
+                else:
+                    todo.append((position, job))
+        if len(todo) < len(jobs):
+            instrumentation.count("files_skipped", len(jobs) - len(todo))
+            log("info", f"{len(jobs) - len(todo)} von {len(jobs)} Datei(en) laut Journal bereits fertig.")
+
+        with instrumentation.span("preflight"):
+            rejected = probe_jobs([job for _, job in todo])
+        for todo_index, error in rejected.items():
+            position, job = todo[todo_index]
+            log("error", f"Vorab abgelehnt: {error}", video=os.path.basename(job["video_path"]))
+            results[position] = job_result(job, "error", f"{os.path.basename(job['video_path'])}: {error}")
+        if rejected:
+            instrumentation.count("files_error", len(rejected))
+            todo = [entry for todo_index, entry in enumerate(todo) if todo_index not in rejected]
+        # Längste zuerst: kürzere Jobs füllen am Ende die Lücken (kürzere Gesamtdauer, stabilere ETA)
+        todo.sort(key=lambda entry: (entry[1]["info"] or {}).get("duration") or 0.0, reverse=True)
+
+        workers = max(1, min(int(settings.get("workers", 1)), len(todo) or 1))
+        # Thread-Budget wird auf die parallelen Encodes aufgeteilt
+        threads = max(1, (os.cpu_count() or 4) // workers)
+        log("info", f"Verwende Engine '{ENGINE_LABELS[engine]}', {workers} parallele(r) Job(s) mit je {threads} Thread(s).")
+        todo_jobs = [job for _, job in todo]
+        for index, job in enumerate(todo_jobs):
+            job["index"] = index
+            job["threads"] = threads
+        for job in todo_jobs:
+            assets.assign(job)
+        if assets.fraction:
+            log("info", f"Wasserzeichen relativ zur Videohöhe ({assets.fraction:.1%}): {assets.count()} Auflösung(en) gerastert.")
+        # Preset/CRF/Threads pro Auflösung aus der Kalibrierung dieses Rechners (falls vorhanden)
+        if tuning_profile:
+            apply_tuning(todo_jobs, settings, tuning_profile)
+
+        on_event = on_event or (lambda event, **data: None)
+        def record_and_forward(event, **data):
+            if event == "job_finished" and data["result"]["status"] != "cancelled":
+                journal.record(todo_jobs[data["index"]], data["result"], settings_hash)
+            on_event(event, **data)
+        memory_budget = MemoryBudget.from_settings(settings)
+        for (position, _), result in zip(todo, run_jobs(todo_jobs, workers, stop_event, record_and_forward, memory_budget)):
+            results[position] = result
+        return results
+    finally:
+        shutil.rmtree(wm_temp_dir, ignore_errors=True)
+
+
+# --- Watch-Ordner (Daemon) ---
+class FolderWatcher:
+    """Findet neue, fertig geschriebene Videos in Eingabeordnern (Polling über os.scandir).
+
+    Eine Datei gilt als fertig, wenn Größe und mtime seit `stable_seconds` unverändert
+    sind. Jede Datei wird pro Stand (Größe, mtime) nur einmal gemeldet; wird sie später
+    neu geschrieben, wird sie erneut gemeldet. Eigene Ausgaben und Teil-Dateien werden ignoriert.
+    """
+    def __init__(self, watch_dirs, stable_seconds=WATCH_STABLE_SECONDS):
+        self.watch_dirs = [os.path.abspath(d) for d in watch_dirs]
+        self.stable_seconds = stable_seconds
+        self._candidates = {} # Pfad -> [Größe, mtime_ns, unverändert seit, zuerst gesehen]
+        self._handled = {}    # Pfad -> (Größe, mtime_ns) des zuletzt gemeldeten Stands
+
+    def _is_candidate(self, name):
+        lower = name.lower()
+        # auch Ausgabestufen und Varianten (<name>_wasserzeichen_360p.mp4, ..._v01.mp4) sind eigene Ausgaben
+        return (lower.endswith(VIDEO_EXTENSIONS) and not name.startswith(".")
+                and OUTPUT_MARKER not in os.path.splitext(lower)[0] and PARTIAL_SUFFIX not in lower)
+
+    def scan(self, now=None):
+        """Ein Durchlauf; liefert [(pfad, (größe, mtime_ns), zuerst_gesehen)] der fertigen Dateien."""
+        now = time.monotonic() if now is None else now
+        present = set()
+        ready = []
+        for watch_dir in self.watch_dirs:
+            try:
+                entries = list(os.scandir(watch_dir))
+            except OSError as e:
+                log("warning", f"Watch-Ordner '{watch_dir}' nicht lesbar: {e}")
+                continue
+            for entry in entries:
+                if not self._is_candidate(entry.name):
+                    continue
+                try:
+                    if not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                except OSError:
+                    continue # während des Durchlaufs gelöscht/umbenannt
+                path = entry.path
+                present.add(path)
+                signature = (stat.st_size, stat.st_mtime_ns)
+                if self._handled.get(path) == signature:
+                    continue
+                candidate = self._candidates.get(path)
+                if candidate is None or (candidate[0], candidate[1]) != signature:
+                    first_seen = candidate[3] if candidate else now
+                    self._candidates[path] = [stat.st_size, stat.st_mtime_ns, now, first_seen]
+                    continue
+                if stat.st_size > 0 and now - candidate[2] >= self.stable_seconds:
+                    ready.append((path, signature, candidate[3]))
+        for path in list(self._candidates):
+            if path not in present:
+                del self._candidates[path]
+        return ready
+
+    def mark_handled(self, path, signature):
+        """Datei (in diesem Stand) wurde eingereiht oder übersprungen."""
+        self._handled[path] = signature
+        self._candidates.pop(path, None)
+
+
+def select_batch_engine(settings):
+    """Engine und Ausgabestufen eines Batches; Ausgabestufen, Varianten und Zeitbereiche brauchen die FFmpeg-Engine,
+    Frame-Platzhalter im Text die Stream-Engine."""
+    try:
+        renditions = parse_renditions(settings.get("renditions"))
+    except ValueError as e:
+        raise WatermarkError("Ausgabestufen", str(e))
+    try:
+        time_ranges = parse_time_ranges(settings.get("time_ranges"))
+    except ValueError as e:
+        raise WatermarkError("Zeitbereiche", str(e))
+    if renditions and time_ranges:
+        raise WatermarkError("Zeitbereiche", "Zeitbereiche lassen sich nicht mit mehreren Ausgabestufen kombinieren.")
+    try:
+        variants = parse_variants(settings.get("variants"))
+    except ValueError as e:
+        raise WatermarkError("Varianten", str(e))
+    if variants and renditions:
+        raise WatermarkError("Varianten", "Varianten lassen sich nicht mit mehreren Ausgabestufen kombinieren.")
+    try:
+        frame_fields = text_template_fields(settings.get("text") or "") & set(TEMPLATE_FRAME_FIELDS)
+        for variant in variants or []:
+            if text_template_fields(variant["text"]) & set(TEMPLATE_FRAME_FIELDS):
+                raise ValueError(f"Variante {variant['suffix'].lstrip('_')}: Frame-Platzhalter gibt es nur im Haupttext.")
+    except ValueError as e:
+        raise WatermarkError("Wasserzeichentext", str(e))
+    if frame_fields and (renditions or variants or time_ranges):
+        raise WatermarkError("Wasserzeichentext", "Frame-Platzhalter lassen sich nicht mit Ausgabestufen, Varianten "
+                                                  "oder Zeitbereichen kombinieren.")
+    engine = settings.get("engine", DEFAULT_ENGINE)
+    if engine in (ENGINE_FFMPEG, ENGINE_STREAM) and not find_ffmpeg_exe():
+         log("warning", "FFmpeg nicht gefunden, verwende MoviePy-Engine für diesen Batch.")
+         engine = ENGINE_MOVIEPY
+    if renditions and engine != ENGINE_FFMPEG:
+        if not find_ffmpeg_exe():
+            raise WatermarkError("Ausgabestufen", "Mehrere Ausgabestufen benötigen FFmpeg.")
+        log("warning", "Ausgabestufen werden nur von der FFmpeg-Engine unterstützt, verwende FFmpeg.")
+        engine = ENGINE_FFMPEG
+    if time_ranges and engine != ENGINE_FFMPEG:
+        if not find_ffmpeg_exe():
+            raise WatermarkError("Zeitbereiche", "Zeitbereiche benötigen FFmpeg.")
+        log("warning", "Zeitbereiche werden nur von der FFmpeg-Engine unterstützt, verwende FFmpeg.")
+        engine = ENGINE_FFMPEG
+    if variants and engine != ENGINE_FFMPEG:
+        if not find_ffmpeg_exe():
+            raise WatermarkError("Varianten", "Varianten benötigen FFmpeg.")
+        log("warning", "Varianten werden nur von der FFmpeg-Engine unterstützt, verwende FFmpeg.")
+        engine = ENGINE_FFMPEG
+    if frame_fields and engine != ENGINE_STREAM:
+        if not find_ffmpeg_exe():
+            raise WatermarkError("Wasserzeichentext", "Frame-Platzhalter benötigen FFmpeg.")
+        log("warning", f"Frame-Platzhalter ({', '.join(sorted(frame_fields))}) werden pro Frame gesetzt, "
+                       f"verwende die Engine '{ENGINE_LABELS[ENGINE_STREAM]}'.")
+        engine = ENGINE_STREAM
+    return engine, renditions
+
+
+def watch_folders(watch_dirs, output_dir, settings, stop_event, poll_interval=WATCH_POLL_INTERVAL,
+                  stable_seconds=WATCH_STABLE_SECONDS, queue_size=WATCH_QUEUE_SIZE, on_result=None):
+    """Daemon: überwacht `watch_dirs` und versieht neue Videos laufend mit Wasserzeichen.
+
+    Fertig geschriebene Dateien (siehe FolderWatcher) kommen in eine begrenzte
+    Warteschlange; `settings["workers"]` Worker-Threads verarbeiten sie mit
+    process_video_job. Ist die Warteschlange voll, werden weitere Dateien erst in einem
+    späteren Durchlauf eingereiht (Backpressure). Fehlerhafte Dateien werden
+    protokolliert und erst nach einer Änderung erneut versucht; das Journal im
+    Ausgabeordner verhindert nach einem Neustart doppelte Arbeit.
+    `on_result(result)` erhält pro Datei ein dict mit input, output, status, error und
+    latency_s (erstes Auftauchen bis fertige Ausgabe). Läuft bis `stop_event` gesetzt ist,
+    laufende Encodes werden dann abgebrochen. Liefert die Anzahl Dateien pro Status.
+    """
+    engine, renditions = select_batch_engine(settings)
+    workers = max(1, int(settings.get("workers", 1)))
+    threads = max(1, (os.cpu_count() or 4) // workers)
+    counts = {"ok": 0, "skipped": 0, "error": 0, "cancelled": 0}
+    counts_lock = threading.Lock()
+    memory_budget = MemoryBudget.from_settings(settings)
+    work_queue = queue.Queue(maxsize=max(1, queue_size))
+    watcher = FolderWatcher(watch_dirs, stable_seconds)
+
+    wm_temp_dir = tempfile.mkdtemp(prefix="wz5_")
+    try:
+        assets = WatermarkAssets(settings, wm_temp_dir)
+        wm_png_path = assets.shared_png_path()
+        tuning_profile = load_tuning_profile()
+        settings_hash = batch_settings_hash(settings, wm_png_path, tuning_profile)
+        journal = BatchJournal(output_dir)
+
+        def make_job(video_path):
+            job = build_job(video_path, output_dir, engine, None, None, settings, renditions)
+            job.update(index=0, threads=threads)
+            return job
+
+        def report(job, status, error, first_seen):
+            result = dict(job_result(job, status, error), latency_s=round(time.monotonic() - first_seen, 3))
+            with counts_lock:
+                counts[status] = counts.get(status, 0) + 1
+            instrumentation.count(f"files_{status}")
+            level = "error" if status == "error" else "info"
+            log(level, f"Watch-Ergebnis: {status} nach {result['latency_s']:.1f}s" + (f" ({error})" if error else ""),
+                video=os.path.basename(job["video_path"]), event="watch_result", **result)
+            if on_result:
+                try:
+                    on_result(result)
+                except Exception as e:
+                    log("warning", f"Ergebnis-Callback fehlgeschlagen: {e}", video=os.path.basename(job["video_path"]))
+
+        def handle(job, first_seen):
+            if stop_event.is_set():
+                report(job, "cancelled", None, first_seen)
+                return
+            try:
+                job["info"] = probe_cache.probe(job["video_path"])
+                problem = media_problem(job["info"])
+                if problem:
+                    report(job, "error", problem, first_seen)
+                    return
+                if tuning_profile:
+                    apply_tuning([job], settings, tuning_profile)
+            except ValueError as e: # nicht lesbar (Ergebnis im probe_cache)
+                report(job, "error", str(e), first_seen)
+                return
+            except Exception as e:
+                log("warning", f"Vorab-Analyse fehlgeschlagen: {e}", video=os.path.basename(job["video_path"]))
+            try:
+                assets.assign(job) # pro neuer Auflösung einmal rastern, danach aus dem Cache
+            except WatermarkError as e:
+                report(job, "error", str(e), first_seen)
+                return
+            estimate_mb = memory_budget.estimate(job)
+            if not memory_budget.acquire(estimate_mb, stop_event): # großer Job wartet, bis genug Speicher frei ist
+                report(job, "cancelled", None, first_seen)
+                return
+            try:
+                outcome = process_video_job(job, stop_event=stop_event)
+            finally:
+                memory_budget.release(estimate_mb)
+            if outcome["status"] == "ok":
+                memory_budget.observe(job, outcome.get("peak_memory_mb"))
+            if outcome["status"] != "cancelled":
+                journal.record(job, outcome, settings_hash)
+            report(job, outcome["status"], outcome["error"], first_seen)
+
+        def worker():
+            while True:
+                item = work_queue.get()
+                if item is None:
+                    return
+                job, first_seen = item
+                try:
+                    handle(job, first_seen)
+                except Exception as e: # ein kaputter Job darf den Worker nicht beenden, sonst staut sich die Warteschlange
+                    filename = os.path.basename(job["video_path"])
+                    log("error", f"Unerwarteter Fehler im Watch-Worker: {type(e).__name__}: {e}", video=filename)
+                    report(job, "error", describe_processing_error(filename, e), first_seen)
+
+        log("info", f"Überwache {', '.join(watcher.watch_dirs)} -> {output_dir} (Engine '{ENGINE_LABELS[engine]}', "
+                    f"{workers} Worker mit je {threads} Thread(s), Warteschlange {work_queue.maxsize}).")
+        worker_threads = [threading.Thread(target=worker, name=f"wz5-watch-{i}", daemon=True) for i in range(workers)]
+        for thread in worker_threads:
+            thread.start()
+        queue_full_logged = False
+        while not stop_event.is_set():
+            for path, signature, first_seen in watcher.scan():
+                job = make_job(path)
+                if settings.get("resume", True) and journal.is_done(job, settings_hash):
+                    watcher.mark_handled(path, signature)
+                    report(job, "skipped", None, first_seen)
+                    continue
+                try:
+                    work_queue.put_nowait((job, first_seen))
+                except queue.Full:
+                    if not queue_full_logged:
+                        log("info", f"Warteschlange voll ({work_queue.maxsize}), weitere Dateien folgen, sobald Platz ist.")
+                        queue_full_logged = True
+                    break
+                watcher.mark_handled(path, signature)
+                queue_full_logged = False
+                log("info", f"Eingereiht ({work_queue.qsize()} wartend).", video=os.path.basename(path))
+            stop_event.wait(poll_interval)
+
+        log("info", "Watch-Modus wird beendet, laufende Encodes werden abgebrochen...")
+        for _ in worker_threads:
+            work_queue.put(None) # nach den verbliebenen Einträgen, die als abgebrochen gemeldet werden
+        for thread in worker_threads:
+            thread.join()
+        return counts
+    finally:
+        shutil.rmtree(wm_temp_dir, ignore_errors=True)